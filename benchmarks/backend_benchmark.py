@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from modules.ingest_season import transform_season, load_season, ensure_partitions, CHUNK_SIZE
+from modules.aggregates import refresh_aggregates
+from modules.integrity import fetch_integrity
+from modules.queries import run_query
+from modules.loaders import LOADERS
+from modules.backends import BACKENDS, PostgresBackend, DuckDBBackend
+from modules.metrics import configure as configure_metrics
+from benchmarks.synthetic import generate_season
+from benchmarks.etl_benchmark import bench_seasons, drop_bench_seasons
+
+# ==============================================================================
+# STORAGE BACKEND BENCHMARK
+# ==============================================================================
+# Loads the same synthetic seasons (benchmarks/synthetic.py) into each storage
+# backend (modules/backends.py), then times the read-heavy aggregation
+# workload on both:
+#   load        -> load_season per season (insert + aggregate refresh + commit)
+#   refresh     -> refresh_season_aggregates for every season
+#   integrity   -> the single-pass integrity query over all seasons
+#   <catalog>   -> analytics queries from modules/queries.py over all seasons
+# PostgreSQL gets 'bench<year>' partitions that are dropped afterwards (use a
+# scratch database); DuckDB runs in a temporary file.
+# Usage:
+#   python -m benchmarks.backend_benchmark --seasons 3
+#   python -m benchmarks.backend_benchmark --backends duckdb --repeats 5 --json
+# ==============================================================================
+
+WORKLOAD_QUERIES = [
+    ("unlucky_finishers", {"min_xg": 5, "limit": 10}),
+    ("buildup_leaders", {"min_minutes": 900, "limit": 10}),
+    ("fouls_per_game", {}),
+    ("player_season", {}),
+]
+
+def timed(fn, repeats):
+    """
+    Best wall time (seconds) of `repeats` calls.
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_backend(backend, seasons, args):
+    conn = backend.connect()
+    timings = {}
+    try:
+        backend.ensure_schema(conn, verbose=False)
+        if backend.name == "postgres":
+            drop_bench_seasons(conn, seasons)
+        ensure_partitions(conn, seasons)
+
+        prepared = [
+            transform_season(season, *generate_season(season, n_teams=args.teams, seed=args.seed))
+            for season in seasons
+        ]
+        start = time.perf_counter()
+        for season_payload in prepared:
+            load_season(conn, season_payload, loader=args.loader, chunk_size=args.chunk_size)
+        timings["load"] = time.perf_counter() - start
+        del prepared
+
+        def refresh():
+            cur = conn.cursor()
+            for season in seasons:
+                refresh_aggregates(cur, season)
+            conn.commit()
+            cur.close()
+
+        timings["refresh"] = timed(refresh, args.repeats)
+        timings["integrity"] = timed(lambda: fetch_integrity(seasons, conn=conn), args.repeats)
+        for name, params in WORKLOAD_QUERIES:
+            timings[name] = timed(lambda: run_query(name, conn=conn, **params), args.repeats)
+    finally:
+        if backend.name == "postgres":
+            drop_bench_seasons(conn, seasons)
+        conn.close()
+    return {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and aggregation latency per storage backend.")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS), help="Backends to compare.")
+    parser.add_argument("--seasons", type=int, default=2, help="Number of synthetic seasons.")
+    parser.add_argument("--teams", type=int, default=20, help="Teams per season (20 -> 380 matches).")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per read (the fastest is reported).")
+    parser.add_argument("--loader", choices=LOADERS, default="copy", help="Insert strategy.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per insert batch.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the generator.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    seasons = bench_seasons(args.seasons, 2023, postgres=True)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_metrics(metrics_path=os.path.join(tmp, "bench_metrics.jsonl"))
+        for name in args.backends:
+            backend = PostgresBackend() if name == "postgres" else DuckDBBackend(os.path.join(tmp, "bench.duckdb"))
+            try:
+                results[name] = run_backend(backend, seasons, args)
+            except Exception as e:
+                print(f"[WARN] {name} skipped: {e}")
+
+    if args.json:
+        print(json.dumps({"seasons": args.seasons, "teams": args.teams, "results": results}, indent=2))
+        return
+
+    print(f"\n BACKEND BENCHMARK ({args.seasons} season(s), {args.teams} teams, {args.loader}, "
+          f"best of {args.repeats}, milliseconds)")
+    print("-" * (22 + 14 * len(results)))
+    print(f"{'stage':<22}" + "".join(f"{name:>14}" for name in results))
+    stages = next(iter(results.values()), {})
+    for stage in stages:
+        print(f"{stage:<22}" + "".join(f"{r.get(stage, float('nan')):>14,.1f}" for r in results.values()))
+
+if __name__ == "__main__":
+    main()
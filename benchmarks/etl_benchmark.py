@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from modules.ingest_season import (
+    transform_season, load_season, ensure_partitions, partition_suffix, CHUNK_SIZE
+)
+from modules.loaders import LOADERS
+from modules.lineup_matching import DATE_TOLERANCE_DAYS
+from modules.metrics import configure, read_run
+from modules.utils import peak_rss_mb
+from modules.schema import PARTITIONED_TABLES
+from benchmarks.synthetic import generate_season
+from benchmarks.stand_in import MemoryConnection
+
+# ==============================================================================
+# OFFLINE ETL BENCHMARK
+# ==============================================================================
+# Runs transform_season + load_season on synthetic La Liga seasons (see
+# benchmarks/synthetic.py) and reports per-stage throughput and memory from
+# the stage metrics (modules/metrics.py). No network access is needed.
+# Sinks:
+#   default     -> in-memory stand-in (benchmarks/stand_in.py): measures the
+#                  Python side of the pipeline, no database required
+#   --postgres  -> the database from .env; seasons are loaded as 'bench<year>'
+#                  partitions and dropped afterwards. Use a scratch database:
+#                  the synthetic teams/players stay in the dimension tables.
+# Usage:
+#   python -m benchmarks.etl_benchmark --seasons 3 --save bench_baseline.json
+#   python -m benchmarks.etl_benchmark --seasons 3 --compare bench_baseline.json
+# ==============================================================================
+
+BENCH_STAGES = ["transform", "link", "insert.matches", "insert.player_stats", "insert.lineups"]
+
+def bench_seasons(n_seasons, first_season, postgres):
+    prefix = "bench" if postgres else ""
+    return [f"{prefix}{first_season - i}" for i in range(n_seasons)]
+
+def drop_bench_seasons(conn, seasons):
+    """
+    Removes the benchmark partitions (children first), their aggregate rows and data versions.
+    """
+    cur = conn.cursor()
+    for season in seasons:
+        suffix = partition_suffix(season)
+        for table in reversed(PARTITIONED_TABLES):
+            cur.execute(f"DROP TABLE IF EXISTS {table}_{suffix};")
+        for table in ("agg_standings", "agg_player_season", "agg_team_season"):
+            cur.execute(f"DELETE FROM {table} WHERE season = %s;", (season,))
+        cur.execute("DELETE FROM data_versions WHERE season = %s;", (season,))
+    conn.commit()
+    cur.close()
+
+def run_once(seasons, args):
+    """
+    One pass over every season; returns the stage records of the pass.
+    """
+    run = configure(metrics_path=args.metrics_path)
+    if args.postgres:
+        from modules.utils import get_raw_connection
+        from modules.migrations import migrate
+        conn = get_raw_connection()
+        migrate(conn, verbose=False)
+        drop_bench_seasons(conn, seasons)
+        ensure_partitions(conn, seasons)
+    else:
+        conn = MemoryConnection()
+
+    try:
+        for season in seasons:
+            frames = generate_season(
+                season, n_teams=args.teams, seed=args.seed, name_variant_rate=args.name_variant_rate,
+                date_shift_rate=args.date_shift_rate, junk_rate=args.junk_rate
+            )
+            prepared = transform_season(season, *frames, lineup_tolerance_days=args.lineup_tolerance)
+            del frames
+            load_season(conn, prepared, loader=args.loader, chunk_size=args.chunk_size)
+    finally:
+        if args.postgres:
+            drop_bench_seasons(conn, seasons)
+        conn.close()
+    return read_run(run)
+
+def summarize(passes):
+    """
+    Per stage: best (fastest) pass, rows and rows/sec; peak RSS over all passes.
+    """
+    results = {}
+    for stage in BENCH_STAGES:
+        per_pass = []
+        for records in passes:
+            recs = [r for r in records if r["stage"] == stage]
+            if recs:
+                per_pass.append((sum(r["seconds"] for r in recs), sum(r["rows"] for r in recs),
+                                 max(r["peak_rss_mb"] for r in recs)))
+        if not per_pass:
+            continue
+        seconds, rows, _ = min(per_pass)
+        results[stage] = {
+            "seconds": round(seconds, 4),
+            "rows": rows,
+            "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else 0.0,
+            "peak_rss_mb": max(p[2] for p in per_pass),
+        }
+    return results
+
+def compare(results, baseline, tolerance):
+    """
+    Stages whose rows/sec dropped by more than `tolerance` (fraction) against the baseline.
+    """
+    regressions = []
+    for stage, base in baseline.get("stages", {}).items():
+        current = results.get(stage)
+        if current and base["rows_per_sec"] > 0 and current["rows_per_sec"] < base["rows_per_sec"] * (1 - tolerance):
+            regressions.append((stage, base["rows_per_sec"], current["rows_per_sec"]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ETL benchmark on synthetic La Liga seasons.")
+    parser.add_argument("--seasons", type=int, default=1, help="Number of synthetic seasons per pass.")
+    parser.add_argument("--first-season", type=int, default=2023, help="Most recent synthetic season.")
+    parser.add_argument("--teams", type=int, default=20, help="Teams per season (20 -> 380 matches).")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes (the fastest is reported per stage).")
+    parser.add_argument("--loader", choices=LOADERS, default="copy", help="Insert strategy.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per insert batch.")
+    parser.add_argument("--lineup-tolerance", type=int, default=DATE_TOLERANCE_DAYS, help="Lineup date tolerance (days).")
+    parser.add_argument("--name-variant-rate", type=float, default=0.5, help="Share of teams with an ESPN alias spelling.")
+    parser.add_argument("--date-shift-rate", type=float, default=0.03, help="Share of games listed one day off by ESPN.")
+    parser.add_argument("--junk-rate", type=float, default=0.01, help="Share of blank cells in count columns.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the generator.")
+    parser.add_argument("--postgres", action="store_true", help="Load into the .env database instead of the in-memory stand-in.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    parser.add_argument("--save", help="Write the results to this JSON file (e.g. a baseline).")
+    parser.add_argument("--compare", help="Baseline JSON file: exit 1 if a stage got slower than --tolerance.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed rows/sec drop against the baseline (fraction).")
+    args = parser.parse_args()
+
+    seasons = bench_seasons(args.seasons, args.first_season, args.postgres)
+    with tempfile.TemporaryDirectory() as tmp:
+        args.metrics_path = os.path.join(tmp, "bench_metrics.jsonl")
+        start = time.time()
+        passes = [run_once(seasons, args) for _ in range(args.repeats)]
+        elapsed = time.time() - start
+
+    results = {
+        "config": {
+            "seasons": args.seasons, "teams": args.teams, "loader": args.loader, "chunk_size": args.chunk_size,
+            "sink": "postgres" if args.postgres else "memory", "repeats": args.repeats,
+        },
+        "stages": summarize(passes),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "wall_seconds": round(elapsed, 2),
+    }
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        cfg = results["config"]
+        print(f"\n ETL BENCHMARK ({cfg['seasons']} season(s), {cfg['teams']} teams, {cfg['loader']}, "
+              f"{cfg['sink']} sink, best of {cfg['repeats']})")
+        print("-" * 78)
+        print(f"{'stage':<24}{'seconds':>10}{'rows':>10}{'rows/sec':>14}{'peak RSS (MB)':>16}")
+        for stage, r in results["stages"].items():
+            print(f"{stage:<24}{r['seconds']:>10.3f}{r['rows']:>10}{r['rows_per_sec']:>14,.0f}{r['peak_rss_mb']:>16.1f}")
+        print(f"\n Peak RSS: {results['peak_rss_mb']:.1f} MB, wall time: {results['wall_seconds']:.2f}s")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results["stages"], baseline, args.tolerance)
+        for stage, before, after in regressions:
+            print(f"[REGRESSION] {stage}: {before:,.0f} -> {after:,.0f} rows/sec")
+        if regressions:
+            sys.exit(1)
+        print(f"[OK] No stage slower than {args.tolerance:.0%} against {args.compare}.")
+
+if __name__ == "__main__":
+    main()
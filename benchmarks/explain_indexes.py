@@ -0,0 +1,114 @@
+import argparse
+import json
+from modules.utils import get_raw_connection
+from modules.schema import MANAGED_INDEX_NAMES
+from modules.migrations import migrate
+
+# ==============================================================================
+# INDEX BENCHMARK: EXPLAIN ANALYZE BEFORE / AFTER
+# ==============================================================================
+# Runs the standard integrity and analytics queries with EXPLAIN ANALYZE twice:
+#   before -> inside a transaction where the managed indexes are dropped
+#             (the transaction is rolled back, so nothing is lost)
+#   after  -> with the managed indexes in place
+# Usage:
+#   python -m benchmarks.explain_indexes --season 2023
+# Note: DROP INDEX holds an exclusive lock until the rollback, so run this
+# while no ingestion is writing to the database.
+# ==============================================================================
+
+STANDARD_QUERIES = {
+    "volume": """
+        SELECT
+            (SELECT COUNT(*) FROM matches WHERE season = %(season)s) as total_matches,
+            (SELECT COUNT(DISTINCT ps.match_id)
+             FROM player_stats ps JOIN matches m ON ps.match_id = m.id
+             WHERE m.season = %(season)s) as matches_with_stats,
+            (SELECT COUNT(DISTINCT l.match_id)
+             FROM lineups l JOIN matches m ON l.match_id = m.id
+             WHERE m.season = %(season)s) as matches_with_lineups;
+    """,
+    "orphans": """
+        SELECT m.id FROM matches m
+        LEFT JOIN player_stats ps ON m.id = ps.match_id
+        WHERE m.season = %(season)s AND ps.match_id IS NULL;
+    """,
+    "standings": """
+        SELECT team, SUM(pts) AS points FROM (
+            SELECT home_team AS team, CASE WHEN home_score > away_score THEN 3
+                   WHEN home_score = away_score THEN 1 ELSE 0 END AS pts
+            FROM matches WHERE season = %(season)s
+            UNION ALL
+            SELECT away_team, CASE WHEN away_score > home_score THEN 3
+                   WHEN away_score = home_score THEN 1 ELSE 0 END
+            FROM matches WHERE season = %(season)s
+        ) t GROUP BY team ORDER BY points DESC;
+    """,
+    "unlucky_finishers": """
+        SELECT player_name, team, SUM(goals) - SUM(xg) AS performance_vs_xg
+        FROM player_stats GROUP BY player_name, team
+        HAVING SUM(xg) > 5 ORDER BY performance_vs_xg ASC LIMIT 10;
+    """,
+    "buildup_leaders": """
+        SELECT player_name, team, SUM(xg_buildup) AS total_buildup
+        FROM player_stats GROUP BY player_name, team
+        HAVING SUM(minutes) > 900 ORDER BY total_buildup DESC LIMIT 10;
+    """,
+    "fouls_per_game": """
+        SELECT team, SUM(fouls_committed)::numeric / NULLIF(COUNT(DISTINCT match_id), 0) AS avg_fouls
+        FROM lineups GROUP BY team ORDER BY avg_fouls DESC;
+    """,
+}
+
+def explain(cur, sql, params):
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()[0][0]
+    return plan["Execution Time"], plan["Plan"]["Node Type"]
+
+def run_all(cur, params, repeats):
+    results = {}
+    for name, sql in STANDARD_QUERIES.items():
+        timings = [explain(cur, sql, params) for _ in range(repeats)]
+        results[name] = (min(t[0] for t in timings), timings[-1][1])
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the standard queries with and without the managed indexes.")
+    parser.add_argument("--season", type=str, default="2023", help="Season used by the season-scoped queries.")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per query (the fastest is reported).")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    conn = get_raw_connection()
+    migrate(conn)
+    cur = conn.cursor()
+    params = {"season": args.season}
+
+    # BEFORE: drop the managed indexes inside a transaction that is rolled back
+    for name in MANAGED_INDEX_NAMES:
+        cur.execute(f"DROP INDEX IF EXISTS {name};")
+    before = run_all(cur, params, args.repeats)
+    conn.rollback()
+
+    # AFTER: indexes restored by the rollback
+    after = run_all(cur, params, args.repeats)
+    conn.rollback()
+    cur.close()
+    conn.close()
+
+    if args.json:
+        print(json.dumps({
+            name: {"before_ms": before[name][0], "after_ms": after[name][0]} for name in STANDARD_QUERIES
+        }, indent=2))
+        return
+
+    print(f"\n INDEX BENCHMARK (season {args.season}, best of {args.repeats})")
+    print("-" * 78)
+    print(f"{'query':<20}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}   top plan node")
+    for name in STANDARD_QUERIES:
+        b, a = before[name][0], after[name][0]
+        speedup = b / a if a > 0 else float("inf")
+        print(f"{name:<20}{b:>14.2f}{a:>14.2f}{speedup:>9.1f}x   {before[name][1]} -> {after[name][1]}")
+
+if __name__ == "__main__":
+    main()
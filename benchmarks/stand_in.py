@@ -0,0 +1,113 @@
+import csv
+import re
+
+# ==============================================================================
+# IN-MEMORY DATABASE STAND-IN
+# ==============================================================================
+# Just enough of a psycopg2 connection for ingest_season's load functions to
+# run without a server: inserts (executemany, COPY, staging INSERT ... SELECT)
+# land in Python lists, the match-id and entity-id lookups are answered from
+# them, and everything else (DDL, aggregate refresh) is accepted as a no-op.
+# It measures the Python side of the load (id resolution, tuple building, CSV
+# serialization), not PostgreSQL itself.
+# ==============================================================================
+
+INSERT_RE = re.compile(r"INSERT\s+INTO\s+(\w+)\s*\(([^)]*)\)", re.I)
+INSERT_SELECT_RE = re.compile(r"INSERT\s+INTO\s+(\w+)\s*\(([^)]*)\)\s*SELECT\s+.*?\s+FROM\s+(\w+)", re.I | re.S)
+COPY_RE = re.compile(r"COPY\s+(\w+)\s*\(([^)]*)\)", re.I)
+DIMENSION_INSERT_RE = re.compile(r"INSERT\s+INTO\s+(teams|players)\s*\((\w+),\s*name\)", re.I)
+DIMENSION_SELECT_RE = re.compile(r"SELECT\s+(\w+),\s*id\s+FROM\s+(teams|players)", re.I)
+MATCHES_SELECT_RE = re.compile(r"SELECT\s+id,\s*date,\s*home_team,\s*away_team(,\s*fingerprint)?\s+FROM\s+(\w+)", re.I)
+
+class MemoryCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def _store(self, table, columns, rows):
+        columns = [c.strip() for c in columns.split(",")]
+        target = self.db.tables.setdefault(table, [])
+        for row in rows:
+            record = dict(zip(columns, row))
+            if table.startswith("matches"):
+                record.setdefault("id", len(target) + 1)
+            target.append(record)
+
+    def execute(self, sql, params=None):
+        self.db.round_trips += 1
+        self.rows = []
+
+        match = DIMENSION_INSERT_RE.search(sql)
+        if match:
+            ids = self.db.dimensions.setdefault(match.group(1).lower(), {})
+            for key in params[0]:
+                ids.setdefault(key, len(ids) + 1)
+            return
+        match = DIMENSION_SELECT_RE.search(sql)
+        if match:
+            ids = self.db.dimensions.get(match.group(2).lower(), {})
+            self.rows = [(k, ids[k]) for k in params[0] if k in ids]
+            return
+        match = MATCHES_SELECT_RE.search(sql)
+        if match:
+            season = params[0] if params else None
+            self.rows = [
+                (m["id"], m["date"], m["home_team"], m["away_team"], m.get("fingerprint"))[:5 if match.group(1) else 4]
+                for m in self.db.tables.get(match.group(2), [])
+                if season is None or m["season"] == season
+            ]
+            return
+        match = INSERT_SELECT_RE.search(sql)
+        if match:
+            table, columns, source = match.groups()
+            staged = self.db.tables.pop(source, [])
+            cols = [c.strip() for c in columns.split(",")]
+            self._store(table, columns, [tuple(r[c] for c in cols) for r in staged])
+            return
+        # DDL, DELETE, aggregate refresh: accepted, nothing to emulate
+
+    def executemany(self, sql, rows):
+        rows = list(rows)
+        match = INSERT_RE.search(sql)
+        if match:
+            self._store(match.group(1), match.group(2), rows)
+        self.db.round_trips += len(rows)
+
+    def copy_expert(self, sql, buffer, size=8192):
+        self.db.round_trips += 1
+        match = COPY_RE.search(sql)
+        rows = [tuple(v if v != "" else None for v in r) for r in csv.reader(buffer)]
+        self._store(match.group(1), match.group(2), rows)
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def close(self):
+        pass
+
+class MemoryConnection:
+    """
+    Stand-in for a pooled psycopg2 connection (commit/rollback are no-ops).
+    """
+    def __init__(self):
+        self.tables = {}
+        self.dimensions = {}
+        self.round_trips = 0
+
+    def cursor(self):
+        return MemoryCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def row_counts(self):
+        return {table: len(rows) for table, rows in self.tables.items()}
@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# SYNTHETIC LA LIGA SEASONS
+# ==============================================================================
+# Generates the three source frames of a season in the shape the scrapers
+# return them (after reset_index), so ingest_season.transform_season can run
+# without network access:
+#   team_match_stats    -> one row per game (Understat spelling of the teams)
+#   player_match_stats  -> ~15 players per side
+#   lineup              -> ESPN rows with 'game' = 'YYYY-MM-DD Home-Away'
+# Noise knobs reproduce what the real sources do to the pipeline:
+#   name_variant_rate -> ESPN uses an alias spelling of the team (see aliases/teams.csv)
+#   date_shift_rate   -> ESPN lists the game one day off (rescheduled fixtures)
+#   junk_rate         -> blank cells in the count columns
+# ==============================================================================
+
+UNDERSTAT_TEAMS = [
+    "Real Madrid", "Barcelona", "Atletico Madrid", "Athletic Club", "Real Sociedad",
+    "Real Betis", "Villarreal", "Valencia", "Sevilla", "Girona",
+    "Osasuna", "Celta Vigo", "Rayo Vallecano", "Mallorca", "Getafe",
+    "Alaves", "Las Palmas", "Granada", "Cadiz", "Almeria",
+]
+
+# ESPN spellings that the alias table maps back to the Understat name
+ESPN_VARIANTS = {
+    "Atletico Madrid": "Atlético de Madrid",
+    "Alaves": "Deportivo Alavés",
+    "Almeria": "UD Almería",
+    "Cadiz": "Cádiz",
+    "Girona": "Girona FC",
+    "Granada": "Granada CF",
+}
+
+FIRST_NAMES = ["José", "Álvaro", "Iñaki", "Dani", "Pedro", "Jorge", "Raúl", "Sergio", "Luis", "Óscar",
+               "Marc", "Pau", "Iker", "Rubén", "Hugo", "Adrián", "Nico", "Mikel", "Javi", "Fran"]
+LAST_NAMES = ["García", "Martínez", "López", "Sánchez", "Pérez", "Gómez", "Fernández", "Ruiz", "Díaz",
+              "Moreno", "Muñoz", "Álvarez", "Romero", "Navarro", "Torres", "Domínguez", "Gil", "Vázquez",
+              "Ramos", "Serrano"]
+
+POSITIONS = ["Goalkeeper", "Right Back", "Center Back", "Center Back", "Left Back", "Defensive Midfielder",
+             "Center Midfielder", "Center Midfielder", "Right Winger", "Left Winger", "Forward"]
+
+SQUAD_SIZE = 25
+PLAYERS_PER_SIDE = 15   # 11 starters + 4 substitutes
+
+def round_robin(n_teams):
+    """
+    Double round robin (circle method): list of matchdays, each a list of (home, away) team indexes.
+    """
+    teams = list(range(n_teams))
+    first_half = []
+    for _ in range(n_teams - 1):
+        pairs = [(teams[i], teams[n_teams - 1 - i]) for i in range(n_teams // 2)]
+        first_half.append(pairs)
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+    return first_half + [[(a, h) for h, a in day] for day in first_half]
+
+def squads(rng, n_teams):
+    """
+    SQUAD_SIZE distinct player names per team.
+    """
+    pool = [f"{f} {l}" for f in FIRST_NAMES for l in LAST_NAMES]
+    order = rng.permutation(len(pool))
+    # Once the pool is used up, a suffix keeps the names unique
+    names = [pool[order[i % len(pool)]] + ("" if i < len(pool) else f" {i // len(pool) + 1}")
+             for i in range(n_teams * SQUAD_SIZE)]
+    return [names[t * SQUAD_SIZE:(t + 1) * SQUAD_SIZE] for t in range(n_teams)]
+
+def with_junk(rng, values, junk_rate):
+    """
+    Blank cells ('') in a count column, as the scraped frames sometimes have.
+    """
+    out = values.astype(object)
+    out[rng.random(len(values)) < junk_rate] = ""
+    return out
+
+def generate_season(season, n_teams=20, seed=0, name_variant_rate=0.5, date_shift_rate=0.03, junk_rate=0.01):
+    """
+    Returns (team_match_stats, player_match_stats, lineup) frames for one synthetic season.
+    """
+    year = int(str(season)[-4:]) if str(season)[-4:].isdigit() else 2023
+    rng = np.random.default_rng(seed * 10000 + year)
+    teams = UNDERSTAT_TEAMS[:n_teams]
+    squad = squads(rng, n_teams)
+    start = pd.Timestamp(f"{year}-08-11")
+
+    # --- MATCHES ---
+    fixtures = [(md, h, a) for md, day in enumerate(round_robin(n_teams)) for h, a in day]
+    n_games = len(fixtures)
+    matchday = np.array([f[0] for f in fixtures])
+    home_idx = np.array([f[1] for f in fixtures])
+    away_idx = np.array([f[2] for f in fixtures])
+    dates = start + pd.to_timedelta(matchday * 7 + rng.integers(0, 4, n_games), unit="D")
+    home_xg = rng.gamma(2.0, 0.7, n_games).round(6)
+    away_xg = rng.gamma(2.0, 0.55, n_games).round(6)
+    game_ids = year * 1000 + np.arange(n_games)
+
+    matches = pd.DataFrame({
+        "game_id": game_ids,
+        "date": dates,
+        "home_team": np.array(teams)[home_idx],
+        "away_team": np.array(teams)[away_idx],
+        "home_goals": rng.poisson(home_xg),
+        "away_goals": rng.poisson(away_xg),
+        "home_xg": home_xg,
+        "away_xg": away_xg,
+    })
+
+    # --- PLAYERS (Understat): PLAYERS_PER_SIDE rows per side ---
+    side_game = np.repeat(np.arange(n_games), 2)
+    side_team = np.column_stack([home_idx, away_idx]).ravel()
+    row_game = np.repeat(side_game, PLAYERS_PER_SIDE)
+    row_team = np.repeat(side_team, PLAYERS_PER_SIDE)
+    slot = np.tile(np.arange(PLAYERS_PER_SIDE), len(side_game))
+    # Each side fields a random subset of its squad
+    picks = np.argsort(rng.random((len(side_game), SQUAD_SIZE)), axis=1)[:, :PLAYERS_PER_SIDE].ravel()
+    player_names = np.array([squad[t][p] for t, p in zip(row_team, picks)])
+    n_rows = len(row_game)
+    starter = slot < 11
+    minutes = np.where(starter, rng.integers(55, 91, n_rows), rng.integers(1, 35, n_rows))
+
+    players = pd.DataFrame({
+        "league": "ESP-La Liga",
+        "season": season,
+        "game_id": game_ids[row_game],
+        "team": np.array(teams)[row_team],
+        "player": player_names,
+        "position": np.array(POSITIONS + ["Substitute"] * 4)[slot],
+        "minutes": minutes,
+        "goals": with_junk(rng, rng.poisson(0.1, n_rows), junk_rate),
+        "assists": rng.poisson(0.07, n_rows),
+        "shots": with_junk(rng, rng.poisson(0.8, n_rows), junk_rate),
+        "xg": rng.gamma(0.5, 0.2, n_rows),
+        "xa": rng.gamma(0.4, 0.15, n_rows),
+        "xg_chain": rng.gamma(0.8, 0.3, n_rows),
+        "xg_buildup": rng.gamma(0.6, 0.2, n_rows),
+        "key_passes": rng.poisson(0.6, n_rows),
+        "yellow_cards": rng.binomial(1, 0.12, n_rows),
+        "red_cards": rng.binomial(1, 0.005, n_rows),
+    })
+
+    # --- LINEUPS (ESPN): same players, ESPN spellings and dates ---
+    espn_team_names = np.array([
+        ESPN_VARIANTS.get(t, t) if rng.random() < name_variant_rate else t for t in teams
+    ])
+    shifted = rng.random(n_games) < date_shift_rate
+    espn_dates = (dates + pd.to_timedelta(np.where(shifted, 1, 0), unit="D")).strftime("%Y-%m-%d")
+    games = np.char.add(np.char.add(np.asarray(espn_dates, dtype=str), " "),
+                        np.char.add(np.char.add(espn_team_names[home_idx], "-"), espn_team_names[away_idx]))
+
+    lineups = pd.DataFrame({
+        "league": "ESP-La Liga",
+        "season": season,
+        "game": games[row_game],
+        "team": espn_team_names[row_team],
+        "player": player_names,
+        "position": players["position"].to_numpy(),
+        "shots_on_target": with_junk(rng, rng.poisson(0.3, n_rows), junk_rate),
+        "fouls_committed": with_junk(rng, rng.poisson(0.9, n_rows), junk_rate),
+        "fouls_suffered": rng.poisson(0.9, n_rows),
+        "offsides": rng.poisson(0.1, n_rows),
+        "saves": np.where(slot == 0, rng.poisson(3, n_rows), 0),
+        "goals_conceded": np.where(slot == 0, rng.poisson(1.2, n_rows), 0),
+    })
+    return matches, players, lineups
+
+def generate_seasons(n_seasons, first_season=2023, **kwargs):
+    """
+    {season: (team_match_stats, player_match_stats, lineup)} for n consecutive seasons.
+    """
+    return {str(first_season - i): generate_season(str(first_season - i), **kwargs) for i in range(n_seasons)}
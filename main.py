@@ -2,7 +2,13 @@ import argparse
 import sys
 import time
 from modules.reset_db import reset_database
-from modules.ingest_season import run_ingestion
+from modules.ingest_season import run_ingestion, get_db_connection, CHUNK_SIZE
+from modules.loaders import LOADERS
+from modules.migrations import print_status, MigrationError
+from modules.lineup_matching import DATE_TOLERANCE_DAYS
+from modules.metrics import DEFAULT_METRICS_PATH, DEFAULT_PROFILE_DIR
+from modules.export import export_seasons, DEFAULT_EXPORT_DIR, EXPORT_METHODS
+from modules.backends import BACKENDS, configure as configure_backend, get_backend
 
 # ==============================================================================
 # SPANISH FOOTBALL ANALYTICS - MASTER ORCHESTRATOR
@@ -11,6 +17,22 @@ from modules.ingest_season import run_ingestion
 #   python main.py --reset --seasons 2022 2023   (Reset DB + Load specific years)
 #   python main.py --seasons 2024                (Just append 2024)
 #   python main.py --reset                       (Just wipe DB)
+#   python main.py --migrate                     (Apply pending schema migrations in place)
+#   python main.py --seasons 2023 --loader copy  (Bulk load via COPY FROM STDIN)
+#   python main.py --seasons 2023 --offline      (Load from the raw cache, no scraping)
+#   python main.py --seasons 2023 --refresh      (Re-scrape even if the raw cache is fresh)
+#   python main.py --seasons 2024 --incremental  (Only load new/changed matches)
+#   python main.py --seasons 2023 --swap-partitions
+#                                                (Rebuild a season offline, attach atomically)
+#   python main.py --seasons 2019 2020 2021 --workers 3 --writers 2
+#                                                (Scrape seasons in parallel processes)
+#   python main.py --seasons 2023 --chunk-size 2000
+#                                                (Smaller insert batches for small containers)
+#   python main.py --seasons 2023 --profile      (Per-stage metrics + cProfile dumps in data/profiles)
+#   python main.py --export                      (Parquet snapshot of every season in data/export)
+#   python main.py --backend duckdb --seasons 2023
+#                                                (Embedded DuckDB warehouse, no database server)
+#   python main.py --export --export-seasons 2022 2023
 # ==============================================================================
 
 def main():
@@ -24,6 +46,13 @@ def main():
         help="WARNING: Wipes the entire database before processing."
     )
     
+    # Argument: --migrate (Flag)
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Apply pending schema migrations (migrations/*.sql) in place, without dropping data."
+    )
+
     # Argument: --seasons (List of strings)
     parser.add_argument(
         "--seasons", 
@@ -32,7 +61,138 @@ def main():
         help="List of seasons to ingest (e.g., 2022 2023). If empty, no data is loaded."
     )
 
+    # Argument: --loader (Insert strategy)
+    parser.add_argument(
+        "--loader",
+        choices=LOADERS,
+        default="executemany",
+        help="Insert strategy: 'executemany' (row-by-row INSERT) or 'copy' (bulk COPY FROM STDIN)."
+    )
+
+    # Argument: --offline / --refresh (Raw cache use, mutually exclusive)
+    raw_cache = parser.add_mutually_exclusive_group()
+    raw_cache.add_argument(
+        "--offline",
+        action="store_true",
+        help="Never scrape: serve every source frame from the local raw cache (data/raw_cache)."
+    )
+    raw_cache.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Always scrape: replace the raw cache entries of the ingested seasons, even fresh ones."
+    )
+
+    # Argument: --source-dir (Local file-backed sources)
+    parser.add_argument(
+        "--source-dir",
+        default=None,
+        help="Read the source frames from <dir>/<source>/<season>/<frame>.parquet instead of scraping."
+    )
+
+    # Argument: --incremental / --swap-partitions (Load mode, mutually exclusive)
+    load_mode = parser.add_mutually_exclusive_group()
+    load_mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Matchday delta mode: only write matches that are new or changed since the last load."
+    )
+    load_mode.add_argument(
+        "--swap-partitions",
+        action="store_true",
+        help="Load each season into detached partitions and attach them atomically (replaces the season)."
+    )
+
+    # Argument: --workers / --writers (Parallel multi-season mode)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes scraping/transforming seasons in parallel (1 = sequential)."
+    )
+    parser.add_argument(
+        "--writers",
+        type=int,
+        default=2,
+        help="Maximum number of concurrent DB writer connections when --workers > 1."
+    )
+
+    # Argument: --lineup-tolerance (Days)
+    parser.add_argument(
+        "--lineup-tolerance",
+        type=int,
+        default=DATE_TOLERANCE_DAYS,
+        help="Max days an ESPN lineup date may differ from the Understat date (suspended/rescheduled games)."
+    )
+
+    # Argument: --chunk-size (Rows)
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help="Rows per insert batch: payloads are converted and flushed in chunks to bound memory."
+    )
+
+    # Argument: --metrics / --profile (Instrumentation)
+    parser.add_argument(
+        "--metrics",
+        default=DEFAULT_METRICS_PATH,
+        help="JSON-lines file receiving one record per ETL stage (rows, rows/sec, peak RSS, DB round-trips)."
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=DEFAULT_PROFILE_DIR,
+        default=None,
+        help=f"Write a cProfile dump per stage (default directory: {DEFAULT_PROFILE_DIR})."
+    )
+
+    # Argument: --no-features (Feature store)
+    parser.add_argument(
+        "--no-features",
+        action="store_true",
+        help="Skip the feature-store update (rolling form, per-90 rates, availability) after the load."
+    )
+
+    # Argument: --backend / --duckdb-path (Storage backend)
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=None,
+        help="Storage backend: 'postgres' (default, from .env) or 'duckdb' (embedded file, see --duckdb-path)."
+    )
+    parser.add_argument(
+        "--duckdb-path",
+        default=None,
+        help="DuckDB database file (default: DUCKDB_PATH or data/warehouse.duckdb)."
+    )
+
+    # Argument: --export (Parquet snapshots)
+    parser.add_argument(
+        "--export",
+        nargs="?",
+        const=DEFAULT_EXPORT_DIR,
+        default=None,
+        help=f"Export matches/player_stats/lineups per season to Parquet (default directory: {DEFAULT_EXPORT_DIR})."
+    )
+    parser.add_argument(
+        "--export-seasons",
+        nargs="+",
+        default=None,
+        help="Seasons to export (default: the ingested seasons, or every season in the warehouse)."
+    )
+    parser.add_argument(
+        "--export-method",
+        choices=EXPORT_METHODS,
+        default="copy",
+        help="'copy' (COPY TO STDOUT, converted by Arrow) or 'cursor' (server-side cursor batches)."
+    )
+
     args = parser.parse_args()
+    configure_backend(args.backend, args.duckdb_path)
+    backend = get_backend()
+    if args.export and backend.name != "postgres":
+        parser.error("--export reads from PostgreSQL (COPY TO / server-side cursors), "
+                     f"not from the '{backend.name}' backend.")
 
     # 2. EXECUTE LOGIC
     print("\nSPANISH FOOTBALL PIPELINE")
@@ -50,21 +210,54 @@ def main():
             if not args.seasons:
                 sys.exit(0)
 
-    # Step B: Ingest Seasons (if requested)
+    # Step B: Migrate Schema (if requested)
+    if args.migrate:
+        print("\n[ACTION] Applying Schema Migrations...")
+        conn = get_db_connection()
+        try:
+            applied = backend.ensure_schema(conn)
+            if backend.name == "postgres":
+                print_status(conn)
+        except MigrationError as e:
+            print(f"[ERROR] Migration aborted: {e}")
+            sys.exit(1)
+        finally:
+            conn.close()
+        print(f"[OK] {len(applied)} migration(s) applied.")
+
+    # Step C: Ingest Seasons (if requested)
     if args.seasons:
         print(f"\n[ACTION] Starting Ingestion for seasons: {args.seasons}")
         
+        mode = "incremental" if args.incremental else "swap" if args.swap_partitions else "full"
         try:
-            run_ingestion(seasons=args.seasons)
+            results = run_ingestion(
+                seasons=args.seasons, loader=args.loader, offline=args.offline,
+                workers=args.workers, writers=args.writers, mode=mode,
+                lineup_tolerance_days=args.lineup_tolerance, chunk_size=args.chunk_size,
+                metrics_path=args.metrics, profile_dir=args.profile, source_dir=args.source_dir,
+                features=not args.no_features, refresh=args.refresh
+            )
         except TypeError:
              print("[ERROR] Your ingest_season.py needs to accept a 'seasons' argument.")
              print("Please update ingest_season.py first.")
              sys.exit(1)
-             
+
+        failed = [s for s, status in results.items() if status != "OK"]
+        if failed:
+            print(f"\n[ERROR] Pipeline finished with failed seasons: {failed}")
+            sys.exit(1)
         print("\n[SUCCESS] Pipeline Execution Finished.")
-    else:
-        if not args.reset:
-            print("[INFO] No actions selected. Use --help to see options.")
+
+    # Step D: Export Parquet Snapshots (if requested)
+    if args.export:
+        seasons = args.export_seasons or args.seasons or None
+        print(f"\n[ACTION] Exporting {seasons or 'all seasons'} to {args.export} ({args.export_method})...")
+        export_seasons(seasons, export_dir=args.export, method=args.export_method)
+        print("[OK] Export complete.")
+
+    if not (args.seasons or args.reset or args.migrate or args.export):
+        print("[INFO] No actions selected. Use --help to see options.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
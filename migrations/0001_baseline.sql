@@ -0,0 +1,56 @@
+-- =============================================================================
+-- 0001 BASELINE
+-- The original three-table warehouse. IF NOT EXISTS makes this a no-op on a
+-- database that was created by the old reset_db.py, so existing warehouses can
+-- adopt migrations without a reset.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS matches (
+    id SERIAL PRIMARY KEY,
+    season VARCHAR(10) NOT NULL,
+    date DATE NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_score INT,
+    away_score INT,
+    home_xg NUMERIC,
+    away_xg NUMERIC,
+    UNIQUE(season, date, home_team, away_team)
+);
+
+CREATE TABLE IF NOT EXISTS player_stats (
+    id SERIAL PRIMARY KEY,
+    match_id INT REFERENCES matches(id) ON DELETE CASCADE,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    minutes INT,
+    goals INT,
+    assists INT,
+    shots INT,
+    xg NUMERIC,
+    xa NUMERIC,
+    xg_chain NUMERIC,
+    xg_buildup NUMERIC,
+    key_passes INT,
+    yellow_card INT,
+    red_card INT
+);
+
+CREATE TABLE IF NOT EXISTS lineups (
+    id SERIAL PRIMARY KEY,
+    match_id INT REFERENCES matches(id) ON DELETE CASCADE,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    position TEXT,
+    is_starter BOOLEAN,
+    shots_on_target INT,
+    fouls_committed INT,
+    fouls_suffered INT,
+    offsides INT,
+    saves INT,
+    goals_conceded INT
+);
+
+CREATE INDEX IF NOT EXISTS idx_matches_season ON matches(season);
+CREATE INDEX IF NOT EXISTS idx_matches_date ON matches(date);
+CREATE INDEX IF NOT EXISTS idx_player_stats_name ON player_stats(player_name);
@@ -0,0 +1,7 @@
+-- =============================================================================
+-- 0002 MATCH FINGERPRINT
+-- Hash of the match row + its child rows, used by the incremental loader to
+-- detect new or changed matches.
+-- =============================================================================
+
+ALTER TABLE matches ADD COLUMN IF NOT EXISTS fingerprint TEXT;
@@ -0,0 +1,28 @@
+-- =============================================================================
+-- 0003 INDEXES AND NATURAL KEYS
+-- FK indexes on the child tables, unique natural keys for idempotent upserts
+-- and covering indexes for the season / team / player aggregations.
+-- =============================================================================
+
+-- Older non-idempotent loads may have duplicated child rows: keep the first one
+DELETE FROM player_stats a USING player_stats b
+WHERE a.id > b.id AND a.match_id = b.match_id AND a.team = b.team AND a.player_name = b.player_name;
+
+DELETE FROM lineups a USING lineups b
+WHERE a.id > b.id AND a.match_id = b.match_id AND a.team = b.team AND a.player_name = b.player_name;
+
+-- FK indexes
+CREATE INDEX IF NOT EXISTS idx_player_stats_match_id ON player_stats(match_id);
+CREATE INDEX IF NOT EXISTS idx_lineups_match_id ON lineups(match_id);
+
+-- Natural keys
+CREATE UNIQUE INDEX IF NOT EXISTS uq_player_stats_match_team_player ON player_stats(match_id, team, player_name);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_lineups_match_team_player ON lineups(match_id, team, player_name);
+
+-- Covering indexes
+CREATE INDEX IF NOT EXISTS idx_matches_season_results ON matches(season)
+    INCLUDE (id, home_team, away_team, home_score, away_score);
+CREATE INDEX IF NOT EXISTS idx_player_stats_player_team ON player_stats(player_name, team)
+    INCLUDE (minutes, goals, xg, xg_buildup);
+CREATE INDEX IF NOT EXISTS idx_lineups_team ON lineups(team)
+    INCLUDE (match_id, fouls_committed);
@@ -0,0 +1,134 @@
+-- =============================================================================
+-- 0004 PARTITION BY SEASON
+-- Carries 'season' on the child tables and rebuilds matches, player_stats and
+-- lineups as tables declaratively partitioned by LIST (season), one partition
+-- per season (matches_s2023, player_stats_s2023, lineups_s2023, ...).
+-- Existing rows are copied across with their ids, so match_id links survive.
+-- Primary, unique and foreign keys include 'season' (required for partitioned
+-- tables), which also lets every season-scoped query prune to one partition.
+-- =============================================================================
+
+-- 1. Keep the current data aside
+CREATE TEMP TABLE legacy_matches AS SELECT * FROM matches;
+CREATE TEMP TABLE legacy_player_stats AS
+    SELECT m.season, ps.* FROM player_stats ps JOIN matches m ON m.id = ps.match_id;
+CREATE TEMP TABLE legacy_lineups AS
+    SELECT m.season, l.* FROM lineups l JOIN matches m ON m.id = l.match_id;
+
+DROP TABLE lineups CASCADE;
+DROP TABLE player_stats CASCADE;
+DROP TABLE matches CASCADE;
+
+-- 2. Partitioned tables
+CREATE TABLE matches (
+    id SERIAL,
+    season VARCHAR(10) NOT NULL,
+    date DATE NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_score INT,
+    away_score INT,
+    home_xg NUMERIC,
+    away_xg NUMERIC,
+    fingerprint TEXT,
+    PRIMARY KEY (season, id),
+    UNIQUE (season, date, home_team, away_team)
+) PARTITION BY LIST (season);
+
+CREATE TABLE player_stats (
+    id SERIAL,
+    season VARCHAR(10) NOT NULL,
+    match_id INT NOT NULL,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    minutes INT,
+    goals INT,
+    assists INT,
+    shots INT,
+    xg NUMERIC,
+    xa NUMERIC,
+    xg_chain NUMERIC,
+    xg_buildup NUMERIC,
+    key_passes INT,
+    yellow_card INT,
+    red_card INT,
+    PRIMARY KEY (season, id),
+    FOREIGN KEY (season, match_id) REFERENCES matches(season, id) ON DELETE CASCADE
+) PARTITION BY LIST (season);
+
+CREATE TABLE lineups (
+    id SERIAL,
+    season VARCHAR(10) NOT NULL,
+    match_id INT NOT NULL,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    position TEXT,
+    is_starter BOOLEAN,
+    shots_on_target INT,
+    fouls_committed INT,
+    fouls_suffered INT,
+    offsides INT,
+    saves INT,
+    goals_conceded INT,
+    PRIMARY KEY (season, id),
+    FOREIGN KEY (season, match_id) REFERENCES matches(season, id) ON DELETE CASCADE
+) PARTITION BY LIST (season);
+
+-- 3. Partition helper, also called by the ingestion before loading a new season
+CREATE OR REPLACE FUNCTION ensure_season_partitions(p_season TEXT) RETURNS void AS $$
+DECLARE
+    suffix TEXT := regexp_replace(p_season, '[^0-9A-Za-z]', '_', 'g');
+    parent TEXT;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY['matches', 'player_stats', 'lineups'] LOOP
+        IF to_regclass(parent || '_s' || suffix) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES IN (%L)',
+                           parent || '_s' || suffix, parent, p_season);
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_season_partitions(season) FROM (SELECT DISTINCT season FROM legacy_matches) s;
+
+-- 4. Copy the data back (ids preserved)
+INSERT INTO matches (id, season, date, home_team, away_team, home_score, away_score, home_xg, away_xg, fingerprint)
+SELECT id, season, date, home_team, away_team, home_score, away_score, home_xg, away_xg, fingerprint
+FROM legacy_matches;
+
+INSERT INTO player_stats (id, season, match_id, team, player_name, minutes, goals, assists, shots,
+                          xg, xa, xg_chain, xg_buildup, key_passes, yellow_card, red_card)
+SELECT id, season, match_id, team, player_name, minutes, goals, assists, shots,
+       xg, xa, xg_chain, xg_buildup, key_passes, yellow_card, red_card
+FROM legacy_player_stats;
+
+INSERT INTO lineups (id, season, match_id, team, player_name, position, is_starter, shots_on_target,
+                     fouls_committed, fouls_suffered, offsides, saves, goals_conceded)
+SELECT id, season, match_id, team, player_name, position, is_starter, shots_on_target,
+       fouls_committed, fouls_suffered, offsides, saves, goals_conceded
+FROM legacy_lineups;
+
+SELECT setval(pg_get_serial_sequence('matches', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM matches;
+SELECT setval(pg_get_serial_sequence('player_stats', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM player_stats;
+SELECT setval(pg_get_serial_sequence('lineups', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM lineups;
+
+DROP TABLE legacy_lineups;
+DROP TABLE legacy_player_stats;
+DROP TABLE legacy_matches;
+
+-- 5. Indexes (created on the parents, cascaded to every partition)
+CREATE INDEX idx_matches_date ON matches(date);
+CREATE INDEX idx_player_stats_name ON player_stats(player_name);
+
+CREATE INDEX idx_player_stats_match_id ON player_stats(season, match_id);
+CREATE INDEX idx_lineups_match_id ON lineups(season, match_id);
+
+CREATE UNIQUE INDEX uq_player_stats_match_team_player ON player_stats(season, match_id, team, player_name);
+CREATE UNIQUE INDEX uq_lineups_match_team_player ON lineups(season, match_id, team, player_name);
+
+CREATE INDEX idx_matches_season_results ON matches(season)
+    INCLUDE (id, home_team, away_team, home_score, away_score);
+CREATE INDEX idx_player_stats_player_team ON player_stats(player_name, team)
+    INCLUDE (minutes, goals, xg, xg_buildup);
+CREATE INDEX idx_lineups_team ON lineups(team)
+    INCLUDE (match_id, fouls_committed);
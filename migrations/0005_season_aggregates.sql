@@ -0,0 +1,117 @@
+-- =============================================================================
+-- 0005 SEASON AGGREGATES
+-- Precomputed league table, player-season and team-season totals. They are
+-- plain tables rather than MATERIALIZED VIEWs so a single season can be
+-- refreshed on its own: refresh_season_aggregates('2023') rebuilds only that
+-- season's rows, and the ingestion calls it inside each season's load
+-- transaction.
+-- =============================================================================
+
+CREATE TABLE agg_standings (
+    season VARCHAR(10) NOT NULL,
+    team TEXT NOT NULL,
+    position INT NOT NULL,
+    played INT NOT NULL,
+    won INT NOT NULL,
+    drawn INT NOT NULL,
+    lost INT NOT NULL,
+    gf INT NOT NULL,
+    ga INT NOT NULL,
+    gd INT NOT NULL,
+    points INT NOT NULL,
+    xg_for NUMERIC,
+    xg_against NUMERIC,
+    PRIMARY KEY (season, team)
+);
+
+CREATE TABLE agg_player_season (
+    season VARCHAR(10) NOT NULL,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    matches INT NOT NULL,
+    minutes INT,
+    goals INT,
+    assists INT,
+    shots INT,
+    xg NUMERIC,
+    xa NUMERIC,
+    xg_chain NUMERIC,
+    xg_buildup NUMERIC,
+    key_passes INT,
+    yellow_cards INT,
+    red_cards INT,
+    PRIMARY KEY (season, team, player_name)
+);
+
+CREATE TABLE agg_team_season (
+    season VARCHAR(10) NOT NULL,
+    team TEXT NOT NULL,
+    games_played INT NOT NULL,
+    total_fouls INT,
+    avg_fouls_per_game NUMERIC,
+    fouls_suffered INT,
+    shots_on_target INT,
+    saves INT,
+    goals INT,
+    xg NUMERIC,
+    xa NUMERIC,
+    xg_buildup NUMERIC,
+    PRIMARY KEY (season, team)
+);
+
+CREATE INDEX idx_agg_player_season_player ON agg_player_season(player_name, team);
+
+CREATE OR REPLACE FUNCTION refresh_season_aggregates(p_season TEXT) RETURNS void AS $$
+BEGIN
+    DELETE FROM agg_standings WHERE season = p_season;
+    DELETE FROM agg_player_season WHERE season = p_season;
+    DELETE FROM agg_team_season WHERE season = p_season;
+
+    -- League table: one row per team and side, so teams that only appear home
+    -- or away (partial seasons) are still counted.
+    INSERT INTO agg_standings (season, team, position, played, won, drawn, lost, gf, ga, gd, points, xg_for, xg_against)
+    SELECT p_season, team,
+           RANK() OVER (ORDER BY SUM(3 * w + d) DESC, SUM(gf) - SUM(ga) DESC, SUM(gf) DESC),
+           COUNT(*), SUM(w), SUM(d), SUM(l), SUM(gf), SUM(ga), SUM(gf) - SUM(ga), SUM(3 * w + d),
+           SUM(xgf), SUM(xga)
+    FROM (
+        SELECT home_team AS team, home_score AS gf, away_score AS ga, home_xg AS xgf, away_xg AS xga,
+               (home_score > away_score)::int AS w, (home_score = away_score)::int AS d,
+               (home_score < away_score)::int AS l
+        FROM matches WHERE season = p_season
+        UNION ALL
+        SELECT away_team, away_score, home_score, away_xg, home_xg,
+               (away_score > home_score)::int, (away_score = home_score)::int,
+               (away_score < home_score)::int
+        FROM matches WHERE season = p_season
+    ) sides
+    GROUP BY team;
+
+    INSERT INTO agg_player_season (season, team, player_name, matches, minutes, goals, assists, shots,
+                                   xg, xa, xg_chain, xg_buildup, key_passes, yellow_cards, red_cards)
+    SELECT p_season, team, player_name, COUNT(*), SUM(minutes), SUM(goals), SUM(assists), SUM(shots),
+           SUM(xg), SUM(xa), SUM(xg_chain), SUM(xg_buildup), SUM(key_passes), SUM(yellow_card), SUM(red_card)
+    FROM player_stats WHERE season = p_season
+    GROUP BY team, player_name;
+
+    INSERT INTO agg_team_season (season, team, games_played, total_fouls, avg_fouls_per_game, fouls_suffered,
+                                 shots_on_target, saves, goals, xg, xa, xg_buildup)
+    SELECT p_season, COALESCE(l.team, p.team), COALESCE(l.games, p.games),
+           l.fouls, ROUND(l.fouls::numeric / NULLIF(l.games, 0), 2), l.fouls_suffered,
+           l.shots_on_target, l.saves, p.goals, p.xg, p.xa, p.xg_buildup
+    FROM (
+        SELECT team, COUNT(DISTINCT match_id) AS games, SUM(fouls_committed) AS fouls,
+               SUM(fouls_suffered) AS fouls_suffered, SUM(shots_on_target) AS shots_on_target,
+               SUM(saves) AS saves
+        FROM lineups WHERE season = p_season GROUP BY team
+    ) l
+    FULL OUTER JOIN (
+        SELECT team, COUNT(DISTINCT match_id) AS games, SUM(goals) AS goals, SUM(xg) AS xg,
+               SUM(xa) AS xa, SUM(xg_buildup) AS xg_buildup
+        FROM player_stats WHERE season = p_season GROUP BY team
+    ) p ON l.team = p.team;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill every season already in the warehouse
+SELECT refresh_season_aggregates(season) FROM (SELECT DISTINCT season FROM matches) s;
@@ -0,0 +1,29 @@
+-- =============================================================================
+-- 0006 ENTITY DIMENSIONS
+-- Stable integer ids for teams and players, shared by both sources.
+--   teams.team_key     -> canonical team name (after the alias table)
+--   players.player_key -> accent/case/punctuation-insensitive player name
+-- player_stats and lineups reference them through team_id / player_id.
+-- Rows loaded before this migration keep NULL ids until their season is
+-- re-ingested.
+-- =============================================================================
+
+CREATE TABLE teams (
+    id SERIAL PRIMARY KEY,
+    team_key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE players (
+    id SERIAL PRIMARY KEY,
+    player_key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+
+ALTER TABLE player_stats ADD COLUMN team_id INT REFERENCES teams(id);
+ALTER TABLE player_stats ADD COLUMN player_id INT REFERENCES players(id);
+ALTER TABLE lineups ADD COLUMN team_id INT REFERENCES teams(id);
+ALTER TABLE lineups ADD COLUMN player_id INT REFERENCES players(id);
+
+CREATE INDEX idx_player_stats_player_id ON player_stats(player_id);
+CREATE INDEX idx_lineups_player_id ON lineups(player_id);
@@ -0,0 +1,23 @@
+-- =============================================================================
+-- 0007 DATA VERSIONS
+-- One counter per season, bumped by every load that writes the season (in the
+-- same transaction as the data). The query result cache (modules/result_cache.py)
+-- keys its entries on these counters, so a cached result is only invalidated
+-- when one of the seasons it reads has changed.
+-- =============================================================================
+
+CREATE TABLE data_versions (
+    season VARCHAR(10) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION bump_data_version(p_season TEXT) RETURNS BIGINT AS $$
+    INSERT INTO data_versions (season) VALUES (p_season)
+    ON CONFLICT (season) DO UPDATE
+        SET version = data_versions.version + 1, updated_at = now()
+    RETURNING version;
+$$ LANGUAGE sql;
+
+-- Every season already in the warehouse starts at version 1
+INSERT INTO data_versions (season) SELECT DISTINCT season FROM matches;
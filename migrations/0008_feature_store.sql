@@ -0,0 +1,69 @@
+-- =============================================================================
+-- 0008 FEATURE STORE
+-- Pre-match model features, computed by modules/features.py after each
+-- ingestion. Every value only uses matches played BEFORE the match it
+-- describes (same season), so the rows can be used for training without
+-- leaking the result.
+--   feat_team_match   -> rolling form per team and match (last N matches)
+--   feat_player_match -> season-to-date per-90 rates per player and match
+--   feat_match        -> one pre-joined row per match (home and away side)
+-- =============================================================================
+
+CREATE TABLE feat_team_match (
+    season VARCHAR(10) NOT NULL,
+    match_id INT NOT NULL,
+    date DATE NOT NULL,
+    team TEXT NOT NULL,
+    is_home BOOLEAN NOT NULL,
+    prior_matches INT NOT NULL,
+    form_points REAL,
+    form_gf REAL,
+    form_ga REAL,
+    form_xg_for REAL,
+    form_xg_against REAL,
+    availability REAL,
+    PRIMARY KEY (season, match_id, team)
+);
+
+CREATE TABLE feat_player_match (
+    season VARCHAR(10) NOT NULL,
+    match_id INT NOT NULL,
+    date DATE NOT NULL,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    player_id INT,
+    prior_minutes INT NOT NULL,
+    xg_p90 REAL,
+    xa_p90 REAL,
+    xg_chain_p90 REAL,
+    key_passes_p90 REAL,
+    PRIMARY KEY (season, match_id, team, player_name)
+);
+
+CREATE TABLE feat_match (
+    season VARCHAR(10) NOT NULL,
+    match_id INT NOT NULL,
+    date DATE NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_prior_matches INT,
+    home_form_points REAL,
+    home_form_xg_for REAL,
+    home_form_xg_against REAL,
+    home_availability REAL,
+    home_xi_xg_p90 REAL,
+    away_prior_matches INT,
+    away_form_points REAL,
+    away_form_xg_for REAL,
+    away_form_xg_against REAL,
+    away_availability REAL,
+    away_xi_xg_p90 REAL,
+    home_score INT,
+    away_score INT,
+    fingerprint TEXT,
+    PRIMARY KEY (season, match_id)
+);
+
+CREATE INDEX idx_feat_team_match_date ON feat_team_match(season, date);
+CREATE INDEX idx_feat_player_match_date ON feat_player_match(season, date);
+CREATE INDEX idx_feat_match_date ON feat_match(season, date);
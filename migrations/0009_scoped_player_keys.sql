@@ -0,0 +1,36 @@
+-- =============================================================================
+-- 0009 SCOPED PLAYER KEYS
+-- players.player_key becomes 'team_key|name key' (modules/entities.py): keyed
+-- by name alone, namesakes at different clubs shared one player_id.
+-- Existing ids are rewritten, not cleared: every (old player, team) pair in
+-- player_stats / lineups gets its own players row and the rows are pointed at
+-- it. The old name-only rows are removed once nothing references them.
+-- =============================================================================
+
+INSERT INTO players (player_key, name)
+SELECT DISTINCT r.team_key || '|' || p.player_key, p.name
+FROM (
+    SELECT ps.player_id, COALESCE(t.team_key, ps.team) AS team_key
+    FROM player_stats ps LEFT JOIN teams t ON t.id = ps.team_id
+    WHERE ps.player_id IS NOT NULL
+    UNION
+    SELECT l.player_id, COALESCE(t.team_key, l.team)
+    FROM lineups l LEFT JOIN teams t ON t.id = l.team_id
+    WHERE l.player_id IS NOT NULL
+) r
+JOIN players p ON p.id = r.player_id
+ON CONFLICT (player_key) DO NOTHING;
+
+UPDATE player_stats ps
+SET player_id = n.id
+FROM players o, players n
+WHERE o.id = ps.player_id
+  AND n.player_key = COALESCE((SELECT t.team_key FROM teams t WHERE t.id = ps.team_id), ps.team) || '|' || o.player_key;
+
+UPDATE lineups l
+SET player_id = n.id
+FROM players o, players n
+WHERE o.id = l.player_id
+  AND n.player_key = COALESCE((SELECT t.team_key FROM teams t WHERE t.id = l.team_id), l.team) || '|' || o.player_key;
+
+DELETE FROM players WHERE position('|' IN player_key) = 0;
@@ -0,0 +1,43 @@
+from modules.result_cache import cached_query
+from modules.standings import apply_positions
+
+# ==============================================================================
+# SEASON AGGREGATES (READ API)
+# ==============================================================================
+# Python access to the precomputed tables built by migration 0005:
+#   agg_standings      -> league table per season (positions from modules/standings.py)
+#   agg_player_season  -> per-player season totals (xG, xA, xGBuildup, ...)
+#   agg_team_season    -> per-team season totals (fouls per game, xG, ...)
+# The ingestion refreshes them for every season it writes, so these reads are
+# primary-key lookups instead of aggregations over the raw rows. The reads are
+# prepared catalog queries (modules/queries.py) returning typed frames, served
+# from the result cache (modules/result_cache.py) until their season changes.
+# ==============================================================================
+
+def refresh_aggregates(cur, season):
+    """
+    Rebuilds one season's aggregate rows. Called inside the season's load
+    transaction, so the aggregates commit (or roll back) together with the data.
+    League positions are then set by the standings engine (head-to-head tiebreakers).
+    """
+    cur.execute("SELECT refresh_season_aggregates(%s);", (season,))
+    apply_positions(cur, season)
+
+def read_standings(season):
+    """
+    League table for one season, ordered by position.
+    """
+    return cached_query("standings", season=str(season))
+
+def read_player_season(season=None, team=None, min_minutes=0):
+    """
+    Player season totals. Without a season, every season is returned (one row per season).
+    """
+    return cached_query("player_season", season=None if season is None else str(season),
+                        team=team, min_minutes=min_minutes)
+
+def read_team_season(season=None):
+    """
+    Team season totals (fouls per game, xG, ...). Without a season, every season is returned.
+    """
+    return cached_query("team_season", season=None if season is None else str(season))
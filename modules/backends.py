@@ -0,0 +1,287 @@
+import io
+import os
+import re
+import threading
+import pandas as pd
+from dotenv import load_dotenv
+from modules.migrations import migrate
+from modules.loaders import rows_to_csv_buffer
+from modules.utils import get_raw_connection
+
+# ==============================================================================
+# STORAGE BACKENDS
+# ==============================================================================
+# Where the warehouse lives (STORAGE_BACKEND, or main.py --backend):
+#   postgres -> the pooled PostgreSQL connection from .env (default); schema from
+#               the versioned migrations
+#   duckdb   -> an embedded DuckDB file (DUCKDB_PATH), no server needed; schema
+#               from schema_duckdb.sql
+# The loaders, query catalog and integrity engine talk to a psycopg2-style
+# connection (cursor / execute / executemany / copy_expert / commit).
+# DuckDBConnection provides that interface on top of duckdb: it translates the
+# parameter style, the few PostgreSQL-only constructs the pipeline uses, and
+# runs the aggregate refresh / data-version bump that PostgreSQL keeps in
+# PL/pgSQL functions. dialect(conn) tells callers which SQL flavour to send.
+# Swap-partition loads, parallel writers and the Parquet export remain
+# PostgreSQL-only.
+# ==============================================================================
+
+load_dotenv()
+BACKENDS = ("postgres", "duckdb")
+DEFAULT_DUCKDB_PATH = os.path.join("data", "warehouse.duckdb")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DUCKDB_SCHEMA_FILE = os.path.join(PROJECT_ROOT, "schema_duckdb.sql")
+AGGREGATES_MIGRATION = os.path.join(PROJECT_ROOT, "migrations", "0005_season_aggregates.sql")
+
+def configure(name=None, duckdb_path=None):
+    """
+    Selects the backend for this process and every worker started after this call.
+    """
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown storage backend '{name}'. Expected one of {BACKENDS}.")
+        os.environ["STORAGE_BACKEND"] = name
+    if duckdb_path:
+        os.environ["DUCKDB_PATH"] = duckdb_path
+
+def dialect(conn):
+    """
+    SQL flavour spoken by a connection: 'postgres' or 'duckdb'.
+    """
+    return getattr(conn, "dialect", "postgres")
+
+class PostgresBackend:
+    name = "postgres"
+    supports_swap = True
+    supports_parallel_writers = True
+
+    def connect(self):
+        return get_raw_connection()
+
+    def ensure_schema(self, conn, verbose=True):
+        return migrate(conn, verbose=verbose)
+
+class DuckDBBackend:
+    name = "duckdb"
+    supports_swap = False
+    supports_parallel_writers = False  # one writer per database file: concurrent dimension upserts conflict
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("DUCKDB_PATH", DEFAULT_DUCKDB_PATH)
+
+    def connect(self):
+        import duckdb
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        return DuckDBConnection(duckdb.connect(self.path))
+
+    def ensure_schema(self, conn, verbose=True):
+        with open(DUCKDB_SCHEMA_FILE, encoding="utf-8") as f:
+            script = f.read()
+        conn.raw.execute(script)
+        if verbose:
+            print(f"   [SCHEMA] DuckDB schema ready ({self.path}).")
+        return []
+
+    def reset(self):
+        """
+        Deletes the database file (and its write-ahead log).
+        """
+        for path in (self.path, self.path + ".wal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+def get_backend(name=None):
+    name = name or os.getenv("STORAGE_BACKEND", "postgres")
+    if name == "postgres":
+        return PostgresBackend()
+    if name == "duckdb":
+        return DuckDBBackend()
+    raise ValueError(f"Unknown storage backend '{name}'. Expected one of {BACKENDS}.")
+
+def connect(name=None):
+    """
+    A psycopg2-style connection to the selected backend. close() releases it.
+    """
+    return get_backend(name).connect()
+
+# ==============================================================================
+# DUCKDB ADAPTER
+# ==============================================================================
+
+_refresh_statements = None
+_refresh_lock = threading.Lock()
+
+def aggregate_refresh_statements():
+    """
+    The statements of refresh_season_aggregates() (migration 0005), with the
+    PL/pgSQL argument turned into a $season parameter. Read from the migration so
+    both backends compute the aggregates with the same SQL.
+    """
+    global _refresh_statements
+    with _refresh_lock:
+        if _refresh_statements is None:
+            with open(AGGREGATES_MIGRATION, encoding="utf-8") as f:
+                sql = f.read()
+            body = re.search(r"FUNCTION refresh_season_aggregates.*?\bBEGIN\b(.*?)\bEND;", sql, re.S).group(1)
+            body = re.sub(r"--[^\n]*", "", body)
+            _refresh_statements = [s.strip().replace("p_season", "$season") for s in body.split(";") if s.strip()]
+    return _refresh_statements
+
+BUMP_VERSION_SQL = [
+    "UPDATE data_versions SET version = version + 1, updated_at = now() WHERE season = $season",
+    "INSERT INTO data_versions (season) SELECT $season WHERE NOT EXISTS "
+    "(SELECT 1 FROM data_versions WHERE season = $season)",
+]
+
+FUNCTION_CALL_RE = re.compile(r"^\s*SELECT\s+(ensure_season_partitions|refresh_season_aggregates|bump_data_version)\s*\(", re.I)
+COPY_FROM_RE = re.compile(r"COPY\s+(\w+)\s*\(([^)]*)\)\s+FROM\s+STDIN", re.I)
+ANY_RE = re.compile(r"=\s*ANY\s*\(\s*(\?|\$\w+)\s*\)", re.I)
+UNNEST_FROM_RE = re.compile(r"SELECT\s+\*\s+FROM\s+unnest\(\s*([^,()]+?)\s*,\s*([^,()]+?)\s*\)", re.I)
+NAMED_PARAM_RE = re.compile(r"%\((\w+)\)s")
+INSERT_VALUES_RE = re.compile(r"^\s*INSERT\s+INTO\s+(\w+)\s*\(([^)]*)\)\s*VALUES\s*\(\s*%s(?:\s*,\s*%s)*\s*\)(.*)$",
+                              re.I | re.S)
+
+def translate(sql, params):
+    """
+    psycopg2 SQL -> DuckDB SQL: %s / %(name)s placeholders, '= ANY(list)',
+    two-column unnest in FROM, CREATE TABLE ... WITH NO DATA.
+    """
+    if params is not None:
+        if isinstance(params, dict):
+            sql = NAMED_PARAM_RE.sub(r"$\1", sql)
+        else:
+            sql = sql.replace("%s", "?")
+        sql = sql.replace("%%", "%")
+    sql = ANY_RE.sub(r"IN (SELECT unnest(\1))", sql)
+    sql = UNNEST_FROM_RE.sub(r"SELECT unnest(\1), unnest(\2)", sql)
+    return re.sub(r"\bWITH\s+NO\s+DATA\b", "LIMIT 0", sql, flags=re.I)
+
+class DuckDBCursor:
+    """
+    Results are fetched eagerly, so several cursors can share the one DuckDB
+    connection (and its transaction), as psycopg2 cursors share theirs.
+    """
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+        self.description = None
+        self.rowcount = -1
+        self.itersize = 2000
+
+    def _run(self, sql, params=None):
+        self.conn.begin()
+        result = self.conn.raw.execute(sql, params) if params is not None else self.conn.raw.execute(sql)
+        self.description = result.description
+        self.rows = result.fetchall() if self.description else []
+        self.rowcount = len(self.rows)
+
+    def execute(self, sql, params=None):
+        call = FUNCTION_CALL_RE.match(sql)
+        if call:
+            self._call(call.group(1).lower(), params)
+            return
+        self._run(translate(sql, params), params)
+
+    def _call(self, function, params):
+        season = str(params[0])
+        statements = {
+            "ensure_season_partitions": [],  # no partitions in DuckDB
+            "refresh_season_aggregates": aggregate_refresh_statements(),
+            "bump_data_version": BUMP_VERSION_SQL,
+        }[function]
+        for sql in statements:
+            self._run(sql, {"season": season})
+        self.rows, self.description = [], None
+
+    def executemany(self, sql, rows):
+        rows = [tuple(r) for r in rows]
+        insert = INSERT_VALUES_RE.match(sql)
+        if rows and insert:
+            # Row-by-row executemany is very slow in DuckDB: load the batch as one
+            # INSERT ... SELECT over a registered frame, like copy_expert
+            table, columns = insert.group(1), [c.strip() for c in insert.group(2).split(",")]
+            frame = pd.read_csv(rows_to_csv_buffer(rows), header=None, names=columns, dtype=str,
+                                keep_default_na=False, na_values=[""])
+            self._insert_frame(table, columns, frame, insert.group(3).strip().rstrip(";"))
+            return
+        if rows:
+            self.conn.begin()
+            self.conn.raw.executemany(translate(sql, rows[0]), rows)
+        self.rows, self.description, self.rowcount = [], None, len(rows)
+
+    def _insert_frame(self, table, columns, frame, suffix=""):
+        self.conn.begin()
+        self.conn.raw.register("copy_buffer", frame)
+        try:
+            self.conn.raw.execute(f"INSERT INTO {table} ({', '.join(columns)}) SELECT * FROM copy_buffer {suffix}")
+        finally:
+            self.conn.raw.unregister("copy_buffer")
+        self.rows, self.description, self.rowcount = [], None, len(frame)
+
+    def copy_expert(self, sql, file, size=8192):
+        match = COPY_FROM_RE.search(sql)
+        if not match:
+            raise NotImplementedError(f"DuckDB adapter only supports COPY ... FROM STDIN: {sql}")
+        table, columns = match.group(1), [c.strip() for c in match.group(2).split(",")]
+        data = file.read()
+        frame = pd.read_csv(io.StringIO(data) if isinstance(data, str) else io.BytesIO(data), header=None,
+                            names=columns, dtype=str, keep_default_na=False, na_values=[""])
+        self._insert_frame(table, columns, frame)
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchmany(self, size=None):
+        size = size or self.itersize
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def __iter__(self):
+        while self.rows:
+            yield self.rows.pop(0)
+
+    def close(self):
+        self.rows = []
+
+class DuckDBConnection:
+    """
+    psycopg2-style transactions: the first statement opens one, commit() /
+    rollback() end it.
+    """
+    dialect = "duckdb"
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.in_transaction = False
+
+    def cursor(self, name=None, **kwargs):
+        return DuckDBCursor(self)
+
+    def begin(self):
+        if not self.in_transaction:
+            self.raw.begin()
+            self.in_transaction = True
+
+    def commit(self):
+        if self.in_transaction:
+            try:
+                self.raw.commit()
+            finally:
+                # A failed COMMIT ends the transaction too: a later rollback() must not raise over it
+                self.in_transaction = False
+
+    def rollback(self):
+        if self.in_transaction:
+            try:
+                self.raw.rollback()
+            finally:
+                self.in_transaction = False
+
+    def close(self):
+        self.rollback()
+        self.raw.close()
@@ -0,0 +1,191 @@
+import os
+import re
+import csv
+from functools import lru_cache
+import pandas as pd
+import unidecode
+
+# ==============================================================================
+# ENTITY RESOLUTION
+# ==============================================================================
+# Reconciles team and player names across Understat and ESPN.
+#   * Alias tables (modules/aliases/teams.csv, players.csv) are read once.
+#   * Names are normalized with unidecode + cached lookups, and whole columns
+#     are resolved at a time (each distinct name is resolved once).
+#   * Stable integer ids live in the 'teams' and 'players' dimension tables
+#     (migration 0006); player_stats and lineups carry team_id / player_id so
+#     the two sources can be joined on integers instead of free text.
+#   * A player id is scoped to (team, name key): two players with the same
+#     name at different clubs never share an id (migration 0009), and the id
+#     stays the same from one season to the next.
+#   * Spellings that differ beyond accents ('Nicholas Williams' / 'Nico
+#     Williams') are learned from the games both sources cover (see
+#     learn_player_aliases); players.csv holds manual overrides.
+# ==============================================================================
+
+ALIAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aliases")
+
+def load_alias_table(filename):
+    """
+    alias,canonical CSV -> {alias: canonical}. Missing files give an empty table.
+    """
+    path = os.path.join(ALIAS_DIR, filename)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {row["alias"]: row["canonical"] for row in csv.DictReader(f) if row.get("alias")}
+
+TEAM_ALIASES = load_alias_table("teams.csv")
+PLAYER_ALIASES = load_alias_table("players.csv")
+
+@lru_cache(maxsize=None)
+def canonical_key(name):
+    """
+    Accent-, case- and punctuation-insensitive key: 'Vinícius Júnior' -> 'vinicius junior'.
+    """
+    ascii_name = unidecode.unidecode(name).lower()
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9 ]", " ", ascii_name)).strip()
+
+def _build_key_index(aliases):
+    # Aliases are also matched by canonical key, so 'ATLETICO DE MADRID' finds 'Atlético de Madrid'
+    index = {canonical_key(alias): target for alias, target in aliases.items()}
+    index.update({canonical_key(target): target for target in aliases.values()})
+    return index
+
+TEAM_KEY_INDEX = _build_key_index(TEAM_ALIASES)
+PLAYER_KEY_INDEX = _build_key_index(PLAYER_ALIASES)
+
+@lru_cache(maxsize=None)
+def normalize_team(name):
+    """
+    Canonical team name: alias table first, then an accent-free version of the name.
+    """
+    if not isinstance(name, str):
+        return name
+    if name in TEAM_ALIASES:
+        return TEAM_ALIASES[name]
+    return TEAM_KEY_INDEX.get(canonical_key(name), unidecode.unidecode(name))
+
+@lru_cache(maxsize=None)
+def player_key(name):
+    """
+    Key used to reconcile the same player across sources.
+    """
+    if not isinstance(name, str):
+        return name
+    name = PLAYER_ALIASES.get(name, name)
+    return canonical_key(PLAYER_KEY_INDEX.get(canonical_key(name), name))
+
+def _resolve_column(series, resolver):
+    # Resolve each distinct value once, then broadcast with a vectorized map
+    uniques = pd.unique(series.dropna())
+    mapping = {value: resolver(value) for value in uniques}
+    return series.map(mapping)
+
+def resolve_teams(series):
+    return _resolve_column(series, normalize_team)
+
+def resolve_players(series):
+    return _resolve_column(series, player_key)
+
+def _names_match(a, b):
+    """
+    Two name keys that plausibly spell the same player: one is contained in the
+    other ('rodrygo' / 'rodrygo goes'), or same surname and first initial
+    ('take kubo' / 'takefusa kubo').
+    """
+    ta, tb = a.split(), b.split()
+    if not ta or not tb:
+        return False
+    if set(ta) <= set(tb) or set(tb) <= set(ta):
+        return True
+    return ta[-1] == tb[-1] and ta[0][0] == tb[0][0]
+
+def _side_names(payload):
+    return pd.DataFrame({
+        'match_key': payload['match_key'].astype(str),
+        'team_key': resolve_teams(payload['team']).astype(str),
+        'name': resolve_players(payload['player_name']).astype(str),
+    }).drop_duplicates()
+
+def learn_player_aliases(players, lineups):
+    """
+    {(team_key, lineup name key): player_stats name key} for lineup names that
+    are missing from the player stats of the same game side. A pair is learned
+    when the two names match (_names_match) and neither has another candidate
+    in that game; the pairing seen in most games of the season wins.
+    """
+    ud, espn = _side_names(players), _side_names(lineups)
+    sides = ['match_key', 'team_key']
+    both = espn.merge(ud, on=sides + ['name'], how='outer', indicator=True)
+    espn_only = both[both['_merge'] == 'left_only'][sides + ['name']]
+    ud_only = both[both['_merge'] == 'right_only'][sides + ['name']]
+    pairs = espn_only.merge(ud_only, on=sides, suffixes=('_espn', '_ud'))
+    if pairs.empty:
+        return {}
+
+    distinct = pairs[['name_espn', 'name_ud']].drop_duplicates()
+    matching = distinct[[_names_match(a, b) for a, b in zip(distinct['name_espn'], distinct['name_ud'])]]
+    pairs = pairs.merge(matching, on=['name_espn', 'name_ud'])
+    # Unambiguous within the game side, in both directions
+    pairs = pairs[~pairs.duplicated(sides + ['name_espn'], keep=False)
+                  & ~pairs.duplicated(sides + ['name_ud'], keep=False)]
+    if pairs.empty:
+        return {}
+    votes = pairs.groupby(['team_key', 'name_espn', 'name_ud']).size().rename('games').reset_index()
+    best = votes.sort_values('games', ascending=False).drop_duplicates(['team_key', 'name_espn'])
+    return {(t, e): u for t, e, u in zip(best['team_key'], best['name_espn'], best['name_ud'])}
+
+def entity_key_columns(payload, aliases=None):
+    """
+    Adds the resolved 'team_key' (canonical team name) and 'player_key'
+    ('team_key|name key') columns. aliases: learned spellings, see
+    learn_player_aliases.
+    """
+    payload['team_key'] = resolve_teams(payload['team'])
+    team_keys = payload['team_key'].astype(str)
+    names = resolve_players(payload['player_name']).astype(str)
+    if aliases:
+        learned = pd.Series(list(aliases.values()), index=pd.MultiIndex.from_tuples(list(aliases)))
+        mapped = learned.reindex(pd.MultiIndex.from_arrays([team_keys, names])).to_numpy()
+        names = names.where(pd.isna(mapped), mapped)
+    payload['player_key'] = team_keys + "|" + names
+    return payload
+
+def _upsert_dimension(cur, table, key_column, keys, names):
+    """
+    Inserts unseen keys into a dimension table and returns {key: id} for all of them.
+    Keys are sorted so concurrent writers take row locks in the same order.
+    """
+    pairs = sorted(set(zip(keys, names)))
+    if not pairs:
+        return {}
+    sorted_keys = [p[0] for p in pairs]
+    cur.execute(f"""
+        INSERT INTO {table} ({key_column}, name)
+        SELECT * FROM unnest(%s::text[], %s::text[])
+        ON CONFLICT ({key_column}) DO NOTHING;
+    """, (sorted_keys, [p[1] for p in pairs]))
+    cur.execute(f"SELECT {key_column}, id FROM {table} WHERE {key_column} = ANY(%s);", (sorted_keys,))
+    return dict(cur.fetchall())
+
+def attach_entity_ids(cur, payload):
+    """
+    Adds team_id / player_id to a payload carrying 'team_key' and 'player_key' columns
+    (see entity_key_columns).
+    """
+    if payload.empty:
+        return payload.assign(team_id=pd.Series(dtype="int64"), player_id=pd.Series(dtype="int64"))
+
+    teams = payload['team_key'].drop_duplicates().tolist()
+    team_ids = _upsert_dimension(cur, "teams", "team_key", teams, teams)
+
+    players = payload[['player_key', 'player_name']].drop_duplicates(subset=['player_key'])
+    player_ids = _upsert_dimension(
+        cur, "players", "player_key", players['player_key'].tolist(), players['player_name'].tolist()
+    )
+
+    payload = payload.copy()
+    payload['team_id'] = payload['team_key'].map(team_ids).astype('int64')
+    payload['player_id'] = payload['player_key'].map(player_ids).astype('int64')
+    return payload
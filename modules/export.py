@@ -0,0 +1,206 @@
+import os
+import json
+import tempfile
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow.fs import LocalFileSystem
+from modules.metrics import stage
+from modules.result_cache import version_tokens
+from modules.schema import PARTITIONED_TABLES
+from modules.utils import get_raw_connection
+
+# ==============================================================================
+# COLUMNAR EXPORT
+# ==============================================================================
+# Parquet snapshots of the warehouse, one file per (table, season):
+#
+#   data/export/matches/season=2023/part-0.parquet
+#   data/export/player_stats/season=2023/part-0.parquet
+#   data/export/manifest.json   -> data version, rows and time of each export
+#
+# Methods:
+#   copy   -> COPY (SELECT ...) TO STDOUT as CSV into a temp file, converted to
+#             Parquet batch by batch by Arrow's streaming CSV reader
+#   cursor -> named (server-side) cursor, fetchmany() batches written as row groups
+# Both run in constant client memory. A (table, season) whose data version
+# (migration 0007; counter and bump time, see modules/result_cache.py) is
+# unchanged since its last export is skipped.
+# read_export() memory-maps the files into Arrow / pandas for analysis.
+# ==============================================================================
+
+DEFAULT_EXPORT_DIR = os.path.join("data", "export")
+EXPORT_METHODS = ("copy", "cursor")
+EXPORT_BATCH_ROWS = 50_000
+
+# PostgreSQL type OID -> Arrow type. NUMERIC (1700) is cast to float8 in the SELECT.
+PG_ARROW_TYPES = {
+    16: pa.bool_(), 20: pa.int64(), 21: pa.int16(), 23: pa.int32(),
+    700: pa.float32(), 701: pa.float64(), 1700: pa.float64(),
+    25: pa.string(), 1043: pa.string(), 1082: pa.date32(),
+    1114: pa.timestamp("us"), 1184: pa.timestamp("us", tz="UTC"),
+}
+
+def season_path(export_dir, table, season):
+    return os.path.join(export_dir, table, f"season={season}", "part-0.parquet")
+
+def read_manifest(export_dir):
+    path = os.path.join(export_dir, "manifest.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def write_manifest(export_dir, manifest):
+    path = os.path.join(export_dir, "manifest.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def table_schema(cur, table):
+    """
+    (select list, Arrow schema) for every column of a table; NUMERIC is read as float8.
+    """
+    cur.execute(f"SELECT * FROM {table} LIMIT 0;")
+    select, fields = [], []
+    for col in cur.description:
+        select.append(f"{col.name}::float8 AS {col.name}" if col.type_code == 1700 else col.name)
+        fields.append(pa.field(col.name, PG_ARROW_TYPES.get(col.type_code, pa.string())))
+    return ", ".join(select), pa.schema(fields)
+
+def _export_copy(conn, table, season, select, schema, path):
+    cur = conn.cursor()
+    query = cur.mogrify(f"SELECT {select} FROM {table} WHERE season = %s ORDER BY id", (season,)).decode()
+    with tempfile.NamedTemporaryFile(suffix=".csv") as spool:
+        cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", spool)
+        spool.flush()
+        cur.close()
+        rows = csv_to_parquet(spool.name, schema, path)
+    return rows
+
+def csv_to_parquet(csv_path, schema, path):
+    """
+    Converts a PostgreSQL COPY CSV (with header) to Parquet batch by batch.
+    COPY writes booleans as t/f and NULL as an empty unquoted field.
+    """
+    rows = 0
+    reader = pa_csv.open_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(block_size=8 << 20),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=schema, strings_can_be_null=True, quoted_strings_can_be_null=False,
+            true_values=["t"], false_values=["f"],
+        ),
+    )
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+def _export_cursor(conn, table, season, select, schema, path, batch_rows=EXPORT_BATCH_ROWS):
+    cur = conn.cursor(name=f"export_{table}")  # named -> server-side, rows stay on the server
+    cur.itersize = batch_rows
+    cur.execute(f"SELECT {select} FROM {table} WHERE season = %s ORDER BY id", (season,))
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        while True:
+            batch = cur.fetchmany(batch_rows)
+            if not batch:
+                break
+            columns = list(zip(*batch))
+            writer.write_table(pa.table(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema
+            ))
+            rows += len(batch)
+    cur.close()
+    return rows
+
+def export_season(conn, table, season, export_dir=DEFAULT_EXPORT_DIR, method="copy"):
+    """
+    Writes one (table, season) to Parquet via a temp file + rename. Returns the row count.
+    """
+    if method not in EXPORT_METHODS:
+        raise ValueError(f"Unknown export method '{method}'. Expected one of {EXPORT_METHODS}.")
+    cur = conn.cursor()
+    select, schema = table_schema(cur, table)
+    cur.close()
+
+    path = season_path(export_dir, table, season)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    export = _export_copy if method == "copy" else _export_cursor
+    rows = export(conn, table, season, select, schema, tmp_path)
+    conn.rollback()  # read-only: close the snapshot (and the named cursor's transaction)
+    os.replace(tmp_path, path)
+    return rows
+
+def export_seasons(seasons=None, export_dir=DEFAULT_EXPORT_DIR, method="copy", tables=PARTITIONED_TABLES, force=False):
+    """
+    Exports every table for the given seasons (all seasons in the warehouse when None).
+    Returns {season: {table: rows or 'unchanged'}}.
+    """
+    conn = get_raw_connection()
+    results = {}
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT m.season, v.version, v.updated_at FROM (SELECT DISTINCT season FROM matches) m "
+                    "LEFT JOIN data_versions v ON v.season = m.season;")
+        versions = version_tokens(cur.fetchall())
+        cur.close()
+        conn.rollback()
+
+        seasons = [str(s) for s in seasons] if seasons else sorted(versions)
+        os.makedirs(export_dir, exist_ok=True)
+        manifest = read_manifest(export_dir)
+
+        for season in seasons:
+            if season not in versions:
+                print(f"   [{season}] [WARN] No data in the warehouse, nothing to export.")
+                continue
+            results[season] = {}
+            for table in tables:
+                entry_key = f"{table}/{season}"
+                entry = manifest.get(entry_key)
+                if not force and entry and entry["version"] == versions[season] \
+                        and os.path.exists(season_path(export_dir, table, season)):
+                    results[season][table] = "unchanged"
+                    continue
+                with stage(f"export.{table}", season) as m:
+                    m["rows"] = export_season(conn, table, season, export_dir, method)
+                manifest[entry_key] = {
+                    "version": versions[season],
+                    "rows": m["rows"],
+                    "method": method,
+                    "exported_at": datetime.now().isoformat(timespec="seconds"),
+                }
+                results[season][table] = m["rows"]
+            write_manifest(export_dir, manifest)
+            print(f"   [{season}] Exported: " + ", ".join(f"{t}={r}" for t, r in results[season].items()))
+    finally:
+        conn.close()
+    return results
+
+def read_export(table, seasons=None, columns=None, filter=None, export_dir=DEFAULT_EXPORT_DIR, as_arrow=False):
+    """
+    Memory-maps the exported Parquet files of a table (all exported seasons when None)
+    and returns a pandas DataFrame (or an Arrow table with as_arrow=True).
+    filter: optional pyarrow.dataset expression, e.g. ds.field("minutes") >= 90.
+    """
+    root = os.path.join(export_dir, table)
+    if seasons is None:
+        seasons = sorted(d.split("=", 1)[1] for d in os.listdir(root) if d.startswith("season="))
+    paths = [season_path(export_dir, table, s) for s in seasons]
+    missing = [p for p in paths if not os.path.exists(p)]
+    if missing:
+        raise FileNotFoundError(f"Not exported yet (run main.py --export): {missing}")
+
+    dataset = ds.dataset(paths, format="parquet", filesystem=LocalFileSystem(use_mmap=True))
+    arrow_table = dataset.to_table(columns=columns, filter=filter)
+    if as_arrow:
+        return arrow_table
+    # Repeated names (team, player_name, ...) become pandas categoricals
+    categories = [f.name for f in arrow_table.schema if pa.types.is_string(f.type) and f.name != "fingerprint"]
+    return arrow_table.to_pandas(categories=categories)
@@ -0,0 +1,323 @@
+import os
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from modules.loaders import insert_rows
+from modules.metrics import stage
+from modules.entities import resolve_teams
+
+# ==============================================================================
+# FEATURE STORE
+# ==============================================================================
+# Pre-match features for the predictive models (tables from migration 0008),
+# computed with NumPy over match arrays sorted by (group, date):
+#   feat_team_match   -> form over the last FEATURE_FORM_WINDOW matches (points,
+#                        goals, xG for/against) + lineup availability: share of
+#                        the team's most-used starters (by prior starts) who start
+#   feat_player_match -> season-to-date per-90 xG, xA, xGChain, key passes
+#   feat_match        -> one row per match: both sides' form, availability and
+#                        the summed per-90 xG of the starting XI, plus the result
+# Only matches before the described one count (no result leakage). Windowed sums
+# come from one cumulative sum per array: prior = cumsum[i] - cumsum[window start].
+# Incremental: only matches that are new or changed (fingerprint) since the last
+# run, and every later match of the season, are recomputed and rewritten. The
+# history before them is seeded from per-player totals and start counts summed
+# in SQL, so a weekly refresh reads one matchday of player / lineup rows.
+# ==============================================================================
+
+load_dotenv()
+FORM_WINDOW = int(os.getenv("FEATURE_FORM_WINDOW", "5"))
+MIN_MINUTES_P90 = int(os.getenv("FEATURE_MIN_MINUTES", "90"))
+CORE_SQUAD = 11
+PLAYER_STATS = ["minutes", "xg", "xa", "xg_chain", "key_passes"]
+
+TEAM_FEATURE_COLUMNS = ["season", "match_id", "date", "team", "is_home", "prior_matches", "form_points",
+                        "form_gf", "form_ga", "form_xg_for", "form_xg_against", "availability"]
+PLAYER_FEATURE_COLUMNS = ["season", "match_id", "date", "team", "player_name", "player_id", "prior_minutes",
+                          "xg_p90", "xa_p90", "xg_chain_p90", "key_passes_p90"]
+MATCH_FEATURE_COLUMNS = ["season", "match_id", "date", "home_team", "away_team",
+                         "home_prior_matches", "home_form_points", "home_form_xg_for", "home_form_xg_against",
+                         "home_availability", "home_xi_xg_p90",
+                         "away_prior_matches", "away_form_points", "away_form_xg_for", "away_form_xg_against",
+                         "away_availability", "away_xi_xg_p90",
+                         "home_score", "away_score", "fingerprint"]
+FEATURE_TABLES = {
+    "feat_team_match": TEAM_FEATURE_COLUMNS,
+    "feat_player_match": PLAYER_FEATURE_COLUMNS,
+    "feat_match": MATCH_FEATURE_COLUMNS,
+}
+
+# --- ARRAY HELPERS ---
+def group_starts(keys):
+    """
+    For rows sorted by group key: index of the first row of each row's group.
+    """
+    idx = np.arange(len(keys))
+    new_group = np.ones(len(keys), dtype=bool)
+    new_group[1:] = keys[1:] != keys[:-1]
+    return np.maximum.accumulate(np.where(new_group, idx, 0))
+
+def prior_sums(values, starts, window=None):
+    """
+    Sums of the previous `window` rows of the same group (all previous rows when
+    None), excluding the row itself. values: (rows, k). Returns (sums, counts).
+    """
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    cum = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+    idx = np.arange(len(values))
+    lo = starts if window is None else np.maximum(starts, idx - window)
+    return cum[idx] - cum[lo], idx - lo
+
+def _per_match(sums, counts):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts[:, None] > 0, sums / counts[:, None], np.nan).astype(np.float32)
+
+# --- FEATURES ---
+def team_sides(matches):
+    """
+    Two rows per match (home and away view), sorted by (team, date, match_id).
+    """
+    home = pd.DataFrame({
+        "match_id": matches["id"], "date": matches["date"], "team": matches["home_team"], "is_home": True,
+        "gf": matches["home_score"], "ga": matches["away_score"],
+        "xg_for": matches["home_xg"], "xg_against": matches["away_xg"],
+    })
+    away = pd.DataFrame({
+        "match_id": matches["id"], "date": matches["date"], "team": matches["away_team"], "is_home": False,
+        "gf": matches["away_score"], "ga": matches["home_score"],
+        "xg_for": matches["away_xg"], "xg_against": matches["home_xg"],
+    })
+    sides = pd.concat([home, away], ignore_index=True).sort_values(["team", "date", "match_id"], ignore_index=True)
+    gf, ga = sides["gf"].to_numpy(dtype=float), sides["ga"].to_numpy(dtype=float)
+    sides["points"] = np.select([gf > ga, gf == ga], [3.0, 1.0], 0.0)
+    return sides
+
+def team_form(sides, window=FORM_WINDOW):
+    starts = group_starts(pd.factorize(sides["team"])[0])
+    sums, counts = prior_sums(sides[["points", "gf", "ga", "xg_for", "xg_against"]].to_numpy(dtype=float),
+                              starts, window)
+    form = _per_match(sums, counts)
+    out = sides[["match_id", "date", "team", "is_home"]].copy()
+    out["prior_matches"] = counts
+    for i, col in enumerate(["form_points", "form_gf", "form_ga", "form_xg_for", "form_xg_against"]):
+        out[col] = form[:, i]
+    return out
+
+def availability(sides, lineups, prior_starts=None, core=CORE_SQUAD):
+    """
+    Per team side: share of the `core` players with the most prior starts that
+    start this match. prior_starts: (side_team, team_player, starts) counted
+    before the first match in `sides`. NaN without a lineup or known starters.
+    """
+    n = len(sides)
+    result = np.full(n, np.nan, dtype=np.float32)
+    starters = lineups[lineups["is_starter"].fillna(False).astype(bool)]
+    if n == 0 or starters.empty:
+        return result
+    if prior_starts is None:
+        prior_starts = pd.DataFrame(columns=["side_team", "team_player", "starts"])
+
+    keys = pd.concat([prior_starts[["side_team", "team_player"]], starters[["side_team", "team_player"]]],
+                     ignore_index=True)
+    # Sorted, so players level on prior starts are ranked the same however the history was read
+    codes, players = pd.factorize(keys["team_player"], sort=True)
+    prior_codes, starter_codes = codes[:len(prior_starts)], codes[len(prior_starts):]
+
+    side_index = pd.Series(np.arange(n), index=pd.MultiIndex.from_arrays([sides["match_id"], sides["team"]]))
+    rows = side_index.reindex(pd.MultiIndex.from_arrays([starters["match_id"], starters["side_team"]])).to_numpy()
+    keep = ~np.isnan(rows)
+    started = np.zeros((n, len(players)), dtype=np.int32)
+    started[rows[keep].astype(int), starter_codes[keep]] = 1
+
+    # Starts before `sides` count for the player's own team only
+    seed = np.zeros(len(players), dtype=np.int32)
+    np.add.at(seed, prior_codes, prior_starts["starts"].to_numpy(dtype=np.int32))
+    player_team = keys.drop_duplicates("team_player").set_index("team_player")["side_team"].reindex(players)
+    own = player_team.to_numpy()[None, :] == sides["team"].to_numpy()[:, None]
+
+    starts = group_starts(pd.factorize(sides["team"])[0])
+    cum = np.vstack([np.zeros((1, started.shape[1]), dtype=np.int32), np.cumsum(started, axis=0)])
+    prior = seed[None, :] * own + cum[np.arange(n)] - cum[starts]   # starts for this team before this match
+    top = np.argsort(-prior, axis=1, kind="stable")[:, :core]
+    top_prior = np.take_along_axis(prior, top, axis=1)
+    top_started = np.take_along_axis(started, top, axis=1)
+    known = top_prior > 0
+    has_lineup = started.any(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = (top_started * known).sum(axis=1) / known.sum(axis=1)
+    valid = has_lineup & (known.sum(axis=1) > 0)
+    result[valid] = share[valid]
+    return result
+
+def player_rates(players, prior_totals=None, min_minutes=MIN_MINUTES_P90):
+    """
+    Season-to-date per-90 rates before each match, per (team, player).
+    prior_totals: (team, player_name, minutes, xg, ...) summed over the matches
+    before the first one in `players`.
+    """
+    players = players.sort_values(["team", "player_name", "date", "match_id"], ignore_index=True)
+    keys = players["team"].astype(str) + "|" + players["player_name"].astype(str)
+    starts = group_starts(pd.factorize(keys)[0])
+    sums, _ = prior_sums(players[PLAYER_STATS].to_numpy(dtype=float), starts)
+    if prior_totals is not None and len(prior_totals):
+        seed_keys = prior_totals["team"].astype(str) + "|" + prior_totals["player_name"].astype(str)
+        seed = prior_totals[PLAYER_STATS].set_axis(seed_keys).astype(float)
+        sums += seed.reindex(keys).fillna(0).to_numpy()
+    minutes = sums[:, 0]
+    out = players[["match_id", "date", "team", "player_name", "player_id"]].copy()
+    out["player_id"] = pd.to_numeric(out["player_id"]).astype("Int64")
+    out["prior_minutes"] = minutes.astype(np.int64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rates = np.where(minutes[:, None] >= min_minutes, 90.0 * sums[:, 1:] / minutes[:, None], np.nan)
+    for i, col in enumerate(["xg_p90", "xa_p90", "xg_chain_p90", "key_passes_p90"]):
+        out[col] = rates[:, i].astype(np.float32)
+    return out
+
+def xi_strength(player_features, lineups):
+    """
+    Sum of the starters' prior xG per 90, per (match_id, team), with the team
+    named as in the matches table (Understat side of the player link).
+    """
+    starters = lineups[lineups["is_starter"].fillna(False).astype(bool) & lineups["player_id"].notna()]
+    starters = starters.assign(player_id=pd.to_numeric(starters["player_id"]).astype("Int64"))
+    linked = starters[["match_id", "player_id"]].merge(
+        player_features[["match_id", "player_id", "team", "xg_p90"]].dropna(subset=["player_id"]),
+        on=["match_id", "player_id"], how="inner",
+    )
+    return linked.groupby(["match_id", "team"], sort=False)["xg_p90"].sum(min_count=1).rename("xi_xg_p90")
+
+def side_team_names(matches):
+    """
+    {canonical team name: name in the matches table}. Lineups name teams as
+    ESPN does; features use the matches table's (Understat) names.
+    """
+    names = pd.unique(pd.concat([matches["home_team"], matches["away_team"]]))
+    return dict(zip(resolve_teams(pd.Series(names)), names))
+
+def compute_features(season, matches, players, lineups, window=FORM_WINDOW, cutoff=None,
+                     prior_totals=None, prior_starts=None):
+    """
+    Feature frames of one season from or after `cutoff` (everything when None).
+    matches: the whole season (the form windows reach back before the cutoff);
+    players / lineups: rows of the matches from the cutoff on, with the earlier
+    matches summarized in prior_totals / prior_starts (see update_features).
+    """
+    matches = matches.sort_values(["date", "id"], ignore_index=True)
+    sides = team_sides(matches)
+    teams = team_form(sides, window)
+    side_names = side_team_names(matches)
+    if cutoff is not None:
+        matches = matches[matches["date"] >= cutoff].reset_index(drop=True)
+        teams = teams[teams["date"] >= cutoff].reset_index(drop=True)
+
+    lineups = lineups.copy()
+    lineups["side_team"] = resolve_teams(lineups["team"]).map(side_names)
+    lineups["team_player"] = lineups["side_team"].astype(str) + "|" + lineups["player_name"].astype(str)
+    if prior_starts is not None:
+        prior_starts = prior_starts.assign(side_team=resolve_teams(prior_starts["team"]).map(side_names))
+        prior_starts["team_player"] = prior_starts["side_team"].astype(str) + "|" + prior_starts["player_name"].astype(str)
+    teams["availability"] = availability(teams, lineups, prior_starts)
+
+    dates = dict(zip(matches["id"], matches["date"]))
+    players = players.assign(date=players["match_id"].map(dates)).dropna(subset=["date"])
+    player_features = player_rates(players, prior_totals)
+
+    strength = xi_strength(player_features, lineups)
+    teams = teams.join(strength, on=["match_id", "team"])
+
+    side_cols = ["prior_matches", "form_points", "form_xg_for", "form_xg_against", "availability", "xi_xg_p90"]
+    match_features = matches[["id", "date", "home_team", "away_team", "home_score", "away_score", "fingerprint"]] \
+        .rename(columns={"id": "match_id"})
+    for prefix, home_side in (("home", True), ("away", False)):
+        side = teams[teams["is_home"] == home_side][["match_id"] + side_cols]
+        match_features = match_features.merge(side.rename(columns={c: f"{prefix}_{c}" for c in side_cols}),
+                                              on="match_id", how="left")
+
+    frames = {
+        "feat_team_match": teams.drop(columns=["xi_xg_p90"]),
+        "feat_player_match": player_features,
+        "feat_match": match_features,
+    }
+    for frame in frames.values():
+        frame.insert(0, "season", season)
+    return frames
+
+# --- STORAGE ---
+def _read(cur, sql, params):
+    cur.execute(sql, params)
+    return pd.DataFrame(cur.fetchall(), columns=[d[0] for d in cur.description])
+
+def _rows(df, columns):
+    """
+    Native Python values per row; NaN / NA become NULL.
+    """
+    values = []
+    for col in columns:
+        series = df[col].astype(object)
+        values.append(series.where(df[col].notna(), None).tolist())
+    return list(zip(*values))
+
+def update_features(conn, season, loader="executemany", full=False):
+    """
+    Rewrites the season's features from the first new or changed match on
+    (everything with full=True). Only the season's matches and the player /
+    lineup rows from that date on are read: the earlier matches come in as
+    per-player totals and start counts summed server-side. Returns the number
+    of matches whose feature rows were written.
+    """
+    cur = conn.cursor()
+    try:
+        matches = _read(cur, "SELECT id, date, home_team, away_team, home_score, away_score, home_xg, away_xg, "
+                             "fingerprint FROM matches WHERE season = %s", (season,))
+        stored = _read(cur, "SELECT match_id, fingerprint FROM feat_match WHERE season = %s", (season,))
+        stored = dict(zip(stored["match_id"], stored["fingerprint"]))
+        delta = matches[[stored.get(m) != f or m not in stored for m, f in zip(matches["id"], matches["fingerprint"])]]
+        if matches.empty or (delta.empty and not full):
+            print(f"   [{season}] [FEATURES] Up to date ({len(stored)} matches).")
+            conn.commit()
+            return 0
+        cutoff = matches["date"].min() if full else delta["date"].min()
+
+        since = (season, cutoff)
+        players = _read(cur, "SELECT p.match_id, p.team, p.player_name, p.player_id, p.minutes, p.xg, p.xa, "
+                             "p.xg_chain, p.key_passes FROM player_stats p "
+                             "JOIN matches m ON m.season = p.season AND m.id = p.match_id "
+                             "WHERE p.season = %s AND m.date >= %s", since)
+        lineups = _read(cur, "SELECT l.match_id, l.team, l.player_name, l.player_id, l.is_starter FROM lineups l "
+                             "JOIN matches m ON m.season = l.season AND m.id = l.match_id "
+                             "WHERE l.season = %s AND m.date >= %s", since)
+        prior_totals = _read(cur, "SELECT p.team, p.player_name, SUM(p.minutes) AS minutes, SUM(p.xg) AS xg, "
+                                  "SUM(p.xa) AS xa, SUM(p.xg_chain) AS xg_chain, SUM(p.key_passes) AS key_passes "
+                                  "FROM player_stats p JOIN matches m ON m.season = p.season AND m.id = p.match_id "
+                                  "WHERE p.season = %s AND m.date < %s GROUP BY p.team, p.player_name", since)
+        prior_starts = _read(cur, "SELECT l.team, l.player_name, COUNT(*) AS starts FROM lineups l "
+                                  "JOIN matches m ON m.season = l.season AND m.id = l.match_id "
+                                  "WHERE l.season = %s AND m.date < %s AND l.is_starter "
+                                  "GROUP BY l.team, l.player_name", since)
+        frames = compute_features(season, matches, players, lineups, cutoff=cutoff,
+                                  prior_totals=prior_totals, prior_starts=prior_starts)
+
+        written = 0
+        for table, columns in FEATURE_TABLES.items():
+            frame = frames[table]
+            cur.execute(f"DELETE FROM {table} WHERE season = %s AND date >= %s;", (season, cutoff))
+            insert_rows(cur, table, columns, _rows(frame, columns), loader=loader)
+            if table == "feat_match":
+                written = len(frame)
+        conn.commit()
+        print(f"   [{season}] [FEATURES] {written} match(es) from {cutoff} on "
+              f"({len(delta)} new/changed, window {FORM_WINDOW}).")
+        return written
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+def run_feature_stage(conn, seasons, loader="executemany", full=False):
+    """
+    Feature-store stage after an ingestion: one update per season.
+    """
+    for season in seasons:
+        with stage("features", season) as m:
+            m["rows"] = update_features(conn, season, loader=loader, full=full)
@@ -1,39 +1,65 @@
 import os
+import re
 import time
-import soccerdata as sd
+import multiprocessing
+import threading
 import pandas as pd
-import psycopg2
 import unidecode
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from dotenv import load_dotenv
+from modules.loaders import insert_rows, insert_chunks
+from modules.utils import peak_rss_mb
+from modules.sources import default_sources, fetch_season, source_limits
+from modules.lineup_matching import match_lineups, DATE_TOLERANCE_DAYS
+from modules.schema import upsert_clause, PARTITIONED_TABLES
+from modules.backends import get_backend
+from modules.aggregates import refresh_aggregates
+from modules.result_cache import bump_data_version, forget_versions
+from modules.features import run_feature_stage
+from modules.metrics import stage, configure as configure_metrics, print_stage_summary
+from modules.typed_schema import (
+    coerce_frame, column_values, frame_memory_mb,
+    UNDERSTAT_MATCH_TYPES, UNDERSTAT_PLAYER_TYPES, ESPN_LINEUP_TYPES
+)
+from modules.entities import (
+    normalize_team, resolve_teams, entity_key_columns, attach_entity_ids, learn_player_aliases
+)
+
+# ==============================================================================
+# SEASON INGESTION
+# ==============================================================================
+# scrape (prepare_season) -> transform (transform_season) -> load (LOAD_MODES),
+# one transaction per season.
+# Memory: the load is streamed, the transform is not. iter_insert_rows resolves
+# ids and builds tuples one --chunk-size slice at a time, so only one batch of
+# insert rows is alive. The transform still builds whole-season payload frames
+# because:
+#   * the sources return whole seasons (soccerdata has no paged reader), so the
+#     source frames are in memory before the transform starts anyway
+#   * learn_player_aliases votes over the whole season, and the natural-key
+#     de-duplication and fingerprints need every row of a match
+#   * prepared payloads are pickled from the prepare processes to the writers
+#     (run_parallel_ingestion), so they have to be data, not generators
+# The payloads are typed (category / Int16 / float32) and the source frames are
+# released as soon as they exist: for a 380-match season they take about 2.5 MB,
+# half the size of the source frames.
+# ==============================================================================
 
 # --- CONFIGURATION ---
 LEAGUE = "ESP-La Liga"
+# Rows per flushed insert batch: bounds the memory of the load stage
+CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "5000"))
 # Note: SEASONS_TO_PROCESS is now handled dynamically via arguments
 
-load_dotenv()
-DB_CONFIG = {
-    "dbname": os.getenv("DB_NAME", "spanish_football"),
-    "user": os.getenv("DB_USER", "runner"),
-    "password": os.getenv("DB_PASSWORD"),
-    "host": os.getenv("DB_HOST", "localhost")
-}
-
 # --- HELPER FUNCTIONS ---
 def normalize_name(name):
-    if not isinstance(name, str): return name
-    corrections = {
-        "Deportivo Alavés": "Alaves", "Alavés": "Alaves",
-        "UD Almería": "Almeria", "Almería": "Almeria",
-        "Cádiz": "Cadiz", "Atlético de Madrid": "Atletico Madrid",
-        "Atlético Madrid": "Atletico Madrid", "Athletic Club": "Athletic Club",
-        "Girona FC": "Girona", "Granada CF": "Granada"
-    }
-    return corrections.get(name, name)
+    # Alias table + cached lookup (modules/aliases/teams.csv)
+    return normalize_team(name)
 
 def get_db_connection():
-    return psycopg2.connect(**DB_CONFIG)
+    # Pooled PostgreSQL connection, or the embedded DuckDB file (STORAGE_BACKEND)
+    return get_backend().connect()
 
 def standardize_columns(df):
     df.columns = [c.lower() for c in df.columns]
@@ -57,141 +83,587 @@ def standardize_columns(df):
                 break
     return df
 
-def parse_espn_date(game_str):
-    try: return game_str.split(' ')[0]
-    except: return None
+# --- VECTORIZED HELPERS ---
+PLAYER_STATS_COLUMNS = [
+    'season', 'match_id', 'team', 'player_name', 'minutes', 'goals', 'assists', 'shots',
+    'xg', 'xa', 'xg_chain', 'xg_buildup', 'key_passes', 'yellow_card', 'red_card', 'team_id', 'player_id'
+]
+MATCH_COLUMNS = [
+    'season', 'date', 'home_team', 'away_team', 'home_score', 'away_score', 'home_xg', 'away_xg', 'fingerprint'
+]
+LINEUP_COLUMNS = [
+    'season', 'match_id', 'team', 'player_name', 'position', 'is_starter', 'shots_on_target',
+    'fouls_committed', 'fouls_suffered', 'offsides', 'saves', 'goals_conceded', 'team_id', 'player_id'
+]
+NATURAL_KEY = ['match_key', 'team', 'player_name']
+PLAYER_INT_COLUMNS = ['minutes', 'goals', 'assists', 'shots', 'key_passes', 'yellow_card', 'red_card']
+PLAYER_FLOAT_COLUMNS = ['xg', 'xa', 'xg_chain', 'xg_buildup']
+LINEUP_INT_COLUMNS = ['shots_on_target', 'fouls_committed', 'fouls_suffered', 'offsides', 'saves', 'goals_conceded']
+
+def build_match_keys(dates, home_teams, away_teams):
+    """
+    Builds the 'date|home|away' key used to look up matches.id for whole columns at once.
+    """
+    date_str = pd.to_datetime(dates).dt.strftime('%Y-%m-%d')
+    return date_str + "|" + resolve_teams(home_teams) + "|" + resolve_teams(away_teams)
+
+def frame_to_rows(df, columns):
+    """
+    Turns the payload frame into the list of tuples the cursor expects.
+    Each column is converted once (column_values) so psycopg2 receives native Python types.
+    """
+    return list(zip(*[column_values(df[c]) for c in columns]))
+
+def link_player_stats(ud_players, unique_games):
+    """
+    Joins every Understat player row to its match key with a single merge on game_id.
+    The payload carries 'match_key' in place of match_id; attach_match_ids resolves it at load time.
+    """
+    linked = ud_players.merge(unique_games[['game_id', 'match_key']], on='game_id', how='inner')
+
+    # Column selection keeps the typed dtypes (category / Int16 / float32)
+    payload = linked[['match_key', 'team', 'player_name'] + PLAYER_INT_COLUMNS + PLAYER_FLOAT_COLUMNS]
+    return coerce_frame(payload.reset_index(drop=True), UNDERSTAT_PLAYER_TYPES)
+
+def build_lineups_payload(matched_lineups):
+    """
+    Lineup insert payload built column-wise from the matched ESPN rows.
+    """
+    payload = matched_lineups[['match_key', 'team', 'player', 'position'] + LINEUP_INT_COLUMNS]
+    payload = coerce_frame(payload.reset_index(drop=True), ESPN_LINEUP_TYPES)
+    payload.insert(4, 'is_starter', (payload['position'] != 'Substitute').to_numpy())
+    return payload.rename(columns={'player': 'player_name'})
+
+def attach_match_ids(cur, payload, match_map, columns):
+    """
+    Resolves 'match_key' to matches.id (and the entity keys to team_id / player_id)
+    for the whole payload and returns insert rows.
+    Rows whose match is not in the database are dropped.
+    """
+    payload = attach_entity_ids(cur, payload)
+    match_ids = payload['match_key'].map(match_map)
+    linked = payload[match_ids.notna()].copy()
+    linked['match_id'] = match_ids[match_ids.notna()].astype('int64')
+    return frame_to_rows(linked, columns)
+
+def iter_insert_rows(cur, payload, match_map, columns, chunk_size=CHUNK_SIZE):
+    """
+    Generator of insert batches: resolves and converts the payload one slice of
+    chunk_size rows at a time, so only one batch of tuples is alive at once.
+    """
+    for start in range(0, len(payload), max(1, chunk_size)):
+        yield attach_match_ids(cur, payload.iloc[start:start + chunk_size], match_map, columns)
+
+def report_memory(season, stage, previous_peak):
+    """
+    Prints the process's peak RSS after a stage and how much the stage raised it.
+    Returns the new peak, to be passed to the next call.
+    """
+    peak = peak_rss_mb()
+    print(f"   [{season}] [MEM] {stage}: peak RSS {peak:.1f} MB (+{peak - previous_peak:.1f} MB)")
+    return peak
+
+def fingerprint_matches(unique_games, players_payload, lineups_payload):
+    """
+    One fingerprint per match_key covering the match row and every child row.
+    Row hashes are summed per match (mod 2**64), so the result does not depend on row order.
+    """
+    match_cols = ['match_key', 'home_goals', 'away_goals', 'home_xg', 'away_xg']
+    keys, hashes = [], []
+    for frame in (unique_games[match_cols], players_payload, lineups_payload):
+        if frame.empty:
+            continue
+        keys.append(frame['match_key'].to_numpy())
+        hashes.append(pd.util.hash_pandas_object(frame, index=False).to_numpy())
+
+    unique_keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    totals = np.zeros(len(unique_keys), dtype=np.uint64)
+    np.add.at(totals, inverse, np.concatenate(hashes))
+    return {k: f"{int(h):016x}" for k, h in zip(unique_keys, totals)}
+
+# --- SCRAPING (CACHED) ---
+def scrape_season(season, offline=False, refresh=False, source_dir=None, limits=None):
+    """
+    Returns the raw source frames for one season, served from the on-disk raw cache
+    when possible. All source reads run concurrently (see modules/sources.py);
+    source_dir switches to the local file-backed sources. limits: per-source
+    semaphores shared with other processes (sources.source_limits).
+    """
+    sources = default_sources(LEAGUE, source_dir=source_dir)
+    ud_matches, ud_players, espn_lineups = fetch_season(season, sources, LEAGUE, offline=offline, refresh=refresh,
+                                                        limits=limits)
+    return ud_matches, ud_players, espn_lineups
+
+# --- TRANSFORM (NO DATABASE ACCESS) ---
+def prepare_season(season, offline=False, lineup_tolerance_days=DATE_TOLERANCE_DAYS, source_dir=None, refresh=False,
+                   limits=None):
+    """
+    Scrapes and transforms one season into insert payloads keyed by match_key.
+    Touches no database, so it can run in a separate worker process.
+    refresh=True re-scrapes even when the raw cache holds a fresh copy.
+    """
+    mem = peak_rss_mb()
+
+    # 1. SCRAPE
+    print(f"   [{season}] Scraping Data..." if not offline else f"   [{season}] Loading Data (offline cache)...")
+    ud_matches, ud_players, espn_lineups = scrape_season(season, offline=offline, refresh=refresh, source_dir=source_dir,
+                                                         limits=limits)
+    report_memory(season, "scrape", mem)
+    return transform_season(season, ud_matches, ud_players, espn_lineups, lineup_tolerance_days)
+
+def transform_season(season, ud_matches, ud_players, espn_lineups, lineup_tolerance_days=DATE_TOLERANCE_DAYS):
+    """
+    Turns the three source frames of a season into the insert payloads.
+    Pure pandas (no scraping, no database): the benchmarks feed it synthetic frames.
+    """
+    mem = peak_rss_mb()
+    ud_players = standardize_columns(ud_players)
+
+    # Typed schema: each source frame is coerced once, column-wise
+    transform_start = time.time()
+    with stage("transform", season) as m:
+        ud_matches = coerce_frame(ud_matches, UNDERSTAT_MATCH_TYPES)
+        ud_players = coerce_frame(ud_players, UNDERSTAT_PLAYER_TYPES)
+        espn_lineups = coerce_frame(espn_lineups, ESPN_LINEUP_TYPES)
+
+        espn_lineups['date_str'] = espn_lineups['game'].str.split(' ').str[0]
+        espn_lineups['team'] = resolve_teams(espn_lineups['team'])
 
-def safe_int(val):
-    if pd.isna(val) or val == "":
-        return 0
+        # 2. MATCHES
+        unique_games = ud_matches.groupby('game_id').first().reset_index()
+
+        # Precompute the lookup key once per game instead of once per player row
+        unique_games['match_key'] = build_match_keys(
+            unique_games['date'], unique_games['home_team'], unique_games['away_team']
+        )
+        m["rows"] = len(ud_matches) + len(ud_players) + len(espn_lineups)
+
+    with stage("link", season) as m:
+        # 3. PLAYER STATS
+        players_payload = link_player_stats(ud_players, unique_games)
+
+        # 4. LINEUPS (hash-indexed matching, date tolerance covers suspended/rescheduled games)
+        unique_games['home_team_norm'] = resolve_teams(unique_games['home_team'])
+        unique_games['away_team_norm'] = resolve_teams(unique_games['away_team'])
+        matched_lineups = match_lineups(unique_games, espn_lineups, tolerance_days=lineup_tolerance_days)
+        lineups_payload = build_lineups_payload(matched_lineups)
+        m["rows"] = len(players_payload) + len(lineups_payload)
+    # The payloads hold everything the load needs: release the source frames
+    del ud_matches, ud_players, espn_lineups, matched_lineups
+
+    with stage("transform", season) as m:
+        # One row per natural key (match, team, player) so the upserts never hit the same row twice
+        players_payload = players_payload.drop_duplicates(subset=NATURAL_KEY, keep='last')
+        lineups_payload = lineups_payload.drop_duplicates(subset=NATURAL_KEY, keep='last')
+
+        # 5. FINGERPRINTS (used by the incremental mode to detect changed matches)
+        fingerprints = fingerprint_matches(unique_games, players_payload, lineups_payload)
+
+        # Child tables carry the season too (partition key), plus the resolved entity keys
+        players_payload.insert(0, 'season', season)
+        lineups_payload.insert(0, 'season', season)
+        aliases = learn_player_aliases(players_payload, lineups_payload)
+        players_payload = entity_key_columns(players_payload)
+        lineups_payload = entity_key_columns(lineups_payload, aliases)
+
+        matches_frame = pd.DataFrame({
+            'season': season,
+            'date': pd.to_datetime(unique_games['date']).dt.strftime('%Y-%m-%d'),
+            'home_team': unique_games['home_team'],
+            'away_team': unique_games['away_team'],
+            'home_score': unique_games['home_goals'],
+            'away_score': unique_games['away_goals'],
+            'home_xg': unique_games['home_xg'],
+            'away_xg': unique_games['away_xg'],
+            'fingerprint': unique_games['match_key'].map(fingerprints),
+        })
+        matches_to_insert = frame_to_rows(matches_frame, MATCH_COLUMNS)
+        m["rows"] = len(players_payload) + len(lineups_payload) + len(matches_to_insert)
+
+    elapsed = time.time() - transform_start
+    n_rows = len(players_payload) + len(lineups_payload)
+    print(f"   [{season}] [TRANSFORM] {len(players_payload)} player rows "
+          f"({frame_memory_mb(players_payload):.1f} MB), {len(lineups_payload)} lineup rows "
+          f"({frame_memory_mb(lineups_payload):.1f} MB) in {elapsed:.2f}s "
+          f"({n_rows / elapsed if elapsed > 0 else 0.0:,.0f} rows/sec)")
+    report_memory(season, "transform", mem)
+    return {
+        "season": season,
+        "matches": matches_to_insert,
+        "match_keys": unique_games['match_key'].tolist(),
+        "players": players_payload,
+        "lineups": lineups_payload,
+    }
+
+# --- LOAD ---
+def fetch_match_map(cur, season):
+    cur.execute("SELECT id, date, home_team, away_team FROM matches WHERE season = %s", (season,))
+    db_matches = cur.fetchall()
+    return {f"{str(m[1])}|{normalize_name(m[2])}|{normalize_name(m[3])}": m[0] for m in db_matches}
+
+def load_season(conn, prepared, loader="executemany", chunk_size=CHUNK_SIZE):
+    """
+    Writes one prepared season in a single transaction: either the whole season
+    is committed or nothing is (the transaction is rolled back on any error).
+    """
+    season = prepared["season"]
+    mem = peak_rss_mb()
+    cur = conn.cursor()
     try:
-        return int(float(val))
-    except:
-        return 0
+        print(f"   [{season}] [1/3] Inserting Matches...")
+        with stage("insert.matches", season) as m:
+            m["rows"], _ = insert_rows(
+                cur, "matches", MATCH_COLUMNS, prepared["matches"], loader=loader,
+                conflict_clause="ON CONFLICT (season, date, home_team, away_team) DO NOTHING"
+            )
+            match_map = fetch_match_map(cur, season)
 
-# --- MAIN ENGINE ---
-def run_ingestion(seasons=["2023"]):
-    seasons_to_process = seasons
-    
-    total_start_time = time.time()
-    print(f"\n--- STARTING MULTI-SEASON INGESTION: {seasons_to_process} ---")
+        print(f"   [{season}] [2/3] Inserting Player Stats...")
+        with stage("insert.player_stats", season) as m:
+            m["rows"], _ = insert_chunks(
+                cur, "player_stats", PLAYER_STATS_COLUMNS,
+                iter_insert_rows(cur, prepared["players"], match_map, PLAYER_STATS_COLUMNS, chunk_size),
+                loader=loader, conflict_clause=upsert_clause("player_stats", PLAYER_STATS_COLUMNS)
+            )
+        mem = report_memory(season, "load player_stats", mem)
 
-    conn = get_db_connection()
+        print(f"   [{season}] [3/3] Inserting Lineups...")
+        with stage("insert.lineups", season) as m:
+            m["rows"], _ = insert_chunks(
+                cur, "lineups", LINEUP_COLUMNS,
+                iter_insert_rows(cur, prepared["lineups"], match_map, LINEUP_COLUMNS, chunk_size),
+                loader=loader, conflict_clause=upsert_clause("lineups", LINEUP_COLUMNS)
+            )
+        report_memory(season, "load lineups", mem)
+
+        with stage("refresh_aggregates", season):
+            refresh_aggregates(cur, season)
+            bump_data_version(cur, season)
+        with stage("commit", season):
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+def load_season_incremental(conn, prepared, loader="executemany", chunk_size=CHUNK_SIZE):
+    """
+    Matchday delta load: compares the scraped season against the stored matches by
+    (season, date, home_team, away_team) key and fingerprint, and only writes the
+    matches that are new or changed. Changed matches get their child rows replaced.
+    """
+    season = prepared["season"]
     cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT id, date, home_team, away_team, fingerprint FROM matches WHERE season = %s", (season,)
+        )
+        stored = {
+            f"{str(m[1])}|{normalize_name(m[2])}|{normalize_name(m[3])}": (m[0], m[4]) for m in cur.fetchall()
+        }
 
-    for season in seasons_to_process:
-        season_start_time = time.time()
-        print(f"\n>> PROCESSING SEASON: {season}")
+        new_rows, changed_rows, changed_ids, delta_keys = [], [], [], set()
+        for key, row in zip(prepared["match_keys"], prepared["matches"]):
+            if key not in stored:
+                new_rows.append(row)
+                delta_keys.add(key)
+            elif stored[key][1] != row[-1]:
+                changed_rows.append(row)
+                changed_ids.append(stored[key][0])
+                delta_keys.add(key)
 
-        # 1. SCRAPE
-        print("   [1/4] Scraping Data...")
-        understat = sd.Understat(leagues=LEAGUE, seasons=season)
-        espn = sd.ESPN(leagues=LEAGUE, seasons=season)
+        print(f"   [{season}] Delta: {len(new_rows)} new, {len(changed_rows)} changed, "
+              f"{len(prepared['matches']) - len(new_rows) - len(changed_rows)} unchanged matches.")
+        if not delta_keys:
+            conn.commit()
+            return
 
-        ud_matches = understat.read_team_match_stats().reset_index()
-        ud_players = standardize_columns(understat.read_player_match_stats().reset_index())
-        
-        espn_lineups = espn.read_lineup().reset_index()
-        espn_lineups['date_str'] = espn_lineups['game'].apply(parse_espn_date)
-        espn_lineups['team'] = espn_lineups['team'].apply(normalize_name)
+        if changed_ids:
+            cur.executemany("""
+                UPDATE matches
+                SET home_score = %s, away_score = %s, home_xg = %s, away_xg = %s, fingerprint = %s
+                WHERE id = %s;
+            """, [(r[4], r[5], r[6], r[7], r[8], m_id) for r, m_id in zip(changed_rows, changed_ids)])
+            cur.execute("DELETE FROM player_stats WHERE season = %s AND match_id = ANY(%s);", (season, changed_ids))
+            cur.execute("DELETE FROM lineups WHERE season = %s AND match_id = ANY(%s);", (season, changed_ids))
 
-        # 2. INSERT MATCHES
-        print("   [2/4] Inserting Matches...")
-        unique_games = ud_matches.groupby('game_id').first().reset_index()
-        matches_to_insert = []
-        
-        for _, row in unique_games.iterrows():
-            matches_to_insert.append((
-                season, 
-                row['date'].strftime('%Y-%m-%d'),
-                row['home_team'],
-                row['away_team'],
-                int(row['home_goals']),
-                int(row['away_goals']),
-                float(row['home_xg']),
-                float(row['away_xg'])
-            ))
-
-        match_sql = """
-            INSERT INTO matches (season, date, home_team, away_team, home_score, away_score, home_xg, away_xg)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (season, date, home_team, away_team) DO NOTHING;
-        """
-        cur.executemany(match_sql, matches_to_insert)
-        conn.commit()
+        with stage("insert.matches", season) as m:
+            m["rows"], _ = insert_rows(
+                cur, "matches", MATCH_COLUMNS, new_rows, loader=loader,
+                conflict_clause="ON CONFLICT (season, date, home_team, away_team) DO NOTHING"
+            )
+            match_map = fetch_match_map(cur, season)
 
-        # 3. BUILD ID MAP
-        cur.execute("SELECT id, date, home_team, away_team FROM matches WHERE season = %s", (season,))
-        db_matches = cur.fetchall()
-        match_map = {f"{str(m[1])}|{normalize_name(m[2])}|{normalize_name(m[3])}": m[0] for m in db_matches}
-
-        # 4. INSERT PLAYER STATS
-        print("   [3/4] Inserting Player Stats...")
-        players_to_insert = []
-        for _, row in ud_players.iterrows():
-            game_meta = unique_games[unique_games['game_id'] == row['game_id']].iloc[0]
-            g_date = game_meta['date'].strftime('%Y-%m-%d')
-            h_team = normalize_name(game_meta['home_team'])
-            a_team = normalize_name(game_meta['away_team'])
-            
-            m_id = match_map.get(f"{g_date}|{h_team}|{a_team}")
-            
-            if m_id:
-                players_to_insert.append((
-                    m_id, row['team'], row['player_name'], safe_int(row['minutes']),
-                    safe_int(row['goals']), safe_int(row['assists']), safe_int(row['shots']),
-                    float(row['xg']), float(row['xa']), float(row['xg_chain']),
-                    float(row['xg_buildup']), safe_int(row['key_passes']),
-                    safe_int(row['yellow_card']), safe_int(row['red_card'])
-                ))
-        
-        p_sql = """
-            INSERT INTO player_stats (match_id, team, player_name, minutes, goals, assists, shots, xg, xa, xg_chain, xg_buildup, key_passes, yellow_card, red_card)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cur.executemany(p_sql, players_to_insert)
-        conn.commit()
+        players = prepared["players"][prepared["players"]['match_key'].isin(delta_keys)]
+        with stage("insert.player_stats", season) as m:
+            m["rows"], _ = insert_chunks(
+                cur, "player_stats", PLAYER_STATS_COLUMNS,
+                iter_insert_rows(cur, players, match_map, PLAYER_STATS_COLUMNS, chunk_size), loader=loader,
+                conflict_clause=upsert_clause("player_stats", PLAYER_STATS_COLUMNS)
+            )
 
-        # 5. INSERT LINEUPS (With Suspended Match Fix)
-        print("   [4/4] Inserting Lineups...")
-        lineups_to_insert = []
-        for _, game in unique_games.iterrows():
-            g_date = game['date'].strftime('%Y-%m-%d')
-            h_team = normalize_name(game['home_team'])
-            a_team = normalize_name(game['away_team'])
-            
-            m_id = match_map.get(f"{g_date}|{h_team}|{a_team}")
-            if not m_id: continue
-
-            target_dates = [g_date]
-            if h_team == "Granada" and a_team == "Athletic Club" and "2023-12" in g_date:
-                target_dates = ["2023-12-10", "2023-12-11", "2023-12-12"]
-
-            rows = espn_lineups[
-                (espn_lineups['date_str'].isin(target_dates)) & 
-                (espn_lineups['team'].isin([h_team, a_team]))
-            ]
-
-            for _, p in rows.iterrows():
-                lineups_to_insert.append((
-                    m_id, p['team'], p['player'], p['position'], (p['position'] != 'Substitute'),
-                    safe_int(p['shots_on_target']), safe_int(p['fouls_committed']),
-                    safe_int(p['fouls_suffered']), safe_int(p['offsides']),
-                    safe_int(p['saves']), safe_int(p['goals_conceded'])
-                ))
-
-        l_sql = """
-            INSERT INTO lineups (match_id, team, player_name, position, is_starter, shots_on_target, fouls_committed, fouls_suffered, offsides, saves, goals_conceded)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cur.executemany(l_sql, lineups_to_insert)
-        conn.commit()
-        
-        print(f"   >> Season {season} done in {time.time() - season_start_time:.2f} seconds.")
+        lineups = prepared["lineups"][prepared["lineups"]['match_key'].isin(delta_keys)]
+        with stage("insert.lineups", season) as m:
+            m["rows"], _ = insert_chunks(
+                cur, "lineups", LINEUP_COLUMNS,
+                iter_insert_rows(cur, lineups, match_map, LINEUP_COLUMNS, chunk_size), loader=loader,
+                conflict_clause=upsert_clause("lineups", LINEUP_COLUMNS)
+            )
+
+        with stage("refresh_aggregates", season):
+            refresh_aggregates(cur, season)
+            bump_data_version(cur, season)
+        with stage("commit", season):
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+def partition_suffix(season):
+    """
+    Mirrors ensure_season_partitions() in migration 0004: '2023' -> 's2023'.
+    """
+    return "s" + re.sub(r"[^0-9A-Za-z]", "_", str(season))
 
+def ensure_partitions(conn, seasons):
+    """
+    Creates the per-season partitions in their own short transaction, so parallel
+    writers never hold the parent-table lock for the length of a season load.
+    """
+    cur = conn.cursor()
+    for season in seasons:
+        cur.execute("SELECT ensure_season_partitions(%s);", (season,))
+    conn.commit()
     cur.close()
-    conn.close()
+
+def load_season_swap(conn, prepared, loader="executemany", chunk_size=CHUNK_SIZE):
+    """
+    Loads a season into detached staging tables, then swaps them in atomically:
+    the old season partitions are detached and dropped and the new ones attached
+    in one short transaction. Readers see either the old season or the new one.
+    """
+    season = prepared["season"]
+    suffix = partition_suffix(season)
+    parents = PARTITIONED_TABLES
+    staging = {t: f"{t}_{suffix}_load" for t in parents}
+    cur = conn.cursor()
+
+    # 1. Load into standalone tables (same columns and id sequences as the parents)
+    try:
+        for table in parents:
+            cur.execute(f"DROP TABLE IF EXISTS {staging[table]};")
+            cur.execute(f"CREATE TABLE {staging[table]} (LIKE {table} INCLUDING DEFAULTS);")
+            # Matches the partition bound, so ATTACH can skip its validation scan
+            cur.execute(f"ALTER TABLE {staging[table]} ADD CHECK (season = %s);", (season,))
+
+        print(f"   [{season}] [1/4] Loading detached partitions...")
+        with stage("insert.matches", season) as m:
+            m["rows"], _ = insert_rows(cur, staging["matches"], MATCH_COLUMNS, prepared["matches"], loader=loader)
+            cur.execute(f"SELECT id, date, home_team, away_team FROM {staging['matches']};")
+            match_map = {f"{str(r[1])}|{normalize_name(r[2])}|{normalize_name(r[3])}": r[0] for r in cur.fetchall()}
+        with stage("insert.player_stats", season) as m:
+            m["rows"], _ = insert_chunks(
+                cur, staging["player_stats"], PLAYER_STATS_COLUMNS,
+                iter_insert_rows(cur, prepared["players"], match_map, PLAYER_STATS_COLUMNS, chunk_size),
+                loader=loader
+            )
+        with stage("insert.lineups", season) as m:
+            m["rows"], _ = insert_chunks(
+                cur, staging["lineups"], LINEUP_COLUMNS,
+                iter_insert_rows(cur, prepared["lineups"], match_map, LINEUP_COLUMNS, chunk_size),
+                loader=loader
+            )
+        with stage("commit", season):
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        for table in parents:
+            cur.execute(f"DROP TABLE IF EXISTS {staging[table]};")
+        conn.commit()
+        cur.close()
+        raise
+
+    # 2. Swap: children are detached before matches (FKs), attached after it
+    try:
+        print(f"   [{season}] [2/4] Detaching old season partitions...")
+        for table in reversed(parents):
+            cur.execute("SELECT to_regclass(%s);", (f"{table}_{suffix}",))
+            if cur.fetchone()[0] is not None:
+                cur.execute(f"ALTER TABLE {table} DETACH PARTITION {table}_{suffix};")
+                cur.execute(f"DROP TABLE {table}_{suffix};")
+
+        print(f"   [{season}] [3/4] Attaching new season partitions...")
+        for table in parents:
+            cur.execute(f"ALTER TABLE {staging[table]} RENAME TO {table}_{suffix};")
+            cur.execute(f"ALTER TABLE {table} ATTACH PARTITION {table}_{suffix} FOR VALUES IN (%s);", (season,))
+
+        with stage("refresh_aggregates", season):
+            refresh_aggregates(cur, season)
+            bump_data_version(cur, season)
+        print(f"   [{season}] [4/4] Committing swap...")
+        with stage("commit", season):
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+LOAD_MODES = {
+    "full": load_season,
+    "incremental": load_season_incremental,
+    "swap": load_season_swap,
+}
+
+def _load_on_own_connection(prepared, loader, mode="full", chunk_size=CHUNK_SIZE):
+    """
+    Writer task for the parallel mode: each writer thread holds one connection.
+    """
+    conn = get_db_connection()
+    try:
+        LOAD_MODES[mode](conn, prepared, loader=loader, chunk_size=chunk_size)
+    finally:
+        conn.close()
+
+def print_summary(results, seasons):
+    print("\n--- INGESTION SUMMARY ---")
+    for season in seasons:
+        print(f"   {season}: {results.get(season, 'NOT RUN')}")
+
+# --- MAIN ENGINE ---
+def run_parallel_ingestion(seasons, loader="executemany", offline=False, workers=2, writers=2, mode="full",
+                           lineup_tolerance_days=DATE_TOLERANCE_DAYS, chunk_size=CHUNK_SIZE, source_dir=None,
+                           refresh=False):
+    """
+    Scrape/transform runs in a pool of `workers` processes; as each season becomes
+    ready it is handed to a pool of `writers` threads, one DB connection each.
+    At most workers + writers seasons are in flight (being prepared, waiting for
+    a writer or being written): a season is only submitted for preparation once
+    an earlier one has been written, so slow writes cannot pile up prepared
+    payloads in memory.
+    The per-source scrape limits are semaphores on a multiprocessing.Manager,
+    so they cap the sum over all worker processes (not each one).
+    A failed season is reported and skipped; the others still commit.
+    """
+    results = {}
+    depth = workers + writers
+    slots = threading.BoundedSemaphore(depth)
+
+    def finish_load(season, future):
+        try:
+            future.result()
+            results[season] = "OK"
+        except Exception as e:
+            results[season] = f"FAILED during load: {e}"
+        finally:
+            slots.release()
+
+    def hand_off(season, future):
+        # Runs when a preparation completes; the payload only lives until its load ends
+        try:
+            prepared = future.result()
+        except Exception as e:
+            results[season] = f"FAILED during scrape/transform: {e}"
+            slots.release()
+            return
+        try:
+            load = writer_pool.submit(_load_on_own_connection, prepared, loader, mode, chunk_size)
+        except Exception as e:
+            results[season] = f"FAILED during load: {e}"
+            slots.release()
+            return
+        load.add_done_callback(lambda f: finish_load(season, f))
+
+    with multiprocessing.Manager() as manager, \
+         ProcessPoolExecutor(max_workers=workers) as prepare_pool, \
+         ThreadPoolExecutor(max_workers=writers) as writer_pool:
+        limits = source_limits(default_sources(LEAGUE, source_dir=source_dir), manager)
+        for season in seasons:
+            slots.acquire()  # blocks while `depth` seasons are in flight
+            prepare = prepare_pool.submit(
+                prepare_season, season, offline, lineup_tolerance_days, source_dir, refresh, limits
+            )
+            prepare.add_done_callback(lambda f, season=season: hand_off(season, f))
+        for _ in range(depth):  # wait until every season has been written (or failed)
+            slots.acquire()
+    return results
+
+def run_ingestion(seasons=["2023"], loader="executemany", offline=False, workers=1, writers=2, mode="full",
+                  lineup_tolerance_days=DATE_TOLERANCE_DAYS, chunk_size=CHUNK_SIZE,
+                  metrics_path=None, profile_dir=None, source_dir=None, features=True, refresh=False):
+    """
+    mode: 'full' (upsert every row), 'incremental' (only new/changed matches)
+    or 'swap' (load detached partitions and attach them atomically).
+    chunk_size: rows per flushed insert batch.
+    Stage metrics go to metrics_path (JSON lines); profile_dir enables per-stage cProfile dumps.
+    source_dir reads the source frames from local files instead of scraping.
+    refresh: re-scrape every source frame, ignoring the raw cache.
+    features: update the feature store (modules/features.py) for the loaded seasons.
+    """
+    seasons_to_process = seasons
+    backend = get_backend()
+    if mode == "swap" and not backend.supports_swap:
+        raise ValueError(f"Swap-partition loads need PostgreSQL (storage backend: {backend.name}).")
+    if workers > 1 and not backend.supports_parallel_writers:
+        raise ValueError(f"Parallel loads (--workers {workers}) need PostgreSQL (storage backend: {backend.name}).")
+    configure_metrics(metrics_path=metrics_path, profile_dir=profile_dir)
+    
+    total_start_time = time.time()
+    print(f"\n--- STARTING MULTI-SEASON INGESTION: {seasons_to_process} "
+          f"(mode: {mode}, loader: {loader}, workers: {workers}, backend: {backend.name}) ---")
+
+    conn = backend.connect()
+    backend.ensure_schema(conn)
+    if mode != "swap":
+        ensure_partitions(conn, seasons_to_process)
+
+    if workers > 1:
+        conn.close()
+        results = run_parallel_ingestion(
+            seasons_to_process, loader=loader, offline=offline,
+            workers=workers, writers=max(1, writers), mode=mode,
+            lineup_tolerance_days=lineup_tolerance_days, chunk_size=chunk_size, source_dir=source_dir,
+            refresh=refresh
+        )
+    else:
+        results = {}
+        load = LOAD_MODES[mode]
+        for season in seasons_to_process:
+            season_start_time = time.time()
+            print(f"\n>> PROCESSING SEASON: {season}")
+            try:
+                prepared = prepare_season(season, offline=offline, lineup_tolerance_days=lineup_tolerance_days,
+                                          source_dir=source_dir, refresh=refresh)
+                load(conn, prepared, loader=loader, chunk_size=chunk_size)
+                del prepared
+                results[season] = "OK"
+            except Exception as e:
+                results[season] = f"FAILED: {e}"
+                print(f"   [ERROR] Season {season} failed: {e}")
+                continue
+            print(f"   >> Season {season} done in {time.time() - season_start_time:.2f} seconds.")
+        conn.close()
+
+    loaded = [season for season in seasons_to_process if results.get(season) == "OK"]
+    if features and loaded:
+        print("\n>> UPDATING FEATURE STORE")
+        conn = backend.connect()
+        try:
+            run_feature_stage(conn, loaded, loader=loader)
+        except Exception as e:
+            print(f"   [ERROR] Feature store update failed: {e}")
+        finally:
+            conn.close()
+
+    # Seasons written above bumped their data version: cached results for them are stale
+    forget_versions()
+    print_summary(results, seasons_to_process)
+    print_stage_summary()
     print(f"\nTOTAL TIME: {time.time() - total_start_time:.2f} seconds.")
+    return results
 
 if __name__ == "__main__":
-    run_ingestion(seasons=["2023"])
\ No newline at end of file
+    run_ingestion(seasons=["2023"])
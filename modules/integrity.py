@@ -0,0 +1,176 @@
+from modules.backends import connect, dialect
+
+# ==============================================================================
+# INTEGRITY ENGINE
+# ==============================================================================
+# Volume, orphan, ghost and standings checks for any number of seasons in a
+# single server-side query. Only counts, offending match ids and the top of
+# each league table come back over the wire:
+#   volume      -> matches / matches with stats / matches with lineups
+#   orphans     -> matches without stats or without lineups (ids)
+#   ghosts      -> stat / lineup rows pointing at a match that does not exist (ids)
+#   standings   -> teams and top 3 of the stored league table (agg_standings,
+#                  positions from the standings engine's head-to-head order)
+# ==============================================================================
+
+FULL_SEASON_MATCHES = 380
+
+# Historical champions used as a sanity check: season -> (team, points)
+KNOWN_CHAMPIONS = {
+    "2023": ("Real Madrid", 95),
+}
+
+INTEGRITY_SQL = """
+    WITH s AS (
+        SELECT DISTINCT unnest(%(seasons)s::text[]) AS season
+    ),
+    m AS (
+        SELECT season, id FROM matches WHERE season = ANY(%(seasons)s)
+    ),
+    ps AS (
+        SELECT season, match_id FROM player_stats WHERE season = ANY(%(seasons)s) GROUP BY season, match_id
+    ),
+    lu AS (
+        SELECT season, match_id FROM lineups WHERE season = ANY(%(seasons)s) GROUP BY season, match_id
+    ),
+    coverage AS (
+        SELECT m.season,
+               COUNT(*) AS total_matches,
+               COUNT(ps.match_id) AS matches_with_stats,
+               COUNT(lu.match_id) AS matches_with_lineups,
+               ARRAY_AGG(m.id ORDER BY m.id) FILTER (WHERE ps.match_id IS NULL) AS matches_without_stats,
+               ARRAY_AGG(m.id ORDER BY m.id) FILTER (WHERE lu.match_id IS NULL) AS matches_without_lineups
+        FROM m
+        LEFT JOIN ps ON ps.season = m.season AND ps.match_id = m.id
+        LEFT JOIN lu ON lu.season = m.season AND lu.match_id = m.id
+        GROUP BY m.season
+    ),
+    ghosts AS (
+        SELECT c.season,
+               ARRAY_AGG(c.match_id ORDER BY c.match_id) FILTER (WHERE c.source = 'player_stats') AS ghost_stats,
+               ARRAY_AGG(c.match_id ORDER BY c.match_id) FILTER (WHERE c.source = 'lineups') AS ghost_lineups
+        FROM (
+            SELECT season, match_id, 'player_stats' AS source FROM ps
+            UNION ALL
+            SELECT season, match_id, 'lineups' FROM lu
+        ) c
+        LEFT JOIN m ON m.season = c.season AND m.id = c.match_id
+        WHERE m.id IS NULL
+        GROUP BY c.season
+    ),
+    ranked AS (
+        SELECT season, team, points, gd, gf, position
+        FROM agg_standings WHERE season = ANY(%(seasons)s)
+    ),
+    standings AS (
+        SELECT season, COUNT(*) AS teams,
+               {top3_agg} FILTER (WHERE position <= 3) AS top3
+        FROM ranked
+        GROUP BY season
+    )
+    SELECT s.season,
+           COALESCE(c.total_matches, 0), COALESCE(c.matches_with_stats, 0), COALESCE(c.matches_with_lineups, 0),
+           COALESCE(c.matches_without_stats, {empty_ids}), COALESCE(c.matches_without_lineups, {empty_ids}),
+           COALESCE(g.ghost_stats, {empty_ids}), COALESCE(g.ghost_lineups, {empty_ids}),
+           COALESCE(st.teams, 0), COALESCE(st.top3, {empty_top3})
+    FROM s
+    LEFT JOIN coverage c ON c.season = s.season
+    LEFT JOIN ghosts g ON g.season = s.season
+    LEFT JOIN standings st ON st.season = s.season
+    ORDER BY s.season;
+"""
+
+# Per-backend fragments of INTEGRITY_SQL: PostgreSQL returns the top 3 as JSON,
+# DuckDB as a list of structs (both arrive as lists of dicts)
+INTEGRITY_DIALECTS = {
+    "postgres": {
+        "top3_agg": "JSON_AGG(JSON_BUILD_OBJECT('team', team, 'points', points, 'gd', gd, 'gf', gf) ORDER BY position)",
+        "empty_ids": "'{}'",
+        "empty_top3": "'[]'::json",
+    },
+    "duckdb": {
+        "top3_agg": "ARRAY_AGG({'team': team, 'points': points, 'gd': gd, 'gf': gf} ORDER BY position)",
+        "empty_ids": "[]",
+        "empty_top3": "[]",
+    },
+}
+
+RESULT_COLUMNS = [
+    "season", "total_matches", "matches_with_stats", "matches_with_lineups",
+    "matches_without_stats", "matches_without_lineups", "ghost_stats", "ghost_lineups",
+    "teams", "top3",
+]
+
+def fetch_integrity(seasons, conn=None):
+    """
+    Raw per-season figures for every season, from one query (one round-trip).
+    A connection passed in by the caller keeps its open transaction.
+    """
+    own_conn = conn is None
+    conn = conn or connect()
+    try:
+        cur = conn.cursor()
+        sql = INTEGRITY_SQL.format(**INTEGRITY_DIALECTS[dialect(conn)])
+        cur.execute(sql, {"seasons": [str(s) for s in seasons]})
+        rows = [dict(zip(RESULT_COLUMNS, row)) for row in cur.fetchall()]
+        cur.close()
+        if own_conn:
+            conn.rollback()  # read-only: end the transaction before the connection goes back to the pool
+    finally:
+        if own_conn:
+            conn.close()
+    return rows
+
+def evaluate(row):
+    """
+    Turns one season's figures into PASS / WARN / FAIL verdicts per check.
+    """
+    matches = row["total_matches"]
+    checks = {}
+
+    if matches == 0:
+        checks["volume"] = ("FAIL", "0 matches found.")
+    elif row["matches_with_stats"] != matches or row["matches_with_lineups"] != matches:
+        checks["volume"] = ("FAIL", f"{matches} matches, {row['matches_with_stats']} with stats, "
+                                    f"{row['matches_with_lineups']} with lineups.")
+    elif matches != FULL_SEASON_MATCHES:
+        checks["volume"] = ("WARN", f"{matches} matches (season might be ongoing or incomplete).")
+    else:
+        checks["volume"] = ("PASS", f"Full {FULL_SEASON_MATCHES} match season, all tables synchronized.")
+
+    ghosts = len(row["ghost_stats"]) + len(row["ghost_lineups"])
+    checks["consistency"] = ("PASS", "No 'Ghost' data found.") if ghosts == 0 else \
+        ("FAIL", f"{ghosts} match id(s) referenced by stats/lineups but missing from matches.")
+
+    top = row["top3"][0] if row["top3"] else None
+    known = KNOWN_CHAMPIONS.get(row["season"])
+    if top is None:
+        checks["reality"] = ("FAIL", "Could not calculate standings.")
+    elif known and (top["team"], top["points"]) != known:
+        checks["reality"] = ("WARN", f"Top team {top['team']} ({top['points']} pts), expected {known[0]} ({known[1]} pts).")
+    else:
+        checks["reality"] = ("PASS", f"Leader: {top['team']} ({top['points']} pts, {row['teams']} teams).")
+
+    statuses = [status for status, _ in checks.values()]
+    overall = "FAIL" if "FAIL" in statuses else "WARN" if "WARN" in statuses else "PASS"
+    return {**row, "checks": {k: {"status": s, "detail": d} for k, (s, d) in checks.items()}, "status": overall}
+
+def run_integrity(seasons, conn=None):
+    """
+    Evaluated integrity results, one dict per season.
+    """
+    return [evaluate(row) for row in fetch_integrity(seasons, conn=conn)]
+
+def print_report(results):
+    for r in results:
+        print(f"\n SEASON {r['season']}  [{r['status']}]")
+        print("-" * 50)
+        print(f"   > Matches: {r['total_matches']} | With Stats: {r['matches_with_stats']} "
+              f"| With Lineups: {r['matches_with_lineups']}")
+        for name, check in r["checks"].items():
+            print(f"[{check['status']}] {name}: {check['detail']}")
+        if r["matches_without_stats"] or r["matches_without_lineups"]:
+            print(f"   > Orphan matches without stats: {r['matches_without_stats'][:20]}, "
+                  f"without lineups: {r['matches_without_lineups'][:20]}")
+        for i, team in enumerate(r["top3"], start=1):
+            print(f"   {i}. {team['team']:<20} {team['points']:>4} pts  GD {team['gd']:>+4}")
@@ -0,0 +1,81 @@
+import os
+import pandas as pd
+from dotenv import load_dotenv
+
+# ==============================================================================
+# LINEUP MATCHING ENGINE
+# ==============================================================================
+# Links ESPN lineup rows to Understat games. ESPN rows are keyed once by
+# (date, normalized team) and every game side is resolved with hash joins:
+#   1. exact pass   -> the game's own date
+#   2. shift passes -> +1, -1, +2, -2 ... days up to the tolerance window, only
+#                      for sides the exact pass missed (suspended/rescheduled
+#                      fixtures where the two sources disagree on the date)
+# An ESPN (date, team) block is claimed by at most one game.
+# ==============================================================================
+
+load_dotenv()
+DATE_TOLERANCE_DAYS = int(os.getenv("LINEUP_DATE_TOLERANCE_DAYS", "2"))
+
+def shift_offsets(tolerance_days):
+    """
+    0, +1, -1, +2, -2, ... : nearest dates are tried first.
+    """
+    offsets = [0]
+    for d in range(1, tolerance_days + 1):
+        offsets += [d, -d]
+    return offsets
+
+def game_sides(games):
+    """
+    Two rows per game (home side, away side): match_key, team, game date.
+    games must carry match_key, date, home_team_norm and away_team_norm.
+    """
+    keys = games['match_key'].to_numpy()
+    dates = pd.to_datetime(games['date']).dt.normalize().to_numpy()
+    home = pd.DataFrame({'match_key': keys, 'team': games['home_team_norm'].to_numpy(), 'game_date': dates})
+    away = pd.DataFrame({'match_key': keys, 'team': games['away_team_norm'].to_numpy(), 'game_date': dates})
+    return pd.concat([home, away], ignore_index=True)
+
+def resolve_lineup_blocks(games, espn_lineups, tolerance_days=DATE_TOLERANCE_DAYS):
+    """
+    Returns one row per resolved game side: match_key, team, date_str (the ESPN date
+    the side was found under) and offset_days (0 for exact matches).
+    """
+    blocks = espn_lineups[['date_str', 'team']].drop_duplicates()
+    pending = game_sides(games)
+    resolved = []
+
+    for offset in shift_offsets(tolerance_days):
+        if pending.empty or blocks.empty:
+            break
+        candidates = pending.assign(
+            date_str=(pending['game_date'] + pd.Timedelta(days=offset)).dt.strftime('%Y-%m-%d')
+        )
+        hits = candidates.merge(blocks, on=['date_str', 'team'], how='inner')
+        # A shifted block may be reachable from two games: keep the first claim
+        hits = hits.drop_duplicates(subset=['date_str', 'team'])
+        if hits.empty:
+            continue
+        hits['offset_days'] = offset
+        resolved.append(hits[['match_key', 'team', 'date_str', 'offset_days']])
+
+        claimed_sides = pd.MultiIndex.from_frame(hits[['match_key', 'team']])
+        pending = pending[~pd.MultiIndex.from_frame(pending[['match_key', 'team']]).isin(claimed_sides)]
+        claimed_blocks = pd.MultiIndex.from_frame(hits[['date_str', 'team']])
+        blocks = blocks[~pd.MultiIndex.from_frame(blocks[['date_str', 'team']]).isin(claimed_blocks)]
+
+    if not resolved:
+        return pd.DataFrame(columns=['match_key', 'team', 'date_str', 'offset_days'])
+    return pd.concat(resolved, ignore_index=True)
+
+def match_lineups(games, espn_lineups, tolerance_days=DATE_TOLERANCE_DAYS):
+    """
+    Attaches 'match_key' to every ESPN lineup row that belongs to one of the games,
+    in a single join. Rows of unresolved blocks are dropped.
+    """
+    sides = resolve_lineup_blocks(games, espn_lineups, tolerance_days)
+    shifted = sides[sides['offset_days'] != 0]
+    for row in shifted.itertuples(index=False):
+        print(f"      [LINEUPS] {row.team} matched {row.offset_days:+d} day(s) off for {row.match_key}")
+    return espn_lineups.merge(sides[['match_key', 'team', 'date_str']], on=['date_str', 'team'], how='inner')
@@ -0,0 +1,101 @@
+import csv
+import io
+import time
+
+# ==============================================================================
+# BULK LOADERS
+# ==============================================================================
+# Two ways of pushing a prepared batch (list of tuples) into PostgreSQL:
+#   executemany -> one INSERT round-trip per row (psycopg2 default behaviour)
+#   copy        -> the whole batch streamed through COPY FROM STDIN in one go
+# insert_chunks() takes an iterator of batches instead, so a large payload is
+# flushed chunk by chunk and never exists as one list of tuples.
+# Tables with a conflict key (matches) go through a temporary staging table so
+# the COPY path keeps the same ON CONFLICT semantics as the INSERT path.
+# ==============================================================================
+
+LOADERS = ("executemany", "copy")
+
+def rows_to_csv_buffer(rows):
+    """
+    Serializes a batch of tuples into an in-memory CSV buffer for COPY.
+    None is written as an empty unquoted field, which COPY reads as NULL.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(rows)
+    buffer.seek(0)
+    return buffer
+
+def copy_rows(cur, table, columns, rows):
+    """
+    Streams rows into a table with a single COPY FROM STDIN.
+    """
+    buffer = rows_to_csv_buffer(rows)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+def copy_rows_with_conflict(cur, table, columns, rows, conflict_clause):
+    """
+    COPY into a temporary staging table, then INSERT ... SELECT into the target so
+    the ON CONFLICT clause still applies. The staging table only carries the
+    loaded columns, so the target's SERIAL sequence is not consumed twice.
+    """
+    staging = f"staging_{table}"
+    col_list = ', '.join(columns)
+    cur.execute(f"DROP TABLE IF EXISTS {staging};")
+    cur.execute(f"CREATE TEMP TABLE {staging} AS SELECT {col_list} FROM {table} WITH NO DATA;")
+    copy_rows(cur, staging, columns, rows)
+    cur.execute(f"INSERT INTO {table} ({col_list}) SELECT {col_list} FROM {staging} {conflict_clause};")
+    cur.execute(f"DROP TABLE {staging};")
+
+def write_batch(cur, table, columns, rows, loader="executemany", conflict_clause=""):
+    """
+    Pushes one batch with the selected loader (no reporting).
+    """
+    if loader not in LOADERS:
+        raise ValueError(f"Unknown loader '{loader}'. Expected one of {LOADERS}.")
+    if not rows:
+        return
+    if loader == "copy":
+        if conflict_clause:
+            copy_rows_with_conflict(cur, table, columns, rows, conflict_clause)
+        else:
+            copy_rows(cur, table, columns, rows)
+    else:
+        sql = f"""
+            INSERT INTO {table} ({', '.join(columns)})
+            VALUES ({', '.join(['%s'] * len(columns))})
+            {conflict_clause};
+        """
+        cur.executemany(sql, rows)
+
+def report_rate(table, rows, elapsed, loader, chunks=None):
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    chunk_note = f", {chunks} chunk(s)" if chunks is not None else ""
+    print(f"         {table}: {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec) [{loader}{chunk_note}]")
+
+def insert_rows(cur, table, columns, rows, loader="executemany", conflict_clause=""):
+    """
+    Loads a batch with the selected loader and reports the achieved row rate.
+    Returns (row_count, seconds).
+    """
+    start = time.time()
+    write_batch(cur, table, columns, rows, loader=loader, conflict_clause=conflict_clause)
+    elapsed = time.time() - start
+    report_rate(table, len(rows), elapsed, loader)
+    return len(rows), elapsed
+
+def insert_chunks(cur, table, columns, chunks, loader="executemany", conflict_clause=""):
+    """
+    Loads an iterator of batches one at a time (each is released before the next
+    one is built) and reports the overall row rate. Returns (row_count, seconds).
+    """
+    start = time.time()
+    total, n_chunks = 0, 0
+    for rows in chunks:
+        write_batch(cur, table, columns, rows, loader=loader, conflict_clause=conflict_clause)
+        total += len(rows)
+        n_chunks += 1
+    elapsed = time.time() - start
+    report_rate(table, total, elapsed, loader, chunks=n_chunks)
+    return total, elapsed
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import uuid
+import cProfile
+import threading
+from contextlib import contextmanager
+from modules.utils import peak_rss_mb, db_round_trips
+
+# ==============================================================================
+# ETL STAGE METRICS
+# ==============================================================================
+# Every instrumented stage (scrape per source, transform, link, insert per
+# table, refresh, commit) appends one JSON line to ETL_METRICS_PATH:
+#   {"run_id", "season", "stage", "seconds", "rows", "rows_per_sec",
+#    "peak_rss_mb", "round_trips", "status", "pid", "ts"}
+# round_trips counts the DB round-trips issued by the stage's thread (see
+# utils.CountingCursor). With profiling on, each stage also writes a cProfile
+# dump to ETL_PROFILE_DIR/<run_id>/<season>_<stage>.prof.
+# Settings travel through environment variables so worker processes inherit them.
+# ==============================================================================
+
+DEFAULT_METRICS_PATH = os.path.join("data", "metrics", "etl_metrics.jsonl")
+DEFAULT_PROFILE_DIR = os.path.join("data", "profiles")
+
+_write_lock = threading.Lock()
+
+def configure(metrics_path=None, profile_dir=None):
+    """
+    Starts a new run: sets the run id and (optionally) the metrics file and profile
+    directory for this process and every worker started after this call.
+    """
+    os.environ["ETL_RUN_ID"] = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+    if metrics_path:
+        os.environ["ETL_METRICS_PATH"] = metrics_path
+    if profile_dir:
+        os.environ["ETL_PROFILE_DIR"] = profile_dir
+    return os.environ["ETL_RUN_ID"]
+
+def run_id():
+    return os.environ.get("ETL_RUN_ID") or configure()
+
+def metrics_path():
+    return os.getenv("ETL_METRICS_PATH", DEFAULT_METRICS_PATH)
+
+def profile_dir():
+    return os.getenv("ETL_PROFILE_DIR")
+
+def emit(record):
+    """
+    Appends one record as a JSON line (thread-safe; lines are small enough for
+    the appends of several processes not to interleave).
+    """
+    path = metrics_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps(record, default=str)
+    with _write_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+def _start_profiler():
+    if not profile_dir():
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: only one profiler at a time (e.g. concurrent writer threads)
+        return None
+    return profiler
+
+def _dump_profile(profiler, season, name):
+    profiler.disable()
+    directory = os.path.join(profile_dir(), run_id())
+    os.makedirs(directory, exist_ok=True)
+    label = f"{season or 'all'}_{name}".replace("/", "_")
+    profiler.dump_stats(os.path.join(directory, f"{label}.prof"))
+
+@contextmanager
+def stage(name, season=None, rows=0):
+    """
+    Measures the enclosed block as one stage. The yielded dict can be updated
+    (e.g. record["rows"] = n) before the block ends.
+    """
+    record = {"run_id": run_id(), "season": season, "stage": name, "rows": rows, "status": "ok"}
+    profiler = _start_profiler()
+    trips_before = db_round_trips()
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception:
+        record["status"] = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        if profiler is not None:
+            _dump_profile(profiler, season, name)
+        record.update({
+            "seconds": round(seconds, 4),
+            "rows_per_sec": round(record["rows"] / seconds, 1) if seconds > 0 else 0.0,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "round_trips": db_round_trips() - trips_before,
+            "pid": os.getpid(),
+            "ts": time.time(),
+        })
+        emit(record)
+
+def read_run(run=None):
+    """
+    Records of one run (default: the current one) from the metrics file.
+    """
+    run = run or run_id()
+    path = metrics_path()
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [r for r in records if r.get("run_id") == run]
+
+def print_stage_summary(run=None):
+    """
+    Per-stage totals over all seasons of a run, slowest first.
+    """
+    totals = {}
+    for r in read_run(run):
+        t = totals.setdefault(r["stage"], {"seconds": 0.0, "rows": 0, "round_trips": 0, "peak_rss_mb": 0.0})
+        t["seconds"] += r["seconds"]
+        t["rows"] += r["rows"]
+        t["round_trips"] += r["round_trips"]
+        t["peak_rss_mb"] = max(t["peak_rss_mb"], r["peak_rss_mb"])
+    if not totals:
+        return
+
+    print("\n--- STAGE METRICS ---")
+    print(f"   {'stage':<34}{'seconds':>10}{'rows':>10}{'rows/sec':>12}{'trips':>9}{'peak MB':>10}")
+    for name, t in sorted(totals.items(), key=lambda kv: kv[1]["seconds"], reverse=True):
+        rate = t["rows"] / t["seconds"] if t["seconds"] > 0 else 0.0
+        print(f"   {name:<34}{t['seconds']:>10.2f}{t['rows']:>10}{rate:>12,.0f}"
+              f"{t['round_trips']:>9}{t['peak_rss_mb']:>10.1f}")
+    print(f"   (JSON lines: {metrics_path()}, run {run or run_id()})")
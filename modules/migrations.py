@@ -0,0 +1,128 @@
+import os
+import re
+import hashlib
+
+# ==============================================================================
+# SCHEMA MIGRATIONS
+# ==============================================================================
+# Ordered, checksummed SQL files in /migrations (NNNN_description.sql) applied
+# in place against a populated warehouse. Every applied file is recorded in
+# the schema_version table with its checksum; editing a file after it has been
+# applied is refused, new changes go into a new file.
+# Usage:
+#   python main.py --migrate
+# ==============================================================================
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+FILENAME_PATTERN = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+
+# Arbitrary constant: serializes concurrent migration runs (e.g. parallel writers)
+ADVISORY_LOCK_ID = 7242023
+
+class MigrationError(RuntimeError):
+    """Raised when the applied history does not match the files on disk."""
+
+def checksum(sql):
+    return hashlib.sha256(sql.encode("utf-8")).hexdigest()
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """
+    Returns [(version, name, sql, checksum)] sorted by version.
+    """
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        found = FILENAME_PATTERN.match(filename)
+        if not found:
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            sql = f.read()
+        migrations.append((int(found.group(1)), found.group(2), sql, checksum(sql)))
+
+    versions = [m[0] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"Duplicate migration versions in {directory}.")
+    return migrations
+
+def ensure_version_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            name TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """)
+
+def applied_migrations(cur):
+    cur.execute("SELECT version, name, checksum FROM schema_version ORDER BY version;")
+    return {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+def pending_migrations(conn):
+    """
+    Validates the history and returns the migrations that still need to run.
+    """
+    cur = conn.cursor()
+    ensure_version_table(cur)
+    applied = applied_migrations(cur)
+    conn.commit()
+    cur.close()
+
+    on_disk = discover_migrations()
+    known = {m[0] for m in on_disk}
+    for version, name, _, digest in on_disk:
+        if version in applied and applied[version][1] != digest:
+            raise MigrationError(
+                f"Migration {version:04d}_{name} was modified after being applied (checksum mismatch)."
+            )
+    missing = sorted(set(applied) - known)
+    if missing:
+        raise MigrationError(f"Applied migrations missing on disk: {missing}")
+
+    return [m for m in on_disk if m[0] not in applied]
+
+def migrate(conn, verbose=True):
+    """
+    Applies every pending migration, each in its own transaction.
+    Returns the list of versions applied.
+    """
+    pending = pending_migrations(conn)
+    if not pending:
+        if verbose:
+            print("   [MIGRATE] Schema is up to date.")
+        return []
+
+    applied = []
+    cur = conn.cursor()
+    for version, name, sql, digest in pending:
+        try:
+            cur.execute("SELECT pg_advisory_xact_lock(%s);", (ADVISORY_LOCK_ID,))
+            # Another process may have applied it while we waited for the lock
+            cur.execute("SELECT 1 FROM schema_version WHERE version = %s;", (version,))
+            if cur.fetchone():
+                conn.commit()
+                continue
+            if verbose:
+                print(f"   [MIGRATE] Applying {version:04d}_{name}...")
+            cur.execute(sql)
+            cur.execute(
+                "INSERT INTO schema_version (version, name, checksum) VALUES (%s, %s, %s);",
+                (version, name, digest)
+            )
+            conn.commit()
+            applied.append(version)
+        except Exception:
+            conn.rollback()
+            cur.close()
+            raise
+    cur.close()
+    return applied
+
+def print_status(conn):
+    cur = conn.cursor()
+    ensure_version_table(cur)
+    applied = applied_migrations(cur)
+    conn.commit()
+    cur.close()
+    for version, name, _, _ in discover_migrations():
+        state = "applied" if version in applied else "pending"
+        print(f"   {version:04d}_{name:<40} {state}")
@@ -0,0 +1,259 @@
+import threading
+import weakref
+from collections import namedtuple
+import pandas as pd
+import psycopg2
+from modules.backends import connect, dialect
+
+# ==============================================================================
+# QUERY CATALOG
+# ==============================================================================
+# Every analytics / test query is defined once, with bound parameters ($1, $2,
+# ... plus their SQL types) and the dtypes of its result columns:
+#   run_query("standings", season="2023")
+# On first use per pooled connection the statement is PREPAREd server-side;
+# every later call on that connection only sends EXECUTE, so PostgreSQL skips
+# parsing and (after a few runs) planning. Results come back as typed frames.
+# Prepared statements live as long as the DBAPI connection; a connection that
+# the pool replaces starts with an empty set.
+# A connection passed in by the caller keeps its transaction: uncommitted rows
+# stay visible and are not rolled back. On PostgreSQL a failed statement is
+# undone with a savepoint instead of a rollback. On the embedded backend
+# (modules/backends.py) the same SQL runs directly: DuckDB binds $n natively.
+# ==============================================================================
+
+Query = namedtuple("Query", ["sql", "params", "dtypes"])
+
+# Optional parameters are passed as NULL and disable their filter
+QUERIES = {
+    "row_counts": Query("""
+        SELECT (SELECT COUNT(*) FROM matches) AS match_count,
+               (SELECT COUNT(*) FROM player_stats) AS player_stat_count,
+               (SELECT COUNT(*) FROM lineups) AS lineup_count
+    """, [], {"match_count": "int64", "player_stat_count": "int64", "lineup_count": "int64"}),
+
+    "volume": Query("""
+        SELECT (SELECT COUNT(*) FROM matches WHERE season = $1) AS total_matches,
+               (SELECT COUNT(DISTINCT match_id) FROM player_stats WHERE season = $1) AS matches_with_stats,
+               (SELECT COUNT(DISTINCT match_id) FROM lineups WHERE season = $1) AS matches_with_lineups
+    """, [("season", "text")],
+        {"total_matches": "int64", "matches_with_stats": "int64", "matches_with_lineups": "int64"}),
+
+    "data_versions": Query("""
+        SELECT season, version, updated_at FROM data_versions ORDER BY season
+    """, [], {"version": "int64"}),
+
+    "standings": Query("""
+        SELECT position, team, played, won, drawn, lost, gf, ga, gd, points, xg_for, xg_against
+        FROM agg_standings WHERE season = $1
+        ORDER BY position, team
+    """, [("season", "text")], {
+        "position": "Int16", "team": "category", "played": "Int16", "won": "Int16", "drawn": "Int16",
+        "lost": "Int16", "gf": "Int16", "ga": "Int16", "gd": "Int16", "points": "Int16",
+        "xg_for": "float32", "xg_against": "float32",
+    }),
+
+    "player_season": Query("""
+        SELECT season, team, player_name, matches, minutes, goals, assists, shots,
+               xg, xa, xg_chain, xg_buildup, key_passes, yellow_cards, red_cards
+        FROM agg_player_season
+        WHERE ($1::text IS NULL OR season = $1)
+          AND ($2::text IS NULL OR team = $2)
+          AND minutes >= COALESCE($3, 0)
+        ORDER BY season, team, player_name
+    """, [("season", "text"), ("team", "text"), ("min_minutes", "int")], {
+        "season": "category", "team": "category", "player_name": "category",
+        "matches": "Int16", "minutes": "Int32", "goals": "Int16", "assists": "Int16", "shots": "Int16",
+        "xg": "float32", "xa": "float32", "xg_chain": "float32", "xg_buildup": "float32",
+        "key_passes": "Int16", "yellow_cards": "Int16", "red_cards": "Int16",
+    }),
+
+    "player_match_rows": Query("""
+        SELECT season, match_id, team, player_name, minutes, goals, assists, xg, xa, xg_chain, xg_buildup, key_passes
+        FROM player_stats
+        WHERE ($1::text IS NULL OR season = $1)
+    """, [("season", "text")], {
+        "season": "category", "team": "category", "player_name": "category", "minutes": "Int16",
+        "goals": "Int16", "assists": "Int16", "xg": "float32", "xa": "float32", "xg_chain": "float32",
+        "xg_buildup": "float32", "key_passes": "Int16",
+    }),
+
+    "team_season": Query("""
+        SELECT season, team, games_played, total_fouls, avg_fouls_per_game, fouls_suffered,
+               shots_on_target, saves, goals, xg, xa, xg_buildup
+        FROM agg_team_season
+        WHERE ($1::text IS NULL OR season = $1)
+        ORDER BY season, team
+    """, [("season", "text")], {
+        "season": "category", "team": "category", "games_played": "Int16", "total_fouls": "Int32",
+        "avg_fouls_per_game": "float32", "fouls_suffered": "Int32", "shots_on_target": "Int32",
+        "saves": "Int32", "goals": "Int16", "xg": "float32", "xa": "float32", "xg_buildup": "float32",
+    }),
+
+    "team_matches": Query("""
+        SELECT date, home_team, away_team, home_score, away_score, home_xg, away_xg
+        FROM matches
+        WHERE season = $1 AND (home_team = $2 OR away_team = $2)
+        ORDER BY date
+    """, [("season", "text"), ("team", "text")], {
+        "home_team": "category", "away_team": "category", "home_score": "Int16", "away_score": "Int16",
+        "home_xg": "float32", "away_xg": "float32",
+    }),
+
+    "season_results": Query("""
+        SELECT id AS match_id, date, home_team, away_team, home_score, away_score
+        FROM matches
+        WHERE season = $1 AND ($2::date IS NULL OR date <= $2)
+          AND home_score IS NOT NULL AND away_score IS NOT NULL
+        ORDER BY date, id
+    """, [("season", "text"), ("cutoff", "date")], {
+        "match_id": "int64", "home_score": "Int16", "away_score": "Int16",
+    }),
+
+    "unlucky_finishers": Query("""
+        SELECT player_name, team, SUM(goals) AS goals, ROUND(SUM(xg), 2) AS total_xg,
+               ROUND(SUM(goals) - SUM(xg), 2) AS performance_vs_xg
+        FROM agg_player_season
+        WHERE ($1::text IS NULL OR season = $1)
+        GROUP BY player_name, team
+        HAVING SUM(xg) > COALESCE($2, 5)
+        ORDER BY performance_vs_xg ASC
+        LIMIT COALESCE($3, 10)
+    """, [("season", "text"), ("min_xg", "numeric"), ("limit", "int")], {
+        "player_name": "category", "team": "category", "goals": "Int16",
+        "total_xg": "float32", "performance_vs_xg": "float32",
+    }),
+
+    "buildup_leaders": Query("""
+        SELECT player_name, team, SUM(minutes) AS minutes_played, ROUND(SUM(xg_buildup), 2) AS total_buildup
+        FROM agg_player_season
+        WHERE ($1::text IS NULL OR season = $1)
+        GROUP BY player_name, team
+        HAVING SUM(minutes) > COALESCE($2, 900)
+        ORDER BY total_buildup DESC
+        LIMIT COALESCE($3, 10)
+    """, [("season", "text"), ("min_minutes", "int"), ("limit", "int")], {
+        "player_name": "category", "team": "category", "minutes_played": "Int32", "total_buildup": "float32",
+    }),
+
+    "fouls_per_game": Query("""
+        SELECT team, SUM(games_played) AS games_played, SUM(total_fouls) AS total_fouls,
+               ROUND(SUM(total_fouls)::numeric / NULLIF(SUM(games_played), 0), 1) AS avg_fouls_per_game
+        FROM agg_team_season
+        WHERE ($1::text IS NULL OR season = $1)
+        GROUP BY team
+        ORDER BY avg_fouls_per_game DESC
+    """, [("season", "text")], {
+        "team": "category", "games_played": "Int16", "total_fouls": "Int32", "avg_fouls_per_game": "float32",
+    }),
+}
+
+# SQLSTATEs after which the statement is re-prepared once:
+#   26000 -> prepared statement does not exist
+#   0A000 -> cached plan must not change result type (schema changed underneath)
+REPREPARE_CODES = {"26000", "0A000"}
+
+_prepared = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+def statement_name(name):
+    return f"q_{name}"
+
+def _dbapi(conn):
+    # Pool proxies (SQLAlchemy) wrap the psycopg2 connection the statements belong to
+    return getattr(conn, "dbapi_connection", None) or conn
+
+def _prepared_on(conn):
+    with _prepared_lock:
+        return _prepared.setdefault(_dbapi(conn), set())
+
+def _prepare(cur, name, query):
+    types = ", ".join(t for _, t in query.params)
+    signature = f" ({types})" if types else ""
+    cur.execute(f"PREPARE {statement_name(name)}{signature} AS {query.sql}")
+
+def _execute(conn, cur, name, query, values):
+    prepared = _prepared_on(conn)
+    if name not in prepared:
+        _prepare(cur, name, query)
+        prepared.add(name)
+    placeholders = f" ({', '.join(['%s'] * len(values))})" if values else ""
+    cur.execute(f"EXECUTE {statement_name(name)}{placeholders}", values)
+
+def typed_frame(rows, columns, dtypes):
+    """
+    DataFrame with the catalog dtypes applied (NUMERIC/Decimal -> float32, counts -> Int16, ...).
+    """
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    for col, dtype in dtypes.items():
+        if col in df.columns:
+            df[col] = df[col].astype("float64").astype(dtype) if dtype.startswith("float") else df[col].astype(dtype)
+    return df
+
+def _in_transaction_block(conn):
+    """
+    True for a non-autocommit psycopg2 connection, where a savepoint can undo a
+    failed statement without touching the rest of the transaction.
+    """
+    return dialect(conn) != "duckdb" and not getattr(_dbapi(conn), "autocommit", False)
+
+def run_query(name, conn=None, **params):
+    """
+    Executes a catalog query as a prepared statement and returns a typed DataFrame.
+    Parameters not given are passed as NULL. Uses a new backend connection unless
+    conn is given; a caller's connection keeps its open transaction.
+    """
+    query = QUERIES[name]
+    unknown = set(params) - {p for p, _ in query.params}
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) for '{name}': {sorted(unknown)}")
+    values = [params.get(p) for p, _ in query.params]
+
+    own_conn = conn is None
+    conn = conn or connect()
+    savepoint = not own_conn and _in_transaction_block(conn)
+    try:
+        cur = conn.cursor()
+        if savepoint:
+            cur.execute("SAVEPOINT run_query")
+
+        def undo():
+            if savepoint:
+                cur.execute("ROLLBACK TO SAVEPOINT run_query")
+            else:
+                conn.rollback()
+
+        try:
+            if dialect(conn) == "duckdb":
+                cur.execute(query.sql, values)
+            else:
+                _execute(conn, cur, name, query, values)
+        except psycopg2.Error as e:
+            undo()
+            if e.pgcode not in REPREPARE_CODES:
+                raise
+            if e.pgcode == "0A000":
+                cur.execute(f"DEALLOCATE {statement_name(name)}")
+            _prepared_on(conn).discard(name)
+            _execute(conn, cur, name, query, values)
+        rows = cur.fetchall()
+        columns = [d[0] for d in cur.description]
+        if savepoint:
+            cur.execute("RELEASE SAVEPOINT run_query")
+        cur.close()
+        if own_conn:
+            conn.rollback()  # read-only: end the transaction (prepared statements survive it)
+    finally:
+        if own_conn:
+            conn.close()
+    return typed_frame(rows, columns, query.dtypes)
+
+def deallocate_all(conn):
+    """
+    Drops this connection's prepared statements (e.g. after a migration changed a table).
+    """
+    cur = conn.cursor()
+    cur.execute("DEALLOCATE ALL")
+    cur.close()
+    conn.commit()
+    _prepared_on(conn).clear()
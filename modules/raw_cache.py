@@ -0,0 +1,154 @@
+import os
+import json
+import hashlib
+from datetime import datetime, date
+import pandas as pd
+from dotenv import load_dotenv
+
+# ==============================================================================
+# RAW DATA CACHE
+# ==============================================================================
+# Stores every scraped source frame on disk, one file per
+# (source, league, season, frame), next to a small JSON sidecar holding the
+# content hash, row count and fetch timestamp:
+#
+#   data/raw_cache/understat/ESP-La_Liga/2023/player_match_stats.parquet
+#   data/raw_cache/understat/ESP-La_Liga/2023/player_match_stats.json
+#
+# Completed seasons never change, so an entry fetched after its season ended
+# never expires. Any other entry (the ongoing season, or a finished season
+# first scraped mid-season) is re-scraped once it is older than
+# RAW_CACHE_MAX_AGE_HOURS. refresh=True (main.py --refresh) always re-scrapes.
+# ==============================================================================
+
+load_dotenv()
+CACHE_DIR = os.getenv("RAW_CACHE_DIR", os.path.join("data", "raw_cache"))
+MAX_AGE_HOURS = float(os.getenv("RAW_CACHE_MAX_AGE_HOURS", "24"))
+
+class CacheMiss(FileNotFoundError):
+    """Raised in offline mode when a frame is not available on disk."""
+
+def season_end(season):
+    """
+    Date from which a season is final: a season labelled '2023' runs 2023/24 and
+    is final from 1 July 2024. None when the label does not start with a year.
+    """
+    try:
+        start_year = int(str(season)[:4])
+    except ValueError:
+        return None
+    return date(start_year + 1, 7, 1)
+
+def season_is_complete(season, today=None):
+    end = season_end(season)
+    return end is not None and (today or date.today()) >= end
+
+def content_hash(df):
+    """
+    SHA-256 over pandas' row hashes: stable for identical content, cheap to compute.
+    Used to tell whether a re-scrape actually changed anything.
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    header = "|".join(map(str, df.columns)).encode()
+    return hashlib.sha256(header + row_hashes.tobytes()).hexdigest()
+
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+def _entry_paths(source, league, season, frame):
+    folder = os.path.join(CACHE_DIR, source, league.replace(" ", "_"), str(season))
+    return folder, os.path.join(folder, f"{frame}.parquet"), os.path.join(folder, f"{frame}.json")
+
+def read_meta(source, league, season, frame):
+    _, _, meta_path = _entry_paths(source, league, season, frame)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+def is_fresh(meta, season, max_age_hours=MAX_AGE_HOURS, now=None):
+    """
+    Final when fetched after the season ended; otherwise fresh for max_age_hours.
+    """
+    if meta is None:
+        return False
+    fetched_at = datetime.fromisoformat(meta["fetched_at"])
+    end = season_end(season)
+    if end is not None and fetched_at.date() >= end:
+        return True
+    return ((now or datetime.now()) - fetched_at).total_seconds() < max_age_hours * 3600
+
+def write_frame(df, source, league, season, frame):
+    """
+    Persists a frame and its sidecar. Falls back to pickle when a column holds
+    values Parquet cannot type (mixed objects), so caching never blocks a run.
+    """
+    folder, data_path, meta_path = _entry_paths(source, league, season, frame)
+    os.makedirs(folder, exist_ok=True)
+
+    fmt = "parquet"
+    try:
+        df.to_parquet(data_path, index=False)
+    except Exception:
+        fmt = "pickle"
+        data_path = data_path.replace(".parquet", ".pkl")
+        df.to_pickle(data_path)
+
+    meta = {
+        "source": source,
+        "league": league,
+        "season": str(season),
+        "frame": frame,
+        "format": fmt,
+        "file": os.path.basename(data_path),
+        "rows": int(len(df)),
+        "hash": content_hash(df),
+        "file_sha256": file_hash(data_path),
+        "fetched_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+def read_frame(source, league, season, frame, verify=True):
+    """
+    Loads a cached frame. With verify=True the file checksum is re-checked so a
+    truncated or hand-edited file is treated as a miss instead of bad data.
+    """
+    meta = read_meta(source, league, season, frame)
+    if meta is None:
+        return None
+    folder, _, _ = _entry_paths(source, league, season, frame)
+    data_path = os.path.join(folder, meta["file"])
+    if not os.path.exists(data_path):
+        return None
+    if verify and file_hash(data_path) != meta["file_sha256"]:
+        print(f"   [CACHE] Checksum mismatch for {source}/{season}/{frame}, ignoring cached copy.")
+        return None
+
+    return pd.read_parquet(data_path) if meta["format"] == "parquet" else pd.read_pickle(data_path)
+
+def get_frame(source, league, season, frame, fetch_fn, offline=False, refresh=False):
+    """
+    Returns the frame from disk when fresh, otherwise calls fetch_fn() and caches it.
+    In offline mode a missing entry raises CacheMiss instead of scraping.
+    """
+    meta = read_meta(source, league, season, frame)
+    if not refresh and (offline or is_fresh(meta, season)):
+        df = read_frame(source, league, season, frame)
+        if df is not None:
+            print(f"   [CACHE] {source}/{season}/{frame}: {len(df)} rows (fetched {meta['fetched_at']})")
+            return df
+    if offline:
+        raise CacheMiss(f"No cached copy of {source}/{league}/{season}/{frame} (run once online first).")
+
+    df = fetch_fn()
+    previous_hash = meta["hash"] if meta else None
+    new_meta = write_frame(df, source, league, season, frame)
+    status = "unchanged" if previous_hash == new_meta["hash"] else "updated"
+    print(f"   [CACHE] {source}/{season}/{frame}: scraped {len(df)} rows ({status})")
+    return df
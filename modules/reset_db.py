@@ -1,21 +1,23 @@
-import psycopg2
-import os
-from dotenv import load_dotenv
-
-# Load credentials
-load_dotenv()
-
-DB_CONFIG = {
-    "dbname": os.getenv("DB_NAME", "spanish_football"),
-    "user": os.getenv("DB_USER", "runner"),
-    "password": os.getenv("DB_PASSWORD"),
-    "host": os.getenv("DB_HOST", "localhost")
-}
+from modules.migrations import migrate
+from modules.utils import get_raw_connection
+from modules.backends import get_backend
 
 def reset_database():
     print("--- RESETTING DATABASE FOR MULTI-SEASON SCALING ---")
-    
-    conn = psycopg2.connect(**DB_CONFIG)
+
+    backend = get_backend()
+    if backend.name == "duckdb":
+        # Embedded warehouse: delete the file and recreate the schema
+        print(f"1. Removing {backend.path}...")
+        backend.reset()
+        print("2. Creating the DuckDB schema...")
+        conn = backend.connect()
+        backend.ensure_schema(conn)
+        conn.close()
+        print("--- DATABASE RESET COMPLETE ---")
+        return
+
+    conn = get_raw_connection()
     cur = conn.cursor()
 
     # 1. Drop existing tables (Clean Slate)
@@ -23,66 +25,20 @@ def reset_database():
     cur.execute("DROP TABLE IF EXISTS lineups CASCADE;")
     cur.execute("DROP TABLE IF EXISTS player_stats CASCADE;")
     cur.execute("DROP TABLE IF EXISTS matches CASCADE;")
+    cur.execute("DROP TABLE IF EXISTS teams, players CASCADE;")
+    cur.execute("DROP TABLE IF EXISTS agg_standings, agg_player_season, agg_team_season;")
+    cur.execute("DROP TABLE IF EXISTS data_versions;")
+    cur.execute("DROP TABLE IF EXISTS feat_team_match, feat_player_match, feat_match;")
+    cur.execute("DROP TABLE IF EXISTS schema_version;")
+    cur.execute("DROP FUNCTION IF EXISTS ensure_season_partitions(TEXT);")
+    cur.execute("DROP FUNCTION IF EXISTS refresh_season_aggregates(TEXT);")
+    cur.execute("DROP FUNCTION IF EXISTS bump_data_version(TEXT);")
+    conn.commit()
 
-    # 2. Create Matches Table (Now with SEASON column)
-    print("2. Creating Table: matches (with Season column)...")
-    cur.execute("""
-        CREATE TABLE matches (
-            id SERIAL PRIMARY KEY,
-            season VARCHAR(10) NOT NULL,  -- <--- NEW COLUMN
-            date DATE NOT NULL,
-            home_team TEXT NOT NULL,
-            away_team TEXT NOT NULL,
-            home_score INT,
-            away_score INT,
-            home_xg NUMERIC,
-            away_xg NUMERIC,
-            UNIQUE(season, date, home_team, away_team)
-        );
-    """)
-
-    # 3. Create Player Stats Table
-    print("3. Creating Table: player_stats...")
-    cur.execute("""
-        CREATE TABLE player_stats (
-            id SERIAL PRIMARY KEY,
-            match_id INT REFERENCES matches(id) ON DELETE CASCADE,
-            team TEXT NOT NULL,
-            player_name TEXT NOT NULL,
-            minutes INT,
-            goals INT,
-            assists INT,
-            shots INT,
-            xg NUMERIC,
-            xa NUMERIC,
-            xg_chain NUMERIC,
-            xg_buildup NUMERIC,
-            key_passes INT,
-            yellow_card INT,
-            red_card INT
-        );
-    """)
-
-    # 4. Create Lineups Table
-    print("4. Creating Table: lineups...")
-    cur.execute("""
-        CREATE TABLE lineups (
-            id SERIAL PRIMARY KEY,
-            match_id INT REFERENCES matches(id) ON DELETE CASCADE,
-            team TEXT NOT NULL,
-            player_name TEXT NOT NULL,
-            position TEXT,
-            is_starter BOOLEAN,
-            shots_on_target INT,
-            fouls_committed INT,
-            fouls_suffered INT,
-            offsides INT,
-            saves INT,
-            goals_conceded INT
-        );
-    """)
+    # 2. Rebuild the schema by replaying every migration (see /migrations)
+    print("2. Replaying schema migrations...")
+    migrate(conn)
 
-    conn.commit()
     cur.close()
     conn.close()
     print("--- DATABASE RESET COMPLETE ---")
@@ -0,0 +1,143 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+from dotenv import load_dotenv
+from modules.queries import QUERIES, run_query
+
+# ==============================================================================
+# QUERY RESULT CACHE
+# ==============================================================================
+# Results of catalog queries (modules/queries.py), keyed by
+#   (query name, parameters, data version of the seasons it reads)
+# Every load bumps its season's counter in `data_versions` (migration 0007) in
+# the same transaction as the data, so an entry goes stale only when one of
+# its seasons was re-ingested. Queries with a season parameter depend on that
+# season alone; queries over all seasons depend on every counter.
+# A data version is the counter plus the time of its last bump: the counter
+# restarts at 1 when data_versions is recreated (--reset, a new DuckDB file)
+# and two databases share the disk tier, but the bump time does not repeat.
+# Tiers:
+#   memory -> LRU of QUERY_CACHE_SIZE frames per process
+#   disk   -> optional, QUERY_CACHE_DIR/<key hash>.parquet (shared by processes)
+# The counters themselves are re-read at most every QUERY_CACHE_VERSION_TTL
+# seconds, so a hot dashboard query is served without touching PostgreSQL.
+# ==============================================================================
+
+load_dotenv()
+CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "128"))
+CACHE_DIR = os.getenv("QUERY_CACHE_DIR", "")
+VERSION_TTL_SECONDS = float(os.getenv("QUERY_CACHE_VERSION_TTL", "5"))
+
+_lock = threading.Lock()
+_memory = OrderedDict()
+_versions = {"loaded_at": None, "seasons": {}}
+_counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+def bump_data_version(cur, season):
+    """
+    Marks a season as changed. Called inside the season's load transaction.
+    """
+    cur.execute("SELECT bump_data_version(%s);", (season,))
+
+def forget_versions():
+    """
+    Forces the next lookup to re-read the counters (e.g. right after an ingestion).
+    """
+    with _lock:
+        _versions["loaded_at"] = None
+
+def version_tokens(rows):
+    """
+    {season: 'version@bump time in microseconds'} from (season, version, updated_at)
+    rows of data_versions. A season without a row gets '0'.
+    """
+    return {
+        str(season): "0" if version is None or pd.isna(version)
+        else f"{int(version)}@{pd.Timestamp(updated_at).value // 1000}"
+        for season, version, updated_at in rows
+    }
+
+def data_versions(conn=None):
+    """
+    {season: version token}, re-read from the database at most every VERSION_TTL_SECONDS.
+    """
+    with _lock:
+        loaded_at = _versions["loaded_at"]
+        if loaded_at is not None and time.monotonic() - loaded_at < VERSION_TTL_SECONDS:
+            return _versions["seasons"]
+    df = run_query("data_versions", conn=conn)
+    seasons = version_tokens(df[["season", "version", "updated_at"]].itertuples(index=False))
+    with _lock:
+        _versions.update(loaded_at=time.monotonic(), seasons=seasons)
+    return seasons
+
+def version_token(name, params, versions):
+    """
+    The part of the key that changes when the data a query reads changes.
+    """
+    if "season" in {p for p, _ in QUERIES[name].params} and params.get("season") is not None:
+        season = str(params["season"])
+        return f"{season}:{versions.get(season, '0')}"
+    return ",".join(f"{s}:{v}" for s, v in sorted(versions.items()))
+
+def cache_key(name, params, versions):
+    bound = ",".join(f"{k}={params[k]!r}" for k in sorted(params))
+    return f"{name}|{bound}|{version_token(name, params, versions)}"
+
+def _disk_path(key):
+    return os.path.join(CACHE_DIR, f"{hashlib.sha256(key.encode()).hexdigest()}.parquet")
+
+def _remember(key, df, counter):
+    with _lock:
+        _counters[counter] += 1
+        _memory[key] = df
+        _memory.move_to_end(key)
+        while len(_memory) > CACHE_SIZE:
+            _memory.popitem(last=False)
+
+def cached_query(name, conn=None, **params):
+    """
+    run_query() with the result cache in front of it. Returns a copy, so callers
+    can modify the frame without touching the cached one.
+    """
+    key = cache_key(name, params, data_versions(conn))
+
+    with _lock:
+        df = _memory.get(key)
+        if df is not None:
+            _memory.move_to_end(key)
+            _counters["memory_hits"] += 1
+            return df.copy()
+
+    if CACHE_DIR and os.path.exists(_disk_path(key)):
+        df = pd.read_parquet(_disk_path(key))
+        counter = "disk_hits"
+    else:
+        df = run_query(name, conn=conn, **params)
+        counter = "misses"
+        if CACHE_DIR:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = f"{_disk_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, _disk_path(key))  # atomic: readers never see a partial file
+    _remember(key, df, counter)
+    return df.copy()
+
+def clear(disk=False):
+    """
+    Empties the memory tier (and the disk tier with disk=True).
+    """
+    with _lock:
+        _memory.clear()
+        _versions["loaded_at"] = None
+    if disk and CACHE_DIR and os.path.isdir(CACHE_DIR):
+        for name in os.listdir(CACHE_DIR):
+            if name.endswith(".parquet"):
+                os.remove(os.path.join(CACHE_DIR, name))
+
+def cache_stats():
+    with _lock:
+        return {**_counters, "entries": len(_memory), "capacity": CACHE_SIZE, "disk_dir": CACHE_DIR or None}
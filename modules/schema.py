@@ -0,0 +1,33 @@
+# ==============================================================================
+# MANAGED SCHEMA
+# ==============================================================================
+# The DDL itself lives in the versioned files under /migrations (see
+# modules/migrations.py). This module holds the schema facts the Python code
+# needs at runtime: the natural keys behind the idempotent upserts and the
+# names of the indexes the benchmarks compare against.
+# ==============================================================================
+
+# Natural keys: one stat line / lineup entry per player per team per match.
+# They back the ON CONFLICT upserts that make re-running a season idempotent.
+# 'season' leads every key since the tables are partitioned by it (migration 0004).
+NATURAL_KEYS = {
+    "player_stats": ("uq_player_stats_match_team_player", ["season", "match_id", "team", "player_name"]),
+    "lineups": ("uq_lineups_match_team_player", ["season", "match_id", "team", "player_name"]),
+}
+
+PARTITIONED_TABLES = ["matches", "player_stats", "lineups"]
+
+# Indexes added by migrations 0003/0004 (used by the EXPLAIN benchmark to compare before/after)
+MANAGED_INDEX_NAMES = [
+    "idx_player_stats_match_id", "idx_lineups_match_id",
+    "uq_player_stats_match_team_player", "uq_lineups_match_team_player",
+    "idx_matches_season_results", "idx_player_stats_player_team", "idx_lineups_team",
+]
+
+def upsert_clause(table, columns):
+    """
+    ON CONFLICT clause for a child table: the natural key wins, the metrics are refreshed.
+    """
+    _, key = NATURAL_KEYS[table]
+    updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in columns if c not in key)
+    return f"ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}"
@@ -0,0 +1,159 @@
+import os
+import time
+import random
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from modules.raw_cache import get_frame
+from modules.metrics import stage
+
+# ==============================================================================
+# DATA SOURCES & FETCH SCHEDULER
+# ==============================================================================
+# A source knows how to read named frames for a season:
+#   SoccerdataSource -> Understat / ESPN through the soccerdata readers
+#   FileSource       -> local files <root>/<source>/<season>/<frame>.parquet|.csv
+#                       (offline stand-in for tests and benchmarks)
+# fetch_season() runs every (source, frame) read of a season's plan in one
+# thread pool, so a season costs max(sources) instead of their sum. Each source
+# caps its own concurrency (max_concurrency) and failed reads are retried with
+# exponential backoff. Scraped frames still go through the raw cache.
+# The caps hold per process unless the caller passes shared limits:
+# source_limits(sources, manager) builds them on a multiprocessing.Manager,
+# so the worker processes of a parallel ingestion share one cap per source.
+# ==============================================================================
+
+load_dotenv()
+FETCH_RETRIES = int(os.getenv("FETCH_RETRIES", "3"))
+FETCH_BACKOFF_SECONDS = float(os.getenv("FETCH_BACKOFF_SECONDS", "2"))
+
+# (source, frame) reads needed by ingest_season.transform_season, in argument order
+SEASON_PLAN = [
+    ("understat", "team_match_stats"),
+    ("understat", "player_match_stats"),
+    ("espn", "lineup"),
+]
+
+class SoccerdataSource:
+    """
+    One soccerdata reader class; frames map to reader methods.
+    A reader is built per read, so concurrent reads never share a session.
+    """
+    cacheable = True
+
+    def __init__(self, name, reader_cls, methods, league, max_concurrency=1):
+        self.name = name
+        self.reader_cls = reader_cls
+        self.methods = methods
+        self.league = league
+        self.max_concurrency = max_concurrency
+
+    def read(self, season, frame):
+        reader = self.reader_cls(leagues=self.league, seasons=season)
+        return getattr(reader, self.methods[frame])().reset_index()
+
+class FileSource:
+    """
+    Frames stored as local files: <root>/<name>/<season>/<frame>.parquet (or .csv).
+    """
+    cacheable = False
+
+    def __init__(self, name, root, max_concurrency=4):
+        self.name = name
+        self.root = root
+        self.max_concurrency = max_concurrency
+
+    def path(self, season, frame, ext="parquet"):
+        return os.path.join(self.root, self.name, str(season), f"{frame}.{ext}")
+
+    def read(self, season, frame):
+        parquet = self.path(season, frame)
+        if os.path.exists(parquet):
+            return pd.read_parquet(parquet)
+        csv_path = self.path(season, frame, "csv")
+        if os.path.exists(csv_path):
+            return pd.read_csv(csv_path)
+        raise FileNotFoundError(f"No file for {self.name}/{season}/{frame} under {self.root}")
+
+    def write(self, season, frame, df):
+        """
+        Seeds the stand-in (e.g. with benchmarks.synthetic frames). Object columns
+        of numbers with blank cells ('') are stored as numbers with nulls, which
+        transform_season reads the same way (blank counts -> 0).
+        """
+        os.makedirs(os.path.dirname(self.path(season, frame)), exist_ok=True)
+        df = df.copy()
+        for col in df.columns[df.dtypes == object]:
+            values = df[col].replace("", None)
+            numeric = pd.to_numeric(values, errors="coerce")
+            if numeric.notna().sum() == values.notna().sum():
+                df[col] = numeric
+        df.to_parquet(self.path(season, frame), index=False)
+
+def default_sources(league, source_dir=None):
+    """
+    {name: source} for the season plan: soccerdata, or files under source_dir.
+    """
+    if source_dir:
+        return {name: FileSource(name, source_dir) for name in ("understat", "espn")}
+
+    import soccerdata as sd
+    return {
+        "understat": SoccerdataSource(
+            "understat", sd.Understat,
+            {"team_match_stats": "read_team_match_stats", "player_match_stats": "read_player_match_stats"},
+            league, max_concurrency=int(os.getenv("UNDERSTAT_CONCURRENCY", "2")),
+        ),
+        "espn": SoccerdataSource(
+            "espn", sd.ESPN, {"lineup": "read_lineup"},
+            league, max_concurrency=int(os.getenv("ESPN_CONCURRENCY", "1")),
+        ),
+    }
+
+def with_retry(fn, label, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF_SECONDS):
+    """
+    Calls fn(); on failure waits backoff * 2**attempt (+ jitter) and tries again.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            wait = backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+            print(f"   [RETRY] {label}: {e} (attempt {attempt + 1}/{retries + 1}, waiting {wait:.1f}s)")
+            time.sleep(wait)
+
+def source_limits(sources, manager=None):
+    """
+    {name: semaphore of max_concurrency slots}. With a multiprocessing.Manager
+    the semaphores are proxies that can be passed to (and shared by) other processes.
+    """
+    semaphore = manager.BoundedSemaphore if manager is not None else threading.BoundedSemaphore
+    return {name: semaphore(src.max_concurrency) for name, src in sources.items()}
+
+def fetch_season(season, sources, league, plan=SEASON_PLAN, offline=False, refresh=False, limits=None):
+    """
+    Fetches every (source, frame) of the plan for one season concurrently.
+    Returns the frames in plan order. limits: shared source_limits() (default:
+    limits for this call only).
+    """
+    limits = limits or source_limits(sources)
+
+    def fetch(source_name, frame):
+        source = sources[source_name]
+        with limits[source_name], stage(f"scrape.{source_name}.{frame}", season) as m:
+            label = f"{source_name}/{season}/{frame}"
+            read = lambda: with_retry(lambda: source.read(season, frame), label)
+            if source.cacheable:
+                df = get_frame(source_name, league, season, frame, read, offline=offline, refresh=refresh)
+            else:
+                df = read()
+            m["rows"] = len(df)
+        return df
+
+    with ThreadPoolExecutor(max_workers=len(plan) or 1) as pool:
+        futures = [pool.submit(fetch, source, frame) for source, frame in plan]
+        # result() re-raises the first failure (after its retries)
+        return [future.result() for future in futures]
@@ -0,0 +1,224 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from modules.features import group_starts
+from modules.result_cache import cached_query
+
+# ==============================================================================
+# STANDINGS ENGINE
+# ==============================================================================
+# League tables computed in memory from the season's results:
+#   standings(season, cutoff)       -> the table on a date (or at the end of the season)
+#   league_table(results, cutoff)   -> the same from already loaded results
+#   matchday_tables(results)        -> the table after every matchday (or date), long format
+#   what_if(results, {id: (h, a)})  -> results with some scores changed, for re-ranking
+# Results are encoded once as integer arrays (teams as codes). Every table comes
+# from one np.add.at pass into per-snapshot team totals and a head-to-head
+# tensor, followed by a cumulative sum, so a whole season of matchday tables
+# costs about the same as one table. Teams level on points are ordered with La
+# Liga's tiebreakers (see _break_tie). Fair-play points are not stored, so the
+# last resort is the team name.
+# This order is the authoritative one: apply_positions() writes it into
+# agg_standings.position on every load, so the stored table and the engine agree.
+# ==============================================================================
+
+Results = namedtuple("Results", ["teams", "match_id", "date", "home", "away", "home_goals", "away_goals", "matchday"])
+
+STAT_COLUMNS = ["played", "won", "drawn", "lost", "gf", "ga"]
+PLAYED, WON, DRAWN, LOST, GF, GA = range(len(STAT_COLUMNS))
+TABLE_COLUMNS = ["position", "team"] + STAT_COLUMNS + ["gd", "points"]
+
+# Head-to-head tensor fields, seen from the row team against the column team
+H2H_POINTS, H2H_GF, H2H_GA, H2H_PLAYED = range(4)
+LEGS = 2  # double round robin: head-to-head decides once both legs are played
+
+SNAPSHOTS = ("matchday", "date")
+
+# --- RESULTS ---
+def load_results(season, cutoff=None, conn=None):
+    """
+    Played matches of a season up to and including `cutoff` (a date), encoded.
+    """
+    matches = cached_query("season_results", conn=conn, season=str(season),
+                           cutoff=None if cutoff is None else str(cutoff))
+    return encode_results(matches)
+
+def encode_results(matches):
+    """
+    Frame with match_id, date, home_team, away_team, home_score, away_score ->
+    Results: team codes index the alphabetically sorted `teams`, rows are in
+    date order. Matches without a score are left out.
+    """
+    matches = matches.dropna(subset=["home_score", "away_score"])
+    matches = matches.assign(date=pd.to_datetime(matches["date"])).sort_values(["date", "match_id"], ignore_index=True)
+    n = len(matches)
+    names = pd.concat([matches["home_team"].astype(str), matches["away_team"].astype(str)], ignore_index=True)
+    codes, teams = pd.factorize(names, sort=True)
+    home, away = codes[:n], codes[n:]
+    return Results(
+        teams=np.asarray(teams, dtype=object),
+        match_id=matches["match_id"].to_numpy(dtype=np.int64),
+        date=matches["date"].to_numpy().astype("datetime64[D]"),
+        home=home,
+        away=away,
+        home_goals=matches["home_score"].to_numpy(dtype=np.int64),
+        away_goals=matches["away_score"].to_numpy(dtype=np.int64),
+        matchday=matchdays(home, away),
+    )
+
+def matchdays(home, away):
+    """
+    Matchday of each match (rows in date order): the higher of the two teams'
+    running match counts. A rescheduled game therefore counts in the round in
+    which it is played, not in the one it was scheduled for.
+    """
+    n = len(home)
+    team = np.concatenate([home, away])
+    order = np.lexsort((np.tile(np.arange(n), 2), team))
+    count = np.empty(2 * n, dtype=np.int64)
+    count[order] = np.arange(2 * n) - group_starts(team[order]) + 1
+    return np.maximum(count[:n], count[n:])
+
+def what_if(results, scores):
+    """
+    Copy of results with some scores replaced: scores = {match_id: (home_goals, away_goals)}.
+    """
+    if not scores:
+        return results
+    rows = pd.Index(results.match_id).get_indexer(list(scores))
+    if (rows < 0).any():
+        unknown = [m for m, r in zip(scores, rows) if r < 0]
+        raise ValueError(f"Unknown match id(s): {unknown}")
+    home_goals, away_goals = results.home_goals.copy(), results.away_goals.copy()
+    home_goals[rows], away_goals[rows] = np.asarray(list(scores.values()), dtype=np.int64).T
+    return results._replace(home_goals=home_goals, away_goals=away_goals)
+
+# --- ACCUMULATION ---
+def accumulate(results, buckets, n_buckets):
+    """
+    Running totals after each snapshot. buckets: 0-based snapshot of each match
+    (negative = left out). Returns team totals (snapshots, teams, STAT_COLUMNS)
+    and head-to-head totals (snapshots, teams, teams, 4).
+    """
+    t = len(results.teams)
+    keep = buckets >= 0
+    b, h, a = buckets[keep], results.home[keep], results.away[keep]
+    hg, ag = results.home_goals[keep], results.away_goals[keep]
+    win, draw, loss = (hg > ag).astype(np.int64), (hg == ag).astype(np.int64), (hg < ag).astype(np.int64)
+    ones = np.ones_like(hg)
+
+    totals = np.zeros((n_buckets, t, len(STAT_COLUMNS)), dtype=np.int64)
+    np.add.at(totals, (b, h), np.column_stack([ones, win, draw, loss, hg, ag]))
+    np.add.at(totals, (b, a), np.column_stack([ones, loss, draw, win, ag, hg]))
+
+    h2h = np.zeros((n_buckets, t, t, 4), dtype=np.int64)
+    np.add.at(h2h, (b, h, a), np.column_stack([3 * win + draw, hg, ag, ones]))
+    np.add.at(h2h, (b, a, h), np.column_stack([3 * loss + draw, ag, hg, ones]))
+    return np.cumsum(totals, axis=0), np.cumsum(h2h, axis=0)
+
+# --- RANKING ---
+def _break_tie(group, totals, h2h):
+    """
+    Order of teams level on points (La Liga rules): head-to-head points, then
+    head-to-head goal difference (and, with three or more teams, head-to-head
+    goals scored), then overall goal difference and goals scored. Head-to-head
+    only counts once the tied teams have all played each other twice; until then
+    the overall figures decide.
+    """
+    # np.lexsort: the last key is the primary one; the group arrives in name order
+    keys = [np.arange(len(group)), -totals[group, GF], -(totals[group, GF] - totals[group, GA])]
+    mini = h2h[np.ix_(group, group)]
+    others = ~np.eye(len(group), dtype=bool)
+    if (mini[..., H2H_PLAYED][others] >= LEGS).all():
+        mini_gf, mini_ga = mini[..., H2H_GF].sum(axis=1), mini[..., H2H_GA].sum(axis=1)
+        if len(group) > 2:
+            keys.append(-mini_gf)
+        keys += [-(mini_gf - mini_ga), -mini[..., H2H_POINTS].sum(axis=1)]
+    return group[np.lexsort(keys)]
+
+def rank(totals, h2h):
+    """
+    Team order (best first) of every snapshot: by points in one argsort, then
+    each group of teams level on points through _break_tie.
+    """
+    points = 3 * totals[..., WON] + totals[..., DRAWN]
+    orders = np.argsort(-points, axis=1, kind="stable")  # stable: level teams stay in name order
+    ranked = np.take_along_axis(points, orders, axis=1)
+    level = (ranked[:, 1:] == ranked[:, :-1]).any(axis=1)
+    positions = np.arange(points.shape[1])
+    for snap in np.flatnonzero(level):
+        for group in np.split(positions, np.flatnonzero(np.diff(ranked[snap])) + 1):
+            if len(group) > 1:
+                orders[snap, group] = _break_tie(orders[snap, group], totals[snap], h2h[snap])
+    return orders
+
+def _tables(results, buckets, n_buckets):
+    """
+    Ranked tables of every snapshot, long format with a 'snapshot' column.
+    """
+    t = len(results.teams)
+    if n_buckets == 0 or t == 0:
+        return pd.DataFrame(columns=["snapshot"] + TABLE_COLUMNS)
+    totals, h2h = accumulate(results, buckets, n_buckets)
+    orders = rank(totals, h2h)
+    ranked = np.take_along_axis(totals, orders[..., None], axis=1).reshape(-1, len(STAT_COLUMNS))
+
+    table = pd.DataFrame(ranked, columns=STAT_COLUMNS)
+    table.insert(0, "team", pd.Categorical(results.teams[orders.ravel()], categories=results.teams))
+    table.insert(0, "position", np.tile(np.arange(1, t + 1), n_buckets))
+    table.insert(0, "snapshot", np.repeat(np.arange(n_buckets), t))
+    table["gd"] = table["gf"] - table["ga"]
+    table["points"] = 3 * table["won"] + table["drawn"]
+    return table
+
+# --- TABLES ---
+def league_table(results, cutoff=None):
+    """
+    Table of every team in results after the matches played up to and including
+    `cutoff` (a date; None = all of them).
+    """
+    buckets = np.zeros(len(results.match_id), dtype=np.int64)
+    if cutoff is not None:
+        buckets[results.date > np.datetime64(pd.Timestamp(cutoff).date(), "D")] = -1
+    return _tables(results, buckets, 1).drop(columns=["snapshot"])
+
+def matchday_tables(results, by="matchday"):
+    """
+    The table after every matchday (by='matchday', see matchdays) or every match
+    date (by='date') of the season, all computed in one pass.
+    """
+    if by not in SNAPSHOTS:
+        raise ValueError(f"Unknown snapshot '{by}'. Expected one of {SNAPSHOTS}.")
+    labels, buckets = np.unique(getattr(results, by), return_inverse=True)
+    tables = _tables(results, buckets.astype(np.int64), len(labels))
+    tables.insert(0, by, labels[tables.pop("snapshot").to_numpy(dtype=np.int64)])
+    return tables
+
+def standings(season, cutoff=None, conn=None):
+    """
+    League table of a season, optionally as it stood on `cutoff`.
+    """
+    return league_table(load_results(season, cutoff, conn=conn))
+
+# --- STORED TABLE ---
+SEASON_RESULTS_COLUMNS = ["match_id", "date", "home_team", "away_team", "home_score", "away_score"]
+SEASON_RESULTS_SQL = """
+    SELECT id AS match_id, date, home_team, away_team, home_score, away_score
+    FROM matches
+    WHERE season = %s AND home_score IS NOT NULL AND away_score IS NOT NULL
+"""
+
+def apply_positions(cur, season):
+    """
+    Rewrites agg_standings.position of a season with the engine's order. Runs in
+    the load transaction right after refresh_season_aggregates(), whose RANK()
+    only knows points, goal difference and goals scored.
+    """
+    cur.execute(SEASON_RESULTS_SQL, (season,))
+    matches = pd.DataFrame(cur.fetchall(), columns=SEASON_RESULTS_COLUMNS)
+    table = league_table(encode_results(matches))
+    cur.executemany(
+        "UPDATE agg_standings SET position = %s WHERE season = %s AND team = %s",
+        [(int(position), season, str(team)) for position, team in zip(table["position"], table["team"])],
+    )
+
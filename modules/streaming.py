@@ -0,0 +1,144 @@
+import os
+import re
+import uuid
+import pandas as pd
+from dotenv import load_dotenv
+from modules.backends import connect, dialect, translate
+from modules.queries import QUERIES, typed_frame
+
+# ==============================================================================
+# STREAMING READS
+# ==============================================================================
+# Large result sets are read in chunks instead of one DataFrame:
+#   stream_query(sql, params)      -> typed DataFrame chunks of chunk_rows rows
+#   stream_catalog(name, **params) -> the same for a catalog query (modules/queries.py)
+#   stream_arrow(...)              -> Arrow record batches instead of DataFrames
+# On PostgreSQL the rows come from a named (server-side) cursor, so only one
+# chunk is on the client at a time; DuckDB streams its result set the same way.
+# fold() / fold_groupby() aggregate over the chunks, so a pull over every season
+# runs in memory proportional to the chunk size plus the result.
+# ==============================================================================
+
+load_dotenv()
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "50000"))
+
+# Partial aggregates that can be combined across chunks: how each partial is re-aggregated
+COMBINE = {"sum": "sum", "count": "sum", "size": "sum", "min": "min", "max": "max"}
+
+def _fetch_chunks(conn, sql, params, chunk_rows):
+    """
+    Yields (columns, rows) per chunk of at most chunk_rows rows.
+    """
+    if dialect(conn) == "duckdb":
+        result = conn.raw.execute(translate(sql, params), params) if params is not None else conn.raw.execute(sql)
+        columns = [d[0] for d in result.description]
+        while True:
+            rows = result.fetchmany(chunk_rows)
+            if not rows:
+                return
+            yield columns, rows
+
+    cur = conn.cursor(name=f"stream_{uuid.uuid4().hex[:8]}")  # named -> server-side cursor
+    cur.itersize = chunk_rows
+    try:
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                return
+            yield [d[0] for d in cur.description], rows
+    finally:
+        cur.close()
+
+def stream_query(sql, params=None, chunk_rows=STREAM_CHUNK_ROWS, dtypes=None, conn=None):
+    """
+    Runs a read query and yields DataFrame chunks (dtypes applied as in the query catalog).
+    Placeholders use the psycopg2 style (%s / %(name)s).
+    """
+    own_conn = conn is None
+    conn = conn or connect()
+    try:
+        for columns, rows in _fetch_chunks(conn, sql, params, chunk_rows):
+            yield typed_frame(rows, columns, dtypes or {})
+        conn.rollback()  # read-only: end the transaction (closes the server-side cursor)
+    finally:
+        if own_conn:
+            conn.close()
+
+def catalog_sql(name, params):
+    """
+    A catalog query rewritten for a cursor: DECLARE cannot run a prepared
+    statement, so $n placeholders become named psycopg2 parameters.
+    """
+    query = QUERIES[name]
+    unknown = set(params) - {p for p, _ in query.params}
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) for '{name}': {sorted(unknown)}")
+    sql = query.sql
+    bound = {}
+    for i, (param, sql_type) in enumerate(query.params, start=1):
+        sql = re.sub(rf"\${i}(?!\d)", f"CAST(%({param})s AS {sql_type})", sql)
+        bound[param] = params.get(param)
+    return sql, bound, query.dtypes
+
+def stream_catalog(name, chunk_rows=STREAM_CHUNK_ROWS, conn=None, **params):
+    """
+    Catalog query (modules/queries.py) as typed DataFrame chunks.
+    """
+    sql, bound, dtypes = catalog_sql(name, params)
+    return stream_query(sql, bound, chunk_rows=chunk_rows, dtypes=dtypes, conn=conn)
+
+def stream_arrow(sql, params=None, chunk_rows=STREAM_CHUNK_ROWS, dtypes=None, conn=None):
+    """
+    Like stream_query, as pyarrow RecordBatches (categoricals become dictionary arrays).
+    """
+    import pyarrow as pa
+    for chunk in stream_query(sql, params, chunk_rows=chunk_rows, dtypes=dtypes, conn=conn):
+        yield pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+
+def fold(chunks, fn, initial=None):
+    """
+    Reduces a stream: state = fn(state, chunk) for every chunk.
+    """
+    state = initial
+    for chunk in chunks:
+        state = fn(state, chunk)
+    return state
+
+def fold_groupby(chunks, by, aggs):
+    """
+    Group-by over a stream. aggs: {output: (column, func)} with func in
+    sum/count/size/min/max/mean. Each chunk is reduced to partial aggregates
+    and the partials are combined, so only one row per group is kept per chunk.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    partial_specs = {}
+    for out, (col, func) in aggs.items():
+        if func == "mean":
+            partial_specs[f"{out}__sum"] = (col, "sum")
+            partial_specs[f"{out}__count"] = (col, "count")
+        elif func in COMBINE:
+            partial_specs[out] = (col, func)
+        else:
+            raise ValueError(f"Cannot combine '{func}' across chunks. Expected one of {sorted(COMBINE) + ['mean']}.")
+
+    partials = []
+    for chunk in chunks:
+        part = chunk.groupby(by, observed=True, sort=False).agg(**partial_specs)
+        partials.append(part)
+        if len(partials) > 1:
+            # Keep at most one combined partial in memory
+            partials = [_combine(pd.concat(partials), by, partial_specs)]
+
+    if not partials:
+        return pd.DataFrame(columns=by + list(aggs))
+    result = _combine(partials[0], by, partial_specs)
+    for out, (_, func) in aggs.items():
+        if func == "mean":
+            result[out] = result.pop(f"{out}__sum") / result.pop(f"{out}__count").where(lambda s: s > 0)
+    return result.reset_index()[by + list(aggs)]
+
+def _combine(partials, by, partial_specs):
+    return partials.groupby(level=by, observed=True, sort=True).agg(
+        {out: COMBINE[func] for out, (_, func) in partial_specs.items()}
+    )
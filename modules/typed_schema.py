@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# TYPED INGESTION SCHEMA
+# ==============================================================================
+# Every source frame is coerced once, column by column, right after scraping:
+#   names      -> category (team / player / position repeat thousands of times)
+#   counts     -> Int16    (goals, shots, fouls, saves, ...; blanks/junk -> 0)
+#   xG family  -> float32
+# The insert payloads inherit these dtypes; column_values() widens them back
+# to plain Python ints/floats/strings for psycopg2 at load time.
+# ==============================================================================
+
+COUNT_DTYPE = "Int16"
+METRIC_DTYPE = "float32"
+NAME_DTYPE = "category"
+
+# float32 keeps ~7 significant digits: values are rounded when written so the
+# NUMERIC columns do not receive float32 noise (0.32 -> 0.3199999928)
+METRIC_DECIMALS = 6
+
+UNDERSTAT_MATCH_TYPES = {
+    'home_goals': COUNT_DTYPE, 'away_goals': COUNT_DTYPE,
+    'home_xg': METRIC_DTYPE, 'away_xg': METRIC_DTYPE,
+}
+
+UNDERSTAT_PLAYER_TYPES = {
+    'team': NAME_DTYPE, 'player_name': NAME_DTYPE,
+    'minutes': COUNT_DTYPE, 'goals': COUNT_DTYPE, 'assists': COUNT_DTYPE, 'shots': COUNT_DTYPE,
+    'key_passes': COUNT_DTYPE, 'yellow_card': COUNT_DTYPE, 'red_card': COUNT_DTYPE,
+    'xg': METRIC_DTYPE, 'xa': METRIC_DTYPE, 'xg_chain': METRIC_DTYPE, 'xg_buildup': METRIC_DTYPE,
+}
+
+ESPN_LINEUP_TYPES = {
+    'team': NAME_DTYPE, 'player': NAME_DTYPE, 'position': NAME_DTYPE,
+    'shots_on_target': COUNT_DTYPE, 'fouls_committed': COUNT_DTYPE, 'fouls_suffered': COUNT_DTYPE,
+    'offsides': COUNT_DTYPE, 'saves': COUNT_DTYPE, 'goals_conceded': COUNT_DTYPE,
+}
+
+def to_count(series):
+    """
+    Vectorized safe_int: blanks and junk become 0, floats are truncated.
+    """
+    values = pd.to_numeric(series, errors='coerce').fillna(0)
+    return pd.Series(np.trunc(values.to_numpy(dtype='float64')), index=series.index).astype(COUNT_DTYPE)
+
+def to_metric(series):
+    return pd.to_numeric(series, errors='coerce').astype(METRIC_DTYPE)
+
+COERCERS = {
+    COUNT_DTYPE: to_count,
+    METRIC_DTYPE: to_metric,
+    NAME_DTYPE: lambda s: s.astype(NAME_DTYPE),
+}
+
+def coerce_frame(df, types):
+    """
+    Applies the typed schema to the columns of df that it covers (in place) and returns df.
+    """
+    for col, dtype in types.items():
+        if col in df.columns and str(df[col].dtype) != dtype:
+            df[col] = COERCERS[dtype](df[col])
+    return df
+
+def column_values(series):
+    """
+    One column as a list of native Python values for the DB driver.
+    """
+    dtype = str(series.dtype)
+    if dtype == NAME_DTYPE:
+        return series.astype(object).tolist()
+    if dtype == COUNT_DTYPE:
+        return series.astype('int64').tolist()
+    if dtype == METRIC_DTYPE:
+        return series.astype('float64').round(METRIC_DECIMALS).tolist()
+    return series.tolist()
+
+def frame_memory_mb(df):
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
@@ -1,41 +1,166 @@
 import pandas as pd
 import os
 import sys
-from sqlalchemy import create_engine, text
+import threading
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+import psycopg2.extensions
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def get_db_connection():
+# Single source of the connection settings (ingestion, reset, tests and notebooks)
+DB_CONFIG = {
+    "dbname": os.getenv("DB_NAME", "spanish_football"),
+    "user": os.getenv("DB_USER", "runner"),
+    "password": os.getenv("DB_PASSWORD"),
+    "host": os.getenv("DB_HOST", "localhost")
+}
+
+# Pool sizing: pool_size connections are kept open, max_overflow extra ones are
+# opened under load and closed when returned.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+_engine = None
+_engine_pid = None
+_engine_lock = threading.Lock()
+_counters = {"engines_created": 0, "connections_opened": 0, "checkouts": 0}
+_round_trips = threading.local()
+
+class CountingCursor(psycopg2.extensions.cursor):
     """
-    Establishes a connection to the database securely.
+    psycopg2 cursor that counts the round-trips issued from the current thread
+    (executemany sends one statement per parameter set).
+    """
+    def execute(self, query, vars=None):
+        _count_round_trips(1)
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        vars_list = list(vars_list)
+        _count_round_trips(len(vars_list))
+        return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        _count_round_trips(1)
+        return super().copy_expert(sql, file, size)
+
+def _count_round_trips(n):
+    _round_trips.count = getattr(_round_trips, "count", 0) + n
+
+def db_round_trips():
     """
-    user = os.getenv("DB_USER")
-    password = os.getenv("DB_PASSWORD")
-    host = os.getenv("DB_HOST", "localhost")
-    dbname = os.getenv("DB_NAME", "spanish_football")
+    Round-trips issued so far by the current thread (pooled connections only).
+    """
+    return getattr(_round_trips, "count", 0)
 
-    if not password:
+def _build_engine():
+    if not DB_CONFIG["password"]:
         print(" CRITICAL ERROR: DB_PASSWORD not found in .env file.")
         sys.exit(1)
 
-    # Return the engine
-    uri = f"postgresql+psycopg2://{user}:{password}@{host}/{dbname}"
-    return create_engine(uri)
+    uri = URL.create(
+        "postgresql+psycopg2",
+        username=DB_CONFIG["user"],
+        password=DB_CONFIG["password"],
+        host=DB_CONFIG["host"],
+        database=DB_CONFIG["dbname"],
+    )
+    engine = create_engine(
+        uri,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_pre_ping=True,
+        connect_args={"cursor_factory": CountingCursor},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        _counters["connections_opened"] += 1
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        _counters["checkouts"] += 1
+
+    _counters["engines_created"] += 1
+    return engine
+
+def get_engine():
+    """
+    Returns the process-wide pooled engine, created lazily on first use.
+    A forked/spawned worker process gets its own engine (connections are never
+    shared across processes).
+    """
+    global _engine, _engine_pid
+    if _engine is None or _engine_pid != os.getpid():
+        with _engine_lock:
+            if _engine is None or _engine_pid != os.getpid():
+                if _engine is not None:
+                    # Inherited from the parent: drop the references without closing its sockets
+                    _engine.dispose(close=False)
+                _engine = _build_engine()
+                _engine_pid = os.getpid()
+    return _engine
+
+def get_db_connection():
+    """
+    Establishes a connection to the database securely.
+    Returns the shared pooled SQLAlchemy engine (for pd.read_sql / engine.connect()).
+    """
+    return get_engine()
+
+def get_raw_connection():
+    """
+    Checks a DBAPI (psycopg2) connection out of the shared pool, for cursor-level
+    work such as executemany and COPY. close() returns it to the pool.
+    """
+    return get_engine().raw_connection()
+
+def pool_stats():
+    """
+    Current pool usage plus lifetime counters for this process.
+    """
+    stats = dict(_counters)
+    if _engine is not None and _engine_pid == os.getpid():
+        pool = _engine.pool
+        stats.update({
+            "pool_size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    return stats
+
+def peak_rss_mb():
+    """
+    High-water mark of this process's resident memory, in MB (0.0 where unsupported).
+    """
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
 
-def run_test_query(title, query):
+def run_test_query(title, query, params=None):
     """
     Generic function to run a SQL query and return a DataFrame.
     """
     print(f"\n TEST: {title}")
     print("-" * 50)
-    
+
     engine = get_db_connection()
     try:
         with engine.connect() as conn:
-            df = pd.read_sql(text(query), conn)
+            df = pd.read_sql(text(query), conn, params=params)
             return df
     except Exception as e:
         print(f" SQL ERROR: {e}")
-        return pd.DataFrame() # Return empty DF on error
\ No newline at end of file
+        return pd.DataFrame() # Return empty DF on error
@@ -1,31 +1,16 @@
-import pandas as pd
-import os
-from sqlalchemy import create_engine, text
-from dotenv import load_dotenv
+from modules.result_cache import cached_query, cache_stats
+from modules.streaming import stream_catalog, fold_groupby
 
-# --- DATABASE CONNECTION (Secure) ---
-load_dotenv()
-
-user = os.getenv("DB_USER")
-password = os.getenv("DB_PASSWORD")
-host = os.getenv("DB_HOST")
-dbname = os.getenv("DB_NAME")
-
-# Build the connection URI dynamically
-DB_URI = f"postgresql+psycopg2://{user}:{password}@{host}/{dbname}"
-engine = create_engine(DB_URI)
-
-def run_query(query_title, sql_query):
+def run_query(query_title, name, **params):
     """
-    Helper function to run SQL and print a clean Pandas table.
+    Helper function to run a cached catalog query (modules/queries.py) and print a clean Pandas table.
     """
     print(f"\n📊 QUERY: {query_title}")
     print("-" * 60)
     
     try:
-        # We use a connection context manager for safety
-        with engine.connect() as conn:
-            df = pd.read_sql(text(sql_query), conn)
+        # Served from the result cache unless an ingestion changed the data since
+        df = cached_query(name, **params)
         
         if df.empty:
             print("[Result] No data returned (Check your filters).")
@@ -38,65 +23,35 @@ def run_query(query_title, sql_query):
         print(f"[ERROR] {e}")
 
 # ==============================================================================
-# 🧠 CORRECTED QUERIES
+# 🧠 QUERIES (defined once in modules/queries.py)
 # ==============================================================================
-
-# 0. SANITY CHECK: Do we have data?
-sql_check = """
-    SELECT 
-        (SELECT COUNT(*) FROM matches) as match_count,
-        (SELECT COUNT(*) FROM player_stats) as player_stat_count,
-        (SELECT COUNT(*) FROM lineups) as lineup_count;
-"""
-
-# 1. Who are the most "unlucky" finishers? 
-# (High xG, Low Goals)
-sql_unlucky = """
-    SELECT 
-        player_name, 
-        team, 
-        SUM(goals) as goals, 
-        ROUND(SUM(xg), 2) as total_xg,
-        ROUND(SUM(goals) - SUM(xg), 2) as performance_vs_xg
-    FROM player_stats
-    GROUP BY player_name, team
-    HAVING SUM(xg) > 5  -- Only look at relevant players
-    ORDER BY performance_vs_xg ASC
-    LIMIT 10;
-"""
-
-# 2. Who is the "King of Build-up"? 
-# FIX: Changed WHERE to HAVING so we filter by *Season Total*, not *Single Match*
-sql_buildup = """
-    SELECT 
-        player_name, 
-        team, 
-        SUM(minutes) as minutes_played,
-        ROUND(SUM(xg_buildup), 2) as total_buildup
-    FROM player_stats
-    GROUP BY player_name, team
-    HAVING SUM(minutes) > 900 -- Filter AFTER summing minutes
-    ORDER BY total_buildup DESC
-    LIMIT 10;
-"""
-
-# 3. Tactical Aggression: Which teams commit the most fouls?
-sql_fouls = """
-    SELECT 
-        team, 
-        COUNT(DISTINCT match_id) as games_played,
-        SUM(fouls_committed) as total_fouls,
-        ROUND(SUM(fouls_committed)::numeric / NULLIF(COUNT(DISTINCT match_id), 0), 1) as avg_fouls_per_game
-    FROM lineups
-    GROUP BY team
-    ORDER BY avg_fouls_per_game DESC;
-"""
+# 0. row_counts         -> SANITY CHECK: Do we have data?
+# 1. unlucky_finishers  -> High xG, Low Goals (HAVING SUM(xg) > min_xg)
+# 2. buildup_leaders    -> "King of Build-up", filtered by *Season Total* minutes
+# 3. fouls_per_game     -> Tactical Aggression: which teams commit the most fouls?
+# Every query but the sanity check takes an optional season (None = all seasons).
+
+# 4. Career totals from the raw match rows (every season), streamed in chunks
+#    so the client never holds the full player_stats table
+def career_totals(chunk_rows=50_000):
+    totals = fold_groupby(
+        stream_catalog("player_match_rows", chunk_rows=chunk_rows),
+        by="player_name",
+        aggs={"matches": ("match_id", "count"), "minutes": ("minutes", "sum"),
+              "goals": ("goals", "sum"), "xg": ("xg", "sum"), "xg_per_match": ("xg", "mean")},
+    )
+    return totals.sort_values("xg", ascending=False)
 
 # --- RUN THEM ---
 if __name__ == "__main__":
     print("🚀 RUNNING ANALYTICS PREVIEW...")
     
-    run_query("Sanity Check (Row Counts)", sql_check)
-    run_query("The 'Unlucky' Finishers (Underperforming xG)", sql_unlucky)
-    run_query("The Architects (Best xG Buildup)", sql_buildup)
-    run_query("The 'Bad Boys' (Fouls per Game)", sql_fouls)
\ No newline at end of file
+    run_query("Sanity Check (Row Counts)", "row_counts")
+    run_query("The 'Unlucky' Finishers (Underperforming xG)", "unlucky_finishers", min_xg=5, limit=10)
+    run_query("The Architects (Best xG Buildup)", "buildup_leaders", min_minutes=900, limit=10)
+    run_query("The 'Bad Boys' (Fouls per Game)", "fouls_per_game")
+    print(f"\nResult cache: {cache_stats()}")
+
+    print("\n📊 QUERY: Career xG Leaders (streamed over every season)")
+    print("-" * 60)
+    print(career_totals().head(15).to_string(index=False))
@@ -1,38 +1,60 @@
 -- =============================================================================
--- SPANISH FOOTBALL ANALYTICS - DATABASE SCHEMA (MULTI-SEASON)
+-- SPANISH FOOTBALL ANALYTICS - DATABASE SCHEMA (MULTI-SEASON, PARTITIONED)
 -- =============================================================================
--- This file defines the structure for the PostgreSQL Data Warehouse.
--- It supports longitudinal analysis across multiple seasons.
+-- Snapshot of the PostgreSQL Data Warehouse after every file in /migrations
+-- has been applied. The migrations are authoritative: change the schema by
+-- adding a new migration and running `python main.py --migrate`, then update
+-- this snapshot.
+-- matches / player_stats / lineups are partitioned by season (one partition
+-- per season); the aggregate, data-version and feature tables are plain tables
+-- keyed by season.
 -- =============================================================================
 
 -- 1. CLEAN SLATE (Drop tables if they exist to prevent conflicts)
 DROP TABLE IF EXISTS lineups CASCADE;
 DROP TABLE IF EXISTS player_stats CASCADE;
 DROP TABLE IF EXISTS matches CASCADE;
+DROP TABLE IF EXISTS teams, players CASCADE;
+DROP TABLE IF EXISTS agg_standings, agg_player_season, agg_team_season;
+DROP TABLE IF EXISTS data_versions;
+DROP TABLE IF EXISTS feat_team_match, feat_player_match, feat_match;
+DROP FUNCTION IF EXISTS ensure_season_partitions(TEXT);
+DROP FUNCTION IF EXISTS refresh_season_aggregates(TEXT);
+DROP FUNCTION IF EXISTS bump_data_version(TEXT);
 
--- 2. FACT TABLE: MATCHES
--- Stores the core metadata for every game.
--- The composite unique key includes 'season' to allow multi-year storage.
-CREATE TABLE matches (
+-- 2. TABLES: teams / players (entity dimensions), matches (hub),
+--    player_stats (Understat), lineups (ESPN)
+CREATE TABLE teams (
     id SERIAL PRIMARY KEY,
-    season VARCHAR(10) NOT NULL,             -- e.g., '2023', '2022'
+    team_key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE players (
+    id SERIAL PRIMARY KEY,
+    player_key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE matches (
+    id SERIAL,
+    season VARCHAR(10) NOT NULL,
     date DATE NOT NULL,
     home_team TEXT NOT NULL,
     away_team TEXT NOT NULL,
     home_score INT,
     away_score INT,
-    home_xg NUMERIC,                         -- Expected Goals (xG)
+    home_xg NUMERIC,
     away_xg NUMERIC,
-    
-    -- Constraint: A team cannot play another team twice on the same day in the same season
-    UNIQUE(season, date, home_team, away_team)
-);
+    fingerprint TEXT,
+    PRIMARY KEY (season, id),
+    UNIQUE (season, date, home_team, away_team)
+) PARTITION BY LIST (season);
 
--- 3. DIMENSION TABLE: PLAYER STATS
--- Stores granular offensive performance metrics for every player in every match.
 CREATE TABLE player_stats (
-    id SERIAL PRIMARY KEY,
-    match_id INT REFERENCES matches(id) ON DELETE CASCADE,
+    id SERIAL,
+    season VARCHAR(10) NOT NULL,
+    match_id INT NOT NULL,
     team TEXT NOT NULL,
     player_name TEXT NOT NULL,
     minutes INT,
@@ -40,32 +62,254 @@ CREATE TABLE player_stats (
     assists INT,
     shots INT,
     xg NUMERIC,
-    xa NUMERIC,                             -- Expected Assists (xA)
-    xg_chain NUMERIC,                       -- xG Chain (Build-up contribution)
+    xa NUMERIC,
+    xg_chain NUMERIC,
     xg_buildup NUMERIC,
     key_passes INT,
     yellow_card INT,
-    red_card INT
-);
+    red_card INT,
+    team_id INT REFERENCES teams(id),
+    player_id INT REFERENCES players(id),
+    PRIMARY KEY (season, id),
+    FOREIGN KEY (season, match_id) REFERENCES matches(season, id) ON DELETE CASCADE
+) PARTITION BY LIST (season);
 
--- 4. DIMENSION TABLE: LINEUPS
--- Stores tactical lineup data (Starting XI, Substitutes, Defensive Actions).
 CREATE TABLE lineups (
-    id SERIAL PRIMARY KEY,
-    match_id INT REFERENCES matches(id) ON DELETE CASCADE,
+    id SERIAL,
+    season VARCHAR(10) NOT NULL,
+    match_id INT NOT NULL,
     team TEXT NOT NULL,
     player_name TEXT NOT NULL,
-    position TEXT,                          -- e.g., 'DC' (Center Back), 'FW' (Forward)
+    position TEXT,
     is_starter BOOLEAN,
     shots_on_target INT,
     fouls_committed INT,
     fouls_suffered INT,
     offsides INT,
     saves INT,
-    goals_conceded INT
-);
+    goals_conceded INT,
+    team_id INT REFERENCES teams(id),
+    player_id INT REFERENCES players(id),
+    PRIMARY KEY (season, id),
+    FOREIGN KEY (season, match_id) REFERENCES matches(season, id) ON DELETE CASCADE
+) PARTITION BY LIST (season);
+
+-- 3. PARTITIONS: one per season, e.g. SELECT ensure_season_partitions('2023');
+CREATE OR REPLACE FUNCTION ensure_season_partitions(p_season TEXT) RETURNS void AS $$
+DECLARE
+    suffix TEXT := regexp_replace(p_season, '[^0-9A-Za-z]', '_', 'g');
+    parent TEXT;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY['matches', 'player_stats', 'lineups'] LOOP
+        IF to_regclass(parent || '_s' || suffix) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES IN (%L)',
+                           parent || '_s' || suffix, parent, p_season);
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
 
--- INDEXES (Optional but recommended for speed)
-CREATE INDEX idx_matches_season ON matches(season);
+-- 4. INDEXES
 CREATE INDEX idx_matches_date ON matches(date);
-CREATE INDEX idx_player_stats_name ON player_stats(player_name);
\ No newline at end of file
+CREATE INDEX idx_player_stats_name ON player_stats(player_name);
+
+CREATE INDEX idx_player_stats_match_id ON player_stats(season, match_id);
+CREATE INDEX idx_lineups_match_id ON lineups(season, match_id);
+
+CREATE UNIQUE INDEX uq_player_stats_match_team_player ON player_stats(season, match_id, team, player_name);
+CREATE UNIQUE INDEX uq_lineups_match_team_player ON lineups(season, match_id, team, player_name);
+
+CREATE INDEX idx_matches_season_results ON matches(season)
+    INCLUDE (id, home_team, away_team, home_score, away_score);
+CREATE INDEX idx_player_stats_player_team ON player_stats(player_name, team)
+    INCLUDE (minutes, goals, xg, xg_buildup);
+CREATE INDEX idx_lineups_team ON lineups(team)
+    INCLUDE (match_id, fouls_committed);
+
+CREATE INDEX idx_player_stats_player_id ON player_stats(player_id);
+CREATE INDEX idx_lineups_player_id ON lineups(player_id);
+
+-- 5. SEASON AGGREGATES: league table, player-season and team-season totals,
+--    rebuilt per season by refresh_season_aggregates('2023') in the load
+--    transaction (agg_standings.position is then rewritten by the standings
+--    engine, modules/standings.py)
+CREATE TABLE agg_standings (
+    season VARCHAR(10) NOT NULL,
+    team TEXT NOT NULL,
+    position INT NOT NULL,
+    played INT NOT NULL,
+    won INT NOT NULL,
+    drawn INT NOT NULL,
+    lost INT NOT NULL,
+    gf INT NOT NULL,
+    ga INT NOT NULL,
+    gd INT NOT NULL,
+    points INT NOT NULL,
+    xg_for NUMERIC,
+    xg_against NUMERIC,
+    PRIMARY KEY (season, team)
+);
+
+CREATE TABLE agg_player_season (
+    season VARCHAR(10) NOT NULL,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    matches INT NOT NULL,
+    minutes INT,
+    goals INT,
+    assists INT,
+    shots INT,
+    xg NUMERIC,
+    xa NUMERIC,
+    xg_chain NUMERIC,
+    xg_buildup NUMERIC,
+    key_passes INT,
+    yellow_cards INT,
+    red_cards INT,
+    PRIMARY KEY (season, team, player_name)
+);
+
+CREATE TABLE agg_team_season (
+    season VARCHAR(10) NOT NULL,
+    team TEXT NOT NULL,
+    games_played INT NOT NULL,
+    total_fouls INT,
+    avg_fouls_per_game NUMERIC,
+    fouls_suffered INT,
+    shots_on_target INT,
+    saves INT,
+    goals INT,
+    xg NUMERIC,
+    xa NUMERIC,
+    xg_buildup NUMERIC,
+    PRIMARY KEY (season, team)
+);
+
+CREATE INDEX idx_agg_player_season_player ON agg_player_season(player_name, team);
+
+CREATE OR REPLACE FUNCTION refresh_season_aggregates(p_season TEXT) RETURNS void AS $$
+BEGIN
+    DELETE FROM agg_standings WHERE season = p_season;
+    DELETE FROM agg_player_season WHERE season = p_season;
+    DELETE FROM agg_team_season WHERE season = p_season;
+
+    -- League table: one row per team and side, so teams that only appear home
+    -- or away (partial seasons) are still counted.
+    INSERT INTO agg_standings (season, team, position, played, won, drawn, lost, gf, ga, gd, points, xg_for, xg_against)
+    SELECT p_season, team,
+           RANK() OVER (ORDER BY SUM(3 * w + d) DESC, SUM(gf) - SUM(ga) DESC, SUM(gf) DESC),
+           COUNT(*), SUM(w), SUM(d), SUM(l), SUM(gf), SUM(ga), SUM(gf) - SUM(ga), SUM(3 * w + d),
+           SUM(xgf), SUM(xga)
+    FROM (
+        SELECT home_team AS team, home_score AS gf, away_score AS ga, home_xg AS xgf, away_xg AS xga,
+               (home_score > away_score)::int AS w, (home_score = away_score)::int AS d,
+               (home_score < away_score)::int AS l
+        FROM matches WHERE season = p_season
+        UNION ALL
+        SELECT away_team, away_score, home_score, away_xg, home_xg,
+               (away_score > home_score)::int, (away_score = home_score)::int,
+               (away_score < home_score)::int
+        FROM matches WHERE season = p_season
+    ) sides
+    GROUP BY team;
+
+    INSERT INTO agg_player_season (season, team, player_name, matches, minutes, goals, assists, shots,
+                                   xg, xa, xg_chain, xg_buildup, key_passes, yellow_cards, red_cards)
+    SELECT p_season, team, player_name, COUNT(*), SUM(minutes), SUM(goals), SUM(assists), SUM(shots),
+           SUM(xg), SUM(xa), SUM(xg_chain), SUM(xg_buildup), SUM(key_passes), SUM(yellow_card), SUM(red_card)
+    FROM player_stats WHERE season = p_season
+    GROUP BY team, player_name;
+
+    INSERT INTO agg_team_season (season, team, games_played, total_fouls, avg_fouls_per_game, fouls_suffered,
+                                 shots_on_target, saves, goals, xg, xa, xg_buildup)
+    SELECT p_season, COALESCE(l.team, p.team), COALESCE(l.games, p.games),
+           l.fouls, ROUND(l.fouls::numeric / NULLIF(l.games, 0), 2), l.fouls_suffered,
+           l.shots_on_target, l.saves, p.goals, p.xg, p.xa, p.xg_buildup
+    FROM (
+        SELECT team, COUNT(DISTINCT match_id) AS games, SUM(fouls_committed) AS fouls,
+               SUM(fouls_suffered) AS fouls_suffered, SUM(shots_on_target) AS shots_on_target,
+               SUM(saves) AS saves
+        FROM lineups WHERE season = p_season GROUP BY team
+    ) l
+    FULL OUTER JOIN (
+        SELECT team, COUNT(DISTINCT match_id) AS games, SUM(goals) AS goals, SUM(xg) AS xg,
+               SUM(xa) AS xa, SUM(xg_buildup) AS xg_buildup
+        FROM player_stats WHERE season = p_season GROUP BY team
+    ) p ON l.team = p.team;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 6. DATA VERSIONS: one counter per season, bumped by every load (query result
+--    cache and export manifest, see modules/result_cache.py)
+CREATE TABLE data_versions (
+    season VARCHAR(10) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION bump_data_version(p_season TEXT) RETURNS BIGINT AS $$
+    INSERT INTO data_versions (season) VALUES (p_season)
+    ON CONFLICT (season) DO UPDATE
+        SET version = data_versions.version + 1, updated_at = now()
+    RETURNING version;
+$$ LANGUAGE sql;
+
+-- 7. FEATURE STORE: pre-match model features (modules/features.py)
+CREATE TABLE feat_team_match (
+    season VARCHAR(10) NOT NULL,
+    match_id INT NOT NULL,
+    date DATE NOT NULL,
+    team TEXT NOT NULL,
+    is_home BOOLEAN NOT NULL,
+    prior_matches INT NOT NULL,
+    form_points REAL,
+    form_gf REAL,
+    form_ga REAL,
+    form_xg_for REAL,
+    form_xg_against REAL,
+    availability REAL,
+    PRIMARY KEY (season, match_id, team)
+);
+
+CREATE TABLE feat_player_match (
+    season VARCHAR(10) NOT NULL,
+    match_id INT NOT NULL,
+    date DATE NOT NULL,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    player_id INT,
+    prior_minutes INT NOT NULL,
+    xg_p90 REAL,
+    xa_p90 REAL,
+    xg_chain_p90 REAL,
+    key_passes_p90 REAL,
+    PRIMARY KEY (season, match_id, team, player_name)
+);
+
+CREATE TABLE feat_match (
+    season VARCHAR(10) NOT NULL,
+    match_id INT NOT NULL,
+    date DATE NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_prior_matches INT,
+    home_form_points REAL,
+    home_form_xg_for REAL,
+    home_form_xg_against REAL,
+    home_availability REAL,
+    home_xi_xg_p90 REAL,
+    away_prior_matches INT,
+    away_form_points REAL,
+    away_form_xg_for REAL,
+    away_form_xg_against REAL,
+    away_availability REAL,
+    away_xi_xg_p90 REAL,
+    home_score INT,
+    away_score INT,
+    fingerprint TEXT,
+    PRIMARY KEY (season, match_id)
+);
+
+CREATE INDEX idx_feat_team_match_date ON feat_team_match(season, date);
+CREATE INDEX idx_feat_player_match_date ON feat_player_match(season, date);
+CREATE INDEX idx_feat_match_date ON feat_match(season, date);
@@ -0,0 +1,199 @@
+-- =============================================================================
+-- SPANISH FOOTBALL ANALYTICS - EMBEDDED SCHEMA (DUCKDB)
+-- =============================================================================
+-- The same tables as schema.sql for the embedded backend (modules/backends.py,
+-- STORAGE_BACKEND=duckdb). Differences from PostgreSQL:
+--   * no partitions: DuckDB stores every table in columnar row groups, and a
+--     season filter prunes them through the zone maps
+--   * SERIAL -> sequences, NUMERIC -> DOUBLE (DuckDB's NUMERIC is DECIMAL(18,3))
+--   * no foreign keys (DuckDB cannot cascade them) and no keys on the
+--     aggregate tables (they are rebuilt by DELETE + INSERT in one transaction,
+--     which DuckDB's unique indexes reject)
+--   * the aggregate refresh and data-version bump run from Python (see
+--     backends.DuckDBCursor) instead of PL/pgSQL functions
+-- Every statement is idempotent: the backend applies this file on each connect.
+-- =============================================================================
+
+CREATE SEQUENCE IF NOT EXISTS teams_id_seq;
+CREATE SEQUENCE IF NOT EXISTS players_id_seq;
+CREATE SEQUENCE IF NOT EXISTS matches_id_seq;
+CREATE SEQUENCE IF NOT EXISTS player_stats_id_seq;
+CREATE SEQUENCE IF NOT EXISTS lineups_id_seq;
+
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY DEFAULT nextval('teams_id_seq'),
+    team_key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY DEFAULT nextval('players_id_seq'),
+    player_key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER NOT NULL DEFAULT nextval('matches_id_seq'),
+    season VARCHAR(10) NOT NULL,
+    date DATE NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_score INTEGER,
+    away_score INTEGER,
+    home_xg DOUBLE,
+    away_xg DOUBLE,
+    fingerprint TEXT,
+    PRIMARY KEY (season, id),
+    UNIQUE (season, date, home_team, away_team)
+);
+
+CREATE TABLE IF NOT EXISTS player_stats (
+    id INTEGER NOT NULL DEFAULT nextval('player_stats_id_seq'),
+    season VARCHAR(10) NOT NULL,
+    match_id INTEGER NOT NULL,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    minutes INTEGER,
+    goals INTEGER,
+    assists INTEGER,
+    shots INTEGER,
+    xg DOUBLE,
+    xa DOUBLE,
+    xg_chain DOUBLE,
+    xg_buildup DOUBLE,
+    key_passes INTEGER,
+    yellow_card INTEGER,
+    red_card INTEGER,
+    team_id INTEGER,
+    player_id INTEGER,
+    PRIMARY KEY (season, id),
+    UNIQUE (season, match_id, team, player_name)
+);
+
+CREATE TABLE IF NOT EXISTS lineups (
+    id INTEGER NOT NULL DEFAULT nextval('lineups_id_seq'),
+    season VARCHAR(10) NOT NULL,
+    match_id INTEGER NOT NULL,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    position TEXT,
+    is_starter BOOLEAN,
+    shots_on_target INTEGER,
+    fouls_committed INTEGER,
+    fouls_suffered INTEGER,
+    offsides INTEGER,
+    saves INTEGER,
+    goals_conceded INTEGER,
+    team_id INTEGER,
+    player_id INTEGER,
+    PRIMARY KEY (season, id),
+    UNIQUE (season, match_id, team, player_name)
+);
+
+CREATE TABLE IF NOT EXISTS agg_standings (
+    season VARCHAR(10) NOT NULL,
+    team TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    played INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    drawn INTEGER NOT NULL,
+    lost INTEGER NOT NULL,
+    gf INTEGER NOT NULL,
+    ga INTEGER NOT NULL,
+    gd INTEGER NOT NULL,
+    points INTEGER NOT NULL,
+    xg_for DOUBLE,
+    xg_against DOUBLE
+);
+
+CREATE TABLE IF NOT EXISTS agg_player_season (
+    season VARCHAR(10) NOT NULL,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    matches INTEGER NOT NULL,
+    minutes INTEGER,
+    goals INTEGER,
+    assists INTEGER,
+    shots INTEGER,
+    xg DOUBLE,
+    xa DOUBLE,
+    xg_chain DOUBLE,
+    xg_buildup DOUBLE,
+    key_passes INTEGER,
+    yellow_cards INTEGER,
+    red_cards INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS agg_team_season (
+    season VARCHAR(10) NOT NULL,
+    team TEXT NOT NULL,
+    games_played INTEGER NOT NULL,
+    total_fouls INTEGER,
+    avg_fouls_per_game DOUBLE,
+    fouls_suffered INTEGER,
+    shots_on_target INTEGER,
+    saves INTEGER,
+    goals INTEGER,
+    xg DOUBLE,
+    xa DOUBLE,
+    xg_buildup DOUBLE
+);
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    season VARCHAR(10) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Feature store (migration 0008); rewritten by DELETE + INSERT, so no keys
+CREATE TABLE IF NOT EXISTS feat_team_match (
+    season VARCHAR(10) NOT NULL,
+    match_id INTEGER NOT NULL,
+    date DATE NOT NULL,
+    team TEXT NOT NULL,
+    is_home BOOLEAN NOT NULL,
+    prior_matches INTEGER NOT NULL,
+    form_points REAL,
+    form_gf REAL,
+    form_ga REAL,
+    form_xg_for REAL,
+    form_xg_against REAL,
+    availability REAL
+);
+
+CREATE TABLE IF NOT EXISTS feat_player_match (
+    season VARCHAR(10) NOT NULL,
+    match_id INTEGER NOT NULL,
+    date DATE NOT NULL,
+    team TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    player_id INTEGER,
+    prior_minutes INTEGER NOT NULL,
+    xg_p90 REAL,
+    xa_p90 REAL,
+    xg_chain_p90 REAL,
+    key_passes_p90 REAL
+);
+
+CREATE TABLE IF NOT EXISTS feat_match (
+    season VARCHAR(10) NOT NULL,
+    match_id INTEGER NOT NULL,
+    date DATE NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_prior_matches INTEGER,
+    home_form_points REAL,
+    home_form_xg_for REAL,
+    home_form_xg_against REAL,
+    home_availability REAL,
+    home_xi_xg_p90 REAL,
+    away_prior_matches INTEGER,
+    away_form_points REAL,
+    away_form_xg_for REAL,
+    away_form_xg_against REAL,
+    away_availability REAL,
+    away_xi_xg_p90 REAL,
+    home_score INTEGER,
+    away_score INTEGER,
+    fingerprint TEXT
+);
@@ -1,31 +1,21 @@
-from modules.utils import run_test_query
+import sys
+from modules.queries import run_query
 
-# 1. DEFINE THE TEST
-# We must filter EACH subquery independently because 'season' 
-# only exists in the 'matches' table.
-sql_query = """
-    SELECT 
-        -- 1. Count Matches in 2023
-        (SELECT COUNT(*) FROM matches WHERE season = '2023') as total_matches,
-        
-        -- 2. Count Player Stats (Linked to 2023 matches via JOIN)
-        (SELECT COUNT(DISTINCT ps.match_id) 
-         FROM player_stats ps
-         JOIN matches m ON ps.match_id = m.id
-         WHERE m.season = '2023') as matches_with_stats,
-         
-        -- 3. Count Lineups (Linked to 2023 matches via JOIN)
-        (SELECT COUNT(DISTINCT l.match_id) 
-         FROM lineups l
-         JOIN matches m ON l.match_id = m.id
-         WHERE m.season = '2023') as matches_with_lineups;
-"""
+SEASON = sys.argv[1] if len(sys.argv) > 1 else "2023"
 
-# 2. RUN THE TEST
-df = run_test_query("Volume Check (Season 2023)", sql_query)
+# 1. RUN THE TEST
+# Catalog query "volume" (modules/queries.py): every table is filtered by its
+# own season column, with the season bound as a parameter.
+print(f"\n TEST: Volume Check (Season {SEASON})")
+print("-" * 50)
+try:
+    df = run_query("volume", season=SEASON)
+except Exception as e:
+    print(f" SQL ERROR: {e}")
+    df = None
 
 # 3. ANALYZE RESULTS
-if df.empty:
+if df is None or df.empty:
     print("[FAIL] Could not retrieve data.")
 else:
     # Extract values from the dataframe
@@ -40,7 +30,7 @@ else:
     # CHECK 1: Total Volume
     # La Liga has 380 matches per season
     if matches == 380:
-        print(f"✅ [PASS] Found exactly {matches} matches for 2023.")
+        print(f"✅ [PASS] Found exactly {matches} matches for {SEASON}.")
     else:
         print(f"⚠️ [WARN] Expected 380 matches, found {matches}. (Scraper might be incomplete)")
 
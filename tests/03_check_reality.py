@@ -1,63 +1,47 @@
-from modules.utils import run_test_query
+import sys
+from modules.standings import standings
+from modules.aggregates import read_standings
+from modules.integrity import KNOWN_CHAMPIONS
 
-# 1. DEFINE THE TEST
-# This SQL logic mimics exactly how a league table is calculated
-sql_query = """
-    WITH home_points AS (
-        SELECT 
-            home_team as team, 
-            SUM(CASE WHEN home_score > away_score THEN 3 
-                     WHEN home_score = away_score THEN 1 
-                     ELSE 0 END) as pts,
-            SUM(home_score) as gf,
-            SUM(away_score) as ga
-        FROM matches 
-        WHERE season = '2023'  -- <--- FIXED: Moved here and added quotes
-        GROUP BY home_team
-    ),
-    away_points AS (
-        SELECT 
-            away_team as team, 
-            SUM(CASE WHEN away_score > home_score THEN 3 
-                     WHEN away_score = home_score THEN 1 
-                     ELSE 0 END) as pts,
-            SUM(away_score) as gf,
-            SUM(home_score) as ga
-        FROM matches 
-        WHERE season = '2023'  -- <--- FIXED: Moved here and added quotes
-        GROUP BY away_team
-    )
-    SELECT 
-        h.team,
-        (h.pts + a.pts) as points, -- Changed to lowercase for consistency
-        (h.gf + a.gf) as gf,
-        (h.ga + a.ga) as ga,
-        ((h.gf + a.gf) - (h.ga + a.ga)) as gd
-    FROM home_points h
-    JOIN away_points a ON h.team = a.team
-    ORDER BY points DESC, gd DESC
-    LIMIT 5;
-"""
+SEASON = sys.argv[1] if len(sys.argv) > 1 else "2023"
 
-# 2. RUN THE TEST
-df = run_test_query("Reality Check (League Standings)", sql_query)
+# 1. RUN THE TEST
+# League table from the standings engine (modules/standings.py): every team that
+# played (home OR away) is counted and teams level on points are ordered with
+# La Liga's head-to-head tiebreakers.
+print(f"\n TEST: Reality Check (League Standings, Season {SEASON})")
+print("-" * 50)
+try:
+    df = standings(SEASON)
+    stored = read_standings(SEASON)
+except Exception as e:
+    print(f" SQL ERROR: {e}")
+    df = None
 
 # 3. ANALYZE RESULTS
-if df.empty:
+if df is None or df.empty:
     print("[FAIL] No data returned.")
 else:
-    print(df.to_string(index=False))
+    print(df.head(5).to_string(index=False))
     print("-" * 50)
 
-    # Check Real Madrid (The 2023 Winner)
-    # Note: Column names coming from SQL usually default to lowercase in pandas
-    rm_row = df[df['team'] == 'Real Madrid']
-    
-    if not rm_row.empty:
-        points = rm_row.iloc[0]['points']
-        if points == 95:
-            print(f"[PASS] Real Madrid has {points} Points (Matches Reality).")
-        else:
-            print(f"[WARNING] Real Madrid has {points} points (Expected 95). Check for missing games.")
+    # CHECK 1: Engine vs stored aggregate table (agg_standings, positions written by the engine)
+    engine_rows = dict(zip(df["team"].astype(str), zip(df["position"], df["points"])))
+    stored_rows = dict(zip(stored["team"].astype(str), zip(stored["position"], stored["points"])))
+    if engine_rows == stored_rows:
+        print(f"[PASS] {len(engine_rows)} teams, positions and points match agg_standings.")
     else:
-        print("[FAIL] Real Madrid not found in top 5.")
\ No newline at end of file
+        diff = sorted(t for t in engine_rows.keys() | stored_rows.keys() if engine_rows.get(t) != stored_rows.get(t))
+        print(f"[FAIL] Position/points differ from agg_standings for: {diff}")
+
+    # CHECK 2: Known champion
+    if SEASON in KNOWN_CHAMPIONS:
+        team, expected = KNOWN_CHAMPIONS[SEASON]
+        row = df[df["team"] == team]
+        if row.empty:
+            print(f"[FAIL] {team} not found in the table.")
+        elif row.iloc[0]["points"] == expected and row.iloc[0]["position"] == 1:
+            print(f"[PASS] {team} champion with {expected} Points (Matches Reality).")
+        else:
+            print(f"[WARNING] {team} is #{row.iloc[0]['position']} with {row.iloc[0]['points']} points "
+                  f"(Expected #1 with {expected}). Check for missing games.")
@@ -0,0 +1,51 @@
+import pytest
+
+from benchmarks.synthetic import generate_season
+from modules.ingest_season import transform_season, load_season, ensure_partitions
+from modules.loaders import LOADERS
+
+# ==============================================================================
+# SHARED FIXTURES
+# ==============================================================================
+#   metrics_file -> stage metrics of every test go to its tmp_path (autouse)
+#   warehouse    -> factory for DuckDB files with the schema, partitions and
+#                   synthetic seasons loaded: warehouse("name", loader="copy")
+#   loader       -> every insert strategy of modules/loaders.py, one test each
+# No database server needed; tests that use DuckDB skip when it is missing.
+# ==============================================================================
+
+SEASON = "2023"
+TEAMS = 6
+
+@pytest.fixture(autouse=True)
+def metrics_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("ETL_METRICS_PATH", str(tmp_path / "metrics.jsonl"))
+
+@pytest.fixture
+def warehouse(tmp_path):
+    pytest.importorskip("duckdb")
+    from modules.backends import DuckDBBackend
+    opened = []
+
+    def open_warehouse(name="warehouse", seasons=(SEASON,), loader="copy", n_teams=TEAMS, seed=0):
+        """
+        Connection to tmp_path/<name>.duckdb with `seasons` loaded (loader=None: schema only).
+        """
+        backend = DuckDBBackend(str(tmp_path / f"{name}.duckdb"))
+        conn = backend.connect()
+        opened.append(conn)
+        backend.ensure_schema(conn, verbose=False)
+        ensure_partitions(conn, list(seasons))
+        if loader:
+            for season in seasons:
+                frames = generate_season(season, n_teams=n_teams, seed=seed)
+                load_season(conn, transform_season(season, *frames), loader=loader)
+        return conn
+
+    yield open_warehouse
+    for conn in opened:
+        conn.close()
+
+@pytest.fixture(params=LOADERS)
+def loader(request):
+    return request.param
@@ -0,0 +1,18 @@
+import sys
+
+from benchmarks import etl_benchmark
+
+# ==============================================================================
+# OFFLINE ETL BENCHMARK
+# ==============================================================================
+# The default run (in-memory stand-in sink, no database) must keep working:
+# every stage of load_season, aggregate refresh included, goes through
+# benchmarks/stand_in.py.
+# ==============================================================================
+
+def test_default_benchmark_runs_on_the_stand_in(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["etl_benchmark", "--seasons", "1", "--teams", "6", "--repeats", "1"])
+    etl_benchmark.main()
+    out = capsys.readouterr().out
+    for stage in etl_benchmark.BENCH_STAGES:
+        assert stage in out
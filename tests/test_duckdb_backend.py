@@ -0,0 +1,82 @@
+import pytest
+
+pytest.importorskip("duckdb")
+
+from benchmarks.synthetic import generate_season
+from modules.backends import DuckDBConnection
+from modules.ingest_season import transform_season, load_season, run_ingestion
+from conftest import SEASON, TEAMS
+
+# ==============================================================================
+# DUCKDB BACKEND
+# ==============================================================================
+# Loads a small synthetic season into a temporary DuckDB file with every loader
+# (the default 'executemany' included) and checks the adapter's transaction
+# handling. No database server needed:
+#   python -m pytest tests/test_duckdb_backend.py
+# ==============================================================================
+
+TABLE_SQL = {
+    "matches": "SELECT season, date, home_team, away_team, home_score, away_score FROM matches",
+    "player_stats": "SELECT season, team, player_name, minutes, goals, xg FROM player_stats",
+    "lineups": "SELECT season, team, player_name, is_starter FROM lineups",
+    "agg_standings": "SELECT season, team, position, points, gd FROM agg_standings",
+}
+
+def snapshot(conn):
+    return {table: sorted(conn.raw.execute(sql).fetchall(), key=repr) for table, sql in TABLE_SQL.items()}
+
+def test_default_loader_loads_a_season(warehouse):
+    tables = snapshot(warehouse("default", loader="executemany"))
+    assert len(tables["matches"]) == TEAMS * (TEAMS - 1)
+    assert tables["player_stats"] and tables["lineups"]
+    assert len(tables["agg_standings"]) == TEAMS
+
+def test_loaders_write_the_same_rows(warehouse, loader):
+    assert snapshot(warehouse(loader, loader=loader)) == snapshot(warehouse("reference", loader="copy"))
+
+def test_reload_upserts_instead_of_duplicating(warehouse):
+    conn = warehouse("reload", loader="executemany")
+    before = snapshot(conn)
+    load_season(conn, transform_season(SEASON, *generate_season(SEASON, n_teams=TEAMS)), loader="executemany")
+    assert snapshot(conn) == before
+
+class FailingCommit:
+    def begin(self):
+        pass
+
+    def commit(self):
+        raise RuntimeError("commit failed")
+
+    def rollback(self):
+        raise AssertionError("rollback() after a failed commit")
+
+    def close(self):
+        pass
+
+def test_failed_commit_ends_the_transaction():
+    conn = DuckDBConnection(FailingCommit())
+    conn.begin()
+    with pytest.raises(RuntimeError, match="commit failed"):
+        conn.commit()
+    assert not conn.in_transaction
+    conn.rollback()
+    conn.close()
+
+def test_parallel_workers_are_rejected(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "duckdb")
+    monkeypatch.setenv("DUCKDB_PATH", str(tmp_path / "parallel.duckdb"))
+    with pytest.raises(ValueError, match="Parallel loads"):
+        run_ingestion(seasons=[SEASON], workers=2)
+
+def test_export_is_rejected_before_ingesting(tmp_path, monkeypatch):
+    import main
+    # main.py sets both; monkeypatch restores them afterwards
+    monkeypatch.setenv("STORAGE_BACKEND", "postgres")
+    monkeypatch.setenv("DUCKDB_PATH", str(tmp_path / "export.duckdb"))
+    monkeypatch.setattr(main, "run_ingestion", lambda **kwargs: pytest.fail("ingested before rejecting --export"))
+    monkeypatch.setattr("sys.argv", ["main.py", "--backend", "duckdb", "--duckdb-path", str(tmp_path / "export.duckdb"),
+                                     "--seasons", SEASON, "--export"])
+    with pytest.raises(SystemExit) as exit_info:
+        main.main()
+    assert exit_info.value.code == 2
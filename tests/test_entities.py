@@ -0,0 +1,58 @@
+import pandas as pd
+from modules.entities import entity_key_columns, learn_player_aliases
+
+# ==============================================================================
+# ENTITY RESOLUTION
+# ==============================================================================
+# Player keys: namesakes at different clubs stay apart, lineup spellings are
+# reconciled with the player stats of the same game side.
+# ==============================================================================
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["season", "match_key", "team", "player_name"])
+
+def test_namesakes_at_different_clubs_get_different_keys():
+    payload = entity_key_columns(frame([
+        ("2023", "m1", "Villarreal", "Álex Baena"),
+        ("2023", "m2", "Girona", "Alex Baena"),
+        ("2023", "m3", "Villarreal", "Alex Baena"),
+    ]))
+    keys = payload["player_key"].tolist()
+    assert keys[0] == keys[2] == "Villarreal|alex baena"
+    assert keys[1] != keys[0]
+
+def test_player_keeps_the_key_across_seasons():
+    payload = entity_key_columns(frame([
+        ("2022", "m1", "Real Madrid", "Jude Bellingham"),
+        ("2023", "m2", "Real Madrid", "Jude Bellingham"),
+    ]))
+    assert payload["player_key"].nunique() == 1
+
+def test_lineup_spellings_are_learned_from_shared_games():
+    players = frame([
+        ("2023", "m1", "Athletic Club", "Nico Williams"),
+        ("2023", "m1", "Athletic Club", "Iñaki Williams"),
+        ("2023", "m1", "Real Sociedad", "Takefusa Kubo"),
+        ("2023", "m2", "Athletic Club", "Nico Williams"),
+    ])
+    lineups = frame([
+        ("2023", "m1", "Athletic Club", "Nicholas Williams"),
+        ("2023", "m1", "Athletic Club", "Inaki Williams"),
+        ("2023", "m1", "Real Sociedad", "Take Kubo"),
+        ("2023", "m2", "Athletic Club", "Nicholas Williams"),
+    ])
+    aliases = learn_player_aliases(players, lineups)
+    assert aliases == {
+        ("Athletic Club", "nicholas williams"): "nico williams",
+        ("Real Sociedad", "take kubo"): "takefusa kubo",
+    }
+    player_keys = set(entity_key_columns(players)["player_key"])
+    assert set(entity_key_columns(lineups, aliases)["player_key"]) == player_keys
+
+def test_ambiguous_spellings_are_not_guessed():
+    players = frame([
+        ("2023", "m1", "Sevilla", "Sergio Ramos"),
+        ("2023", "m1", "Sevilla", "Sergio Rico"),
+    ])
+    lineups = frame([("2023", "m1", "Sevilla", "Sergio")])
+    assert learn_player_aliases(players, lineups) == {}
@@ -0,0 +1,111 @@
+from collections import namedtuple
+from datetime import datetime
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import pyarrow.parquet as pq
+from modules import export
+from modules.export import export_season, export_seasons, season_path
+
+# ==============================================================================
+# PARQUET EXPORT
+# ==============================================================================
+# Runs export_season over a stand-in connection that answers like PostgreSQL:
+# lineups column types by OID and COPY ... TO STDOUT output in PostgreSQL's CSV
+# format (booleans as t/f, NULL as an empty field), so both export methods are
+# checked without a database server. The manifest must re-export a season
+# whose data version counter restarted after a reset.
+# ==============================================================================
+
+Column = namedtuple("Column", ["name", "type_code"])
+
+LINEUP_COLUMNS = [
+    Column("id", 23), Column("season", 1043), Column("match_id", 23), Column("team", 25),
+    Column("player_name", 25), Column("position", 25), Column("is_starter", 16), Column("saves", 23),
+]
+LINEUP_ROWS = [
+    (1, "2023", 10, "Girona", "Iñaki Gómez", "Goalkeeper", True, 3),
+    (2, "2023", 10, "Girona", "Dani, \"el 9\"", "Forward", False, None),
+    (3, "2023", 11, "Cadiz", "Pau Gil", None, None, 0),
+]
+
+def copy_csv(rows):
+    """
+    Rows as PostgreSQL's COPY ... (FORMAT csv, HEADER) writes them.
+    """
+    def field(value):
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        text = str(value)
+        return '"' + text.replace('"', '""') + '"' if any(c in text for c in ',"\n') else text
+    lines = [",".join(c.name for c in LINEUP_COLUMNS)] + [",".join(field(v) for v in row) for row in rows]
+    return ("\n".join(lines) + "\n").encode()
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.rows = []
+        self.itersize = 2000
+
+    def execute(self, sql, params=None):
+        if "data_versions" in sql:
+            self.rows = list(self.conn.versions)
+            return
+        self.description = LINEUP_COLUMNS
+        self.rows = [] if "LIMIT 0" in sql else list(LINEUP_ROWS)
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def mogrify(self, sql, params):
+        return sql.replace("%s", f"'{params[0]}'").encode()
+
+    def copy_expert(self, sql, file):
+        assert "TO STDOUT" in sql
+        file.write(copy_csv(LINEUP_ROWS))
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, versions=()):
+        self.versions = versions  # (season, version, updated_at) rows of data_versions
+
+    def cursor(self, name=None):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+@pytest.mark.parametrize("method", ["copy", "cursor"])
+def test_export_lineups(tmp_path, method):
+    rows = export_season(FakeConnection(), "lineups", "2023", export_dir=str(tmp_path), method=method)
+    table = pq.read_table(season_path(str(tmp_path), "lineups", "2023"))
+    assert rows == len(LINEUP_ROWS)
+    assert table.column("is_starter").to_pylist() == [True, False, None]
+    assert table.column("saves").to_pylist() == [3, None, 0]
+    assert table.column("player_name").to_pylist() == [r[4] for r in LINEUP_ROWS]
+    assert table.column("position").to_pylist() == ["Goalkeeper", "Forward", None]
+
+def test_manifest_reexports_after_a_reset(tmp_path, monkeypatch):
+    def run(version, updated_at):
+        conn = FakeConnection([("2023", version, updated_at)])
+        monkeypatch.setattr(export, "get_raw_connection", lambda: conn)
+        return export_seasons(export_dir=str(tmp_path), tables=["lineups"])["2023"]["lineups"]
+
+    assert run(1, datetime(2024, 5, 1, 12, 0)) == len(LINEUP_ROWS)
+    assert run(1, datetime(2024, 5, 1, 12, 0)) == "unchanged"
+    # data_versions recreated by --reset: the counter is 1 again, the bump time is not
+    assert run(1, datetime(2024, 6, 2, 9, 30)) == len(LINEUP_ROWS)
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from modules.features import FEATURE_TABLES, update_features
+from conftest import SEASON
+
+# ==============================================================================
+# FEATURE STORE
+# ==============================================================================
+# An incremental update (history seeded from SQL totals, only the rows from the
+# first changed match read and rewritten) must give the same features as a
+# full recompute of the season.
+# ==============================================================================
+
+@pytest.fixture
+def conn(warehouse):
+    return warehouse("features", n_teams=8)
+
+def snapshot(conn):
+    frames = {}
+    for table, columns in FEATURE_TABLES.items():
+        keys = [c for c in ("match_id", "team", "player_name") if c in columns]
+        frames[table] = pd.DataFrame(conn.raw.execute(f"SELECT * FROM {table}").fetchdf()) \
+            .sort_values(keys, ignore_index=True)[columns]
+    return frames
+
+def test_incremental_update_matches_full_recompute(conn):
+    assert update_features(conn, SEASON) > 0
+    assert update_features(conn, SEASON) == 0  # unchanged season: nothing rewritten
+
+    # Change one mid-season result: only that date onward is recomputed
+    match_id, date = conn.raw.execute(
+        "SELECT id, date FROM matches WHERE season = ? ORDER BY date, id LIMIT 1 OFFSET 30", [SEASON]
+    ).fetchone()
+    conn.raw.execute("UPDATE matches SET home_score = home_score + 3, fingerprint = 'changed' WHERE id = ?",
+                     [match_id])
+    later = conn.raw.execute("SELECT COUNT(*) FROM matches WHERE season = ? AND date >= ?", [SEASON, date]).fetchone()[0]
+    assert update_features(conn, SEASON) == later
+    incremental = snapshot(conn)
+
+    update_features(conn, SEASON, full=True)
+    full = snapshot(conn)
+    for table in FEATURE_TABLES:
+        pd.testing.assert_frame_equal(incremental[table], full[table], check_exact=False, rtol=1e-5)
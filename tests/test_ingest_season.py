@@ -0,0 +1,41 @@
+import gc
+import threading
+import time
+
+from benchmarks.synthetic import generate_season
+from modules import ingest_season
+from modules.sources import FileSource, SEASON_PLAN
+
+# ==============================================================================
+# PARALLEL INGESTION
+# ==============================================================================
+# Seasons prepared by the worker processes wait for a writer. With writes much
+# slower than preparation, no more than workers + writers prepared payloads
+# may be held in memory at once. Writers are replaced by a slow stand-in, the
+# preparations read seeded local files.
+# ==============================================================================
+
+SEASONS = [str(year) for year in range(2016, 2024)]
+
+def payloads_alive():
+    return sum(isinstance(o, dict) and {"season", "players", "lineups"} <= o.keys() for o in gc.get_objects())
+
+def test_prepared_payloads_are_bounded_by_the_writers(tmp_path, monkeypatch):
+    for season in SEASONS:
+        frames = generate_season(season, n_teams=4)
+        for (source, frame), df in zip(SEASON_PLAN, frames):
+            FileSource(source, str(tmp_path)).write(season, frame, df)
+
+    peak, written, lock = [0], [], threading.Lock()
+
+    def slow_writer(prepared, loader, mode="full", chunk_size=None):
+        time.sleep(0.3)
+        with lock:
+            peak[0] = max(peak[0], payloads_alive())
+            written.append(prepared["season"])
+
+    monkeypatch.setattr(ingest_season, "_load_on_own_connection", slow_writer)
+    results = ingest_season.run_parallel_ingestion(SEASONS, workers=2, writers=1, source_dir=str(tmp_path))
+    assert results == {season: "OK" for season in SEASONS}
+    assert sorted(written) == SEASONS
+    assert 1 <= peak[0] <= 2 + 1
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from modules.lineup_matching import match_lineups, shift_offsets
+
+# ==============================================================================
+# LINEUP MATCHING
+# ==============================================================================
+# ESPN lineup blocks are found under the game's own date or, for suspended and
+# rescheduled fixtures, under the nearest date within the tolerance window.
+# ==============================================================================
+
+def games(*rows):
+    return pd.DataFrame(rows, columns=["match_key", "date", "home_team_norm", "away_team_norm"])
+
+def lineups(*blocks):
+    """
+    Two player rows per (date_str, team) block.
+    """
+    return pd.DataFrame(
+        [(date, team, f"{team} {n}") for date, team in blocks for n in (1, 2)],
+        columns=["date_str", "team", "player"],
+    )
+
+def matched(games_df, lineups_df, tolerance_days):
+    out = match_lineups(games_df, lineups_df, tolerance_days)
+    return sorted(set(zip(out["match_key"], out["team"], out["date_str"])))
+
+def test_nearest_dates_are_tried_first():
+    assert shift_offsets(2) == [0, 1, -1, 2, -2]
+
+def test_exact_date_matches_every_player_row():
+    out = match_lineups(games(("m1", "2023-09-02", "betis", "girona")),
+                        lineups(("2023-09-02", "betis"), ("2023-09-02", "girona")), 0)
+    assert len(out) == 4
+    assert set(out["match_key"]) == {"m1"}
+
+def test_side_found_one_day_off_within_tolerance():
+    result = matched(games(("m1", "2023-09-02", "betis", "girona")),
+                     lineups(("2023-09-02", "betis"), ("2023-09-03", "girona")), 1)
+    assert result == [("m1", "betis", "2023-09-02"), ("m1", "girona", "2023-09-03")]
+
+def test_side_outside_tolerance_is_dropped():
+    result = matched(games(("m1", "2023-09-02", "betis", "girona")),
+                     lineups(("2023-09-02", "betis"), ("2023-09-05", "girona")), 2)
+    assert result == [("m1", "betis", "2023-09-02")]
+
+def test_exact_claim_wins_over_a_shifted_one():
+    # Girona plays on consecutive days; each game keeps its own date's block
+    result = matched(games(("m1", "2023-09-02", "betis", "girona"), ("m2", "2023-09-03", "girona", "celta")),
+                     lineups(("2023-09-02", "girona"), ("2023-09-03", "girona")), 1)
+    assert result == [("m1", "girona", "2023-09-02"), ("m2", "girona", "2023-09-03")]
@@ -0,0 +1,52 @@
+import pytest
+
+from modules.loaders import insert_chunks, rows_to_csv_buffer, write_batch
+
+# ==============================================================================
+# BULK LOADERS
+# ==============================================================================
+# The COPY loader must write exactly what the INSERT loader writes: NULLs,
+# delimiters and quotes inside text, and the ON CONFLICT semantics of the
+# staging path. Runs on a DuckDB warehouse (schema only).
+# ==============================================================================
+
+COLUMNS = ["id", "name", "score"]
+CONFLICT = "ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name, score = EXCLUDED.score"
+ROWS = [
+    (1, "Athletic Club", 1.5),
+    (2, None, None),
+    (3, 'Comma, "quoted"\nand a newline', 0.25),
+]
+
+@pytest.fixture
+def cur(warehouse):
+    conn = warehouse("loaders", loader=None)
+    cur = conn.cursor()
+    cur.execute("CREATE TABLE loader_rows (id INTEGER PRIMARY KEY, name TEXT, score DOUBLE PRECISION);")
+    yield cur
+    cur.close()
+
+def stored(cur):
+    cur.execute("SELECT id, name, score FROM loader_rows ORDER BY id;")
+    return [tuple(row) for row in cur.fetchall()]
+
+def test_none_is_written_as_an_unquoted_empty_field():
+    assert rows_to_csv_buffer([(2, None, None)]).read() == "2,,\n"
+
+def test_text_with_delimiters_round_trips(cur, loader):
+    write_batch(cur, "loader_rows", COLUMNS, ROWS, loader=loader)
+    assert stored(cur) == ROWS
+
+def test_conflict_clause_upserts(cur, loader):
+    write_batch(cur, "loader_rows", COLUMNS, ROWS, loader=loader, conflict_clause=CONFLICT)
+    write_batch(cur, "loader_rows", COLUMNS, [(1, "Real Sociedad", 2.0)], loader=loader, conflict_clause=CONFLICT)
+    assert stored(cur) == [(1, "Real Sociedad", 2.0)] + ROWS[1:]
+
+def test_chunks_are_written_in_order(cur):
+    rows, _ = insert_chunks(cur, "loader_rows", COLUMNS, ([row] for row in ROWS), loader="copy")
+    assert rows == len(ROWS)
+    assert stored(cur) == ROWS
+
+def test_unknown_loader_is_rejected(cur):
+    with pytest.raises(ValueError, match="Unknown loader"):
+        write_batch(cur, "loader_rows", COLUMNS, ROWS, loader="bulk")
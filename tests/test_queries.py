@@ -0,0 +1,75 @@
+import psycopg2
+
+from modules.integrity import fetch_integrity
+from modules.queries import run_query, statement_name
+from conftest import SEASON
+
+# ==============================================================================
+# QUERY CATALOG
+# ==============================================================================
+# run_query / fetch_integrity on a connection the caller passed in must leave
+# the caller's transaction alone: uncommitted rows stay visible and survive
+# until the caller commits. On PostgreSQL a statement that has to be
+# re-prepared is undone with a savepoint, never a rollback.
+# ==============================================================================
+
+def test_caller_transaction_survives_catalog_queries(warehouse):
+    conn = warehouse("caller", loader=None)
+    conn.cursor().execute(
+        "INSERT INTO matches (id, season, date, home_team, away_team, home_score, away_score) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)", (1, SEASON, "2023-08-11", "Betis", "Celta", 2, 1)
+    )
+    assert run_query("volume", conn=conn, season=SEASON)["total_matches"].tolist() == [1]
+    assert fetch_integrity([SEASON], conn=conn)[0]["total_matches"] == 1
+    conn.commit()
+    assert conn.raw.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == 1
+
+class StatementMissing(psycopg2.Error):
+    pgcode = "26000"  # prepared statement does not exist
+
+class RecordingCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = [("version",)]
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql.split(" AS ")[0])
+        if sql.startswith("EXECUTE") and self.conn.fail_next_execute:
+            self.conn.fail_next_execute = False
+            raise StatementMissing()
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+class RecordingConnection:
+    """
+    A psycopg2 connection inside the caller's open transaction.
+    """
+    autocommit = False
+
+    def __init__(self):
+        self.statements = []
+        self.fail_next_execute = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+def test_reprepare_uses_a_savepoint_on_a_caller_connection():
+    conn = RecordingConnection()
+    run_query("row_counts", conn=conn)
+    conn.statements.clear()
+    conn.fail_next_execute = True  # e.g. the server dropped the prepared statement
+    run_query("row_counts", conn=conn)
+    assert conn.statements == [
+        "SAVEPOINT run_query", f"EXECUTE {statement_name('row_counts')}", "ROLLBACK TO SAVEPOINT run_query",
+        f"PREPARE {statement_name('row_counts')}", f"EXECUTE {statement_name('row_counts')}",
+        "RELEASE SAVEPOINT run_query",
+    ]
+    assert conn.rollbacks == 0
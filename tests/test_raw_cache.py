@@ -0,0 +1,63 @@
+import json
+from datetime import datetime
+import pandas as pd
+import pytest
+
+from modules import raw_cache
+
+# ==============================================================================
+# RAW DATA CACHE
+# ==============================================================================
+# An entry of a finished season is final only when it was fetched after the
+# season ended; one scraped mid-season still expires, so the matchdays it
+# lacks are fetched. refresh=True always re-scrapes.
+# ==============================================================================
+
+SEASON, LEAGUE, FRAME = "2023", "ESP-La Liga", "schedule"  # 2023/24: final from 1 July 2024
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(raw_cache, "CACHE_DIR", str(tmp_path / "raw_cache"))
+
+def cache_entry(fetched_at):
+    """
+    A cached frame whose sidecar says it was fetched at `fetched_at`.
+    """
+    raw_cache.write_frame(pd.DataFrame({"game_id": [1, 2]}), "understat", LEAGUE, SEASON, FRAME)
+    _, _, meta_path = raw_cache._entry_paths("understat", LEAGUE, SEASON, FRAME)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["fetched_at"] = fetched_at.isoformat(timespec="seconds")
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+def get(refresh=False):
+    scraped = []
+
+    def fetch():
+        scraped.append(1)
+        return pd.DataFrame({"game_id": [1, 2, 3]})
+
+    df = raw_cache.get_frame("understat", LEAGUE, SEASON, FRAME, fetch, refresh=refresh)
+    return len(df), bool(scraped)
+
+def test_is_fresh_depends_on_when_the_entry_was_fetched():
+    now = datetime(2025, 1, 10)
+    mid_season = {"fetched_at": "2024-03-01T12:00:00"}
+    after_end = {"fetched_at": "2024-07-02T12:00:00"}
+    assert not raw_cache.is_fresh(mid_season, SEASON, now=now)
+    assert raw_cache.is_fresh(after_end, SEASON, now=now)
+    assert raw_cache.is_fresh(mid_season, SEASON, max_age_hours=24, now=datetime(2024, 3, 1, 18, 0))
+
+def test_entry_fetched_mid_season_is_scraped_again():
+    cache_entry(datetime(2024, 3, 1, 12, 0))
+    assert get() == (3, True)
+    assert get() == (3, False)  # the new entry was fetched after the season ended
+
+def test_entry_fetched_after_the_season_is_final():
+    cache_entry(datetime(2024, 8, 1, 12, 0))
+    assert get() == (2, False)
+
+def test_refresh_scrapes_a_final_entry():
+    cache_entry(datetime(2024, 8, 1, 12, 0))
+    assert get(refresh=True) == (3, True)
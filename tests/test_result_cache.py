@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from modules import result_cache
+from modules.backends import DuckDBBackend
+from modules.queries import run_query
+from conftest import SEASON
+
+# ==============================================================================
+# QUERY RESULT CACHE
+# ==============================================================================
+# Entries are served until their season's data version changes. A reset
+# recreates data_versions, so the counter starts again at 1: the version
+# token must still differ from the one before the reset, in the memory tier
+# and in the disk tier.
+# ==============================================================================
+
+@pytest.fixture(autouse=True)
+def empty_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "CACHE_DIR", str(tmp_path / "query_cache"))
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+def standings(conn):
+    return result_cache.cached_query("standings", conn=conn, season=SEASON)
+
+def test_hits_until_the_season_is_reloaded(warehouse):
+    conn = warehouse()
+    first = standings(conn)
+    hits = result_cache.cache_stats()["memory_hits"]
+    pd.testing.assert_frame_equal(standings(conn), first)
+    assert result_cache.cache_stats()["memory_hits"] == hits + 1
+
+    conn.cursor().execute("UPDATE agg_standings SET points = points + 1 WHERE season = %s", (SEASON,))
+    result_cache.bump_data_version(conn.cursor(), SEASON)
+    conn.commit()
+    result_cache.forget_versions()
+    assert (standings(conn)["points"] == first["points"] + 1).all()
+
+def test_reset_then_reload_is_not_served_the_old_season(warehouse, tmp_path):
+    conn = warehouse("warehouse", seed=0)
+    before = standings(conn)
+    conn.close()
+
+    DuckDBBackend(str(tmp_path / "warehouse.duckdb")).reset()
+    conn = warehouse("warehouse", seed=1)  # data_versions starts again at version 1
+    result_cache.forget_versions()
+    expected = run_query("standings", conn=conn, season=SEASON)
+    assert not expected.equals(before)
+    pd.testing.assert_frame_equal(standings(conn), expected)
+
+    # A new process: empty memory tier, same disk tier
+    result_cache.clear()
+    hits = result_cache.cache_stats()["disk_hits"]
+    pd.testing.assert_frame_equal(standings(conn), expected)
+    assert result_cache.cache_stats()["disk_hits"] == hits + 1
@@ -0,0 +1,87 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_season
+from modules.sources import FileSource, SEASON_PLAN, fetch_season, source_limits, with_retry
+
+# ==============================================================================
+# DATA SOURCES
+# ==============================================================================
+# FileSource seeded with synthetic frames (blank count cells included) and fed
+# through a full DuckDB ingestion, the retry loop's attempt numbering, and a
+# per-source limit shared by several worker processes.
+# ==============================================================================
+
+SEASON = "2023"
+
+def seed(root, junk_rate=0.05):
+    frames = generate_season(SEASON, n_teams=6, junk_rate=junk_rate)
+    for (source, frame), df in zip(SEASON_PLAN, frames):
+        FileSource(source, str(root)).write(SEASON, frame, df)
+    return frames
+
+def test_write_keeps_blank_count_cells_as_nulls(tmp_path):
+    frames = seed(tmp_path)
+    players = FileSource("understat", str(tmp_path)).read(SEASON, "player_match_stats")
+    assert len(players) == len(frames[1])
+    blanks = (frames[1]["goals"] == "").sum()
+    assert blanks > 0 and players["goals"].isna().sum() == blanks
+
+def test_seeded_files_ingest_on_duckdb(tmp_path, monkeypatch):
+    pytest.importorskip("duckdb")
+    from modules.ingest_season import run_ingestion
+    seed(tmp_path / "fixtures")
+    monkeypatch.setenv("STORAGE_BACKEND", "duckdb")
+    monkeypatch.setenv("DUCKDB_PATH", str(tmp_path / "warehouse.duckdb"))
+    results = run_ingestion(seasons=[SEASON], source_dir=str(tmp_path / "fixtures"),
+                            metrics_path=str(tmp_path / "metrics.jsonl"))
+    assert results == {SEASON: "OK"}
+
+def test_retry_counts_every_attempt(capsys):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise IOError("timeout")
+        return "ok"
+
+    assert with_retry(flaky, "understat/2023/lineup", retries=3, backoff=0) == "ok"
+    out = capsys.readouterr().out
+    assert "attempt 1/4" in out and "attempt 2/4" in out
+
+class CountingSource:
+    """
+    Records the highest number of reads in progress at once, across processes.
+    """
+    cacheable = False
+
+    def __init__(self, name, state, lock, max_concurrency=1):
+        self.name = name
+        self.state = state
+        self.lock = lock
+        self.max_concurrency = max_concurrency
+
+    def read(self, season, frame):
+        with self.lock:
+            self.state["active"] += 1
+            self.state["peak"] = max(self.state["peak"], self.state["active"])
+        time.sleep(0.05)
+        with self.lock:
+            self.state["active"] -= 1
+        return pd.DataFrame({"season": [season]})
+
+def scrape(season, sources, limits):
+    return len(fetch_season(season, sources, "ESP-La Liga", plan=[("espn", "lineup")] * 2, limits=limits))
+
+def test_source_limit_holds_across_worker_processes():
+    with multiprocessing.Manager() as manager:
+        state = manager.dict(active=0, peak=0)
+        sources = {"espn": CountingSource("espn", state, manager.Lock())}
+        limits = source_limits(sources, manager)
+        with ProcessPoolExecutor(max_workers=3) as pool:
+            assert list(pool.map(scrape, ["2021", "2022", "2023"], [sources] * 3, [limits] * 3)) == [2, 2, 2]
+        assert state["peak"] == 1
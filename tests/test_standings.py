@@ -0,0 +1,79 @@
+import pandas as pd
+
+from modules.aggregates import refresh_aggregates
+from modules.integrity import fetch_integrity
+from modules.standings import encode_results, league_table, matchday_tables, what_if
+from conftest import SEASON
+
+# ==============================================================================
+# STANDINGS ENGINE
+# ==============================================================================
+# A four-team double round robin in which Atleti and Betis finish level on
+# points: Atleti has the far better goal difference, Betis won both derbies.
+# La Liga's head-to-head rule puts Betis first; points/GD/GF alone (the RANK()
+# of migration 0005) would put Atleti first. agg_standings must follow the
+# engine (modules/standings.py apply_positions), and so must the integrity
+# report's top 3.
+# ==============================================================================
+
+RESULTS = [
+    ("Atleti", "Betis", 0, 1), ("Celta", "Deportivo", 0, 0),
+    ("Betis", "Atleti", 1, 0), ("Deportivo", "Celta", 0, 0),
+    ("Atleti", "Celta", 5, 0), ("Betis", "Deportivo", 1, 0),
+    ("Celta", "Atleti", 0, 5), ("Deportivo", "Betis", 1, 0),
+    ("Atleti", "Deportivo", 5, 0), ("Betis", "Celta", 1, 0),
+    ("Deportivo", "Atleti", 0, 5), ("Celta", "Betis", 1, 0),
+]
+ENGINE_ORDER = ["Betis", "Atleti", "Celta", "Deportivo"]
+
+def matches_frame():
+    return pd.DataFrame([
+        (i + 1, pd.Timestamp("2023-08-11") + pd.Timedelta(days=7 * (i // 2)), home, away, hs, as_)
+        for i, (home, away, hs, as_) in enumerate(RESULTS)
+    ], columns=["match_id", "date", "home_team", "away_team", "home_score", "away_score"])
+
+def test_head_to_head_beats_goal_difference():
+    table = league_table(encode_results(matches_frame()))
+    assert table["team"].astype(str).tolist() == ENGINE_ORDER
+    assert table["points"].tolist()[:2] == [12, 12]
+    # Points, then goal difference would rank Atleti first
+    plain = table.sort_values(["points", "gd", "gf"], ascending=False)
+    assert plain["team"].astype(str).tolist()[0] == "Atleti"
+
+def test_goal_difference_decides_before_both_legs():
+    # After the first derby only, Betis has won it but head-to-head is incomplete
+    table = league_table(encode_results(matches_frame()), cutoff="2023-08-11")
+    assert table["team"].astype(str).tolist()[0] == "Betis"
+    table = league_table(what_if(encode_results(matches_frame()), {1: (1, 0), 3: (0, 1)}))
+    assert table["team"].astype(str).tolist()[0] == "Atleti"
+
+def test_matchday_tables_end_with_the_final_table():
+    results = encode_results(matches_frame())
+    tables = matchday_tables(results)
+    assert len(tables) == results.matchday.max() * len(results.teams)
+    final = tables[tables["matchday"] == tables["matchday"].max()].drop(columns=["matchday"])
+    pd.testing.assert_frame_equal(final.reset_index(drop=True), league_table(results))
+
+def stored_table(warehouse):
+    conn = warehouse("standings", loader=None)
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT INTO matches (id, season, date, home_team, away_team, home_score, away_score) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        [(m.match_id, SEASON, m.date.date(), m.home_team, m.away_team, m.home_score, m.away_score)
+         for m in matches_frame().itertuples()],
+    )
+    refresh_aggregates(cur, SEASON)
+    return conn
+
+def test_agg_standings_positions_follow_the_engine(warehouse):
+    cur = stored_table(warehouse).cursor()
+    cur.execute("SELECT team, position FROM agg_standings WHERE season = %s ORDER BY position", (SEASON,))
+    rows = cur.fetchall()
+    assert [team for team, _ in rows] == ENGINE_ORDER
+    assert [position for _, position in rows] == [1, 2, 3, 4]
+
+def test_integrity_top3_follows_the_stored_table(warehouse):
+    row = fetch_integrity([SEASON], conn=stored_table(warehouse))[0]
+    assert row["teams"] == len(ENGINE_ORDER)
+    assert [team["team"] for team in row["top3"]] == ENGINE_ORDER[:3]
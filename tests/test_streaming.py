@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.streaming import fold, fold_groupby
+
+# ==============================================================================
+# STREAMING AGGREGATES
+# ==============================================================================
+# fold_groupby over chunks must equal one groupby over the concatenated frame,
+# including groups split across chunks and means of columns with nulls.
+# ==============================================================================
+
+AGGS = {
+    "goals": ("goals", "sum"),
+    "games": ("goals", "size"),
+    "xg_games": ("xg", "count"),
+    "best": ("goals", "max"),
+    "worst": ("goals", "min"),
+    "avg_xg": ("xg", "mean"),
+}
+
+def frame(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    xg = rng.random(n).round(3)
+    xg[rng.random(n) < 0.2] = np.nan
+    return pd.DataFrame({
+        "team": pd.Categorical(rng.choice(["betis", "girona", "celta", "osasuna"], n)),
+        "season": rng.choice(["2022", "2023"], n),
+        "goals": rng.integers(0, 5, n),
+        "xg": xg,
+    })
+
+def chunks(df, size):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+@pytest.mark.parametrize("size", [7, 37, 500])
+def test_matches_a_single_groupby(size):
+    df = frame()
+    expected = df.groupby(["team", "season"], observed=True).agg(**AGGS).reset_index()
+    result = fold_groupby(chunks(df, size), ["team", "season"], AGGS)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_categorical=False)
+
+def test_empty_stream_has_the_output_columns():
+    assert list(fold_groupby(iter([]), "team", {"goals": ("goals", "sum")}).columns) == ["team", "goals"]
+
+def test_non_combinable_aggregate_is_rejected():
+    with pytest.raises(ValueError, match="median"):
+        fold_groupby(chunks(frame(), 100), "team", {"goals": ("goals", "median")})
+
+def test_fold_reduces_every_chunk():
+    assert fold(chunks(frame(), 64), lambda total, chunk: total + len(chunk), 0) == 500